@@ -13,18 +13,32 @@ import plotly.express as px
 # Data Loading & Preprocessing
 # ------------------------
 
-from modules.data import load_and_preprocess_data
+from modules.config import CLIENTSIDE_COUNTRY_FILTER, COORDINATED_UPDATES, RESPONSE_CACHE_BACKEND, SHARED_DATA
+from modules.data import load_and_preprocess_data, DataIndex, DataHandle
 #from modules.visualizations import create_wealth_chart, create_world_map
 from modules.callbacks import (
     register_wealth_chart_callbacks,
     register_world_map_callbacks,
     register_treemap_callbacks,
+    register_movers_callbacks,
+    register_dashboard_callbacks,
+    register_animation_callbacks,
+    register_trajectory_callbacks,
+    register_country_filter_callbacks,
+    instrument_app,
+    install_response_cache,
+    install_static_bundle,
+    install_compression,
+    install_topology,
+    install_data_reload,
 )
+from modules.api import install_api
 from modules.layouts import create_layout
 from modules.callbacks import click_data as cd
 
 # Load data
-df, bill_df, scatter_data = load_and_preprocess_data()
+df, bill_df, scatter_data = load_and_preprocess_data(shared=SHARED_DATA)
+data_index = DataIndex(df, bill_df, scatter_data)
 
 # ------------------------
 # Helper Functions
@@ -39,19 +53,48 @@ def get_flag_emoji(iso3):
 # ------------------------
 # App Initialization
 # ------------------------
-app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
-server = app.server
+def create_app(data, response_cache=RESPONSE_CACHE_BACKEND):
+    """Create the Dash app with its layout and callbacks bound to data.
 
-# ------------------------
-# Layout
-# ------------------------
-app.layout = create_layout(df)
+    data is a DataHandle, or a DataIndex to wrap in one; reloaded data is
+    swapped into the handle (app.data). response_cache is the response
+    cache backend (see RESPONSE_CACHE_BACKEND).
+    """
+    app = dash.Dash(__name__, external_stylesheets=[dbc.themes.BOOTSTRAP])
+    data = data if isinstance(data, DataHandle) else DataHandle(data)
+    app.data = data
+
+    # Layout, with the map on the self-hosted world topology if it is built.
+    # Built per page load, so new pages get the years of the current data.
+    topojson_url = install_topology(app)
+    app.layout = lambda: create_layout(data.current.df, topojson_url, data.version)
 
-# Register callbacks
-register_wealth_chart_callbacks(app, df)
-register_world_map_callbacks(app, bill_df, scatter_data)
-register_treemap_callbacks(app, df)
-cd.register_click_data_callbacks(app)
+    # Register callbacks, with compression, metrics, the static bundle and
+    # the shared response cache (in this order, see instrument_app)
+    install_compression(app)
+    instrument_app(app)
+    install_static_bundle(app, data)
+    install_response_cache(app, data, response_cache)
+    install_api(app, data)
+    install_data_reload(app, data)
+    if COORDINATED_UPDATES:
+        register_dashboard_callbacks(app, data)
+    else:
+        register_wealth_chart_callbacks(app, data)
+        register_world_map_callbacks(app, data)
+        register_treemap_callbacks(app, data)
+        register_movers_callbacks(app, data)
+    register_animation_callbacks(app, data)
+    register_trajectory_callbacks(app, data)
+    if CLIENTSIDE_COUNTRY_FILTER:
+        register_country_filter_callbacks(app, data)
+    else:
+        cd.register_click_data_callbacks(app)
+    return app
+
+
+app = create_app(data_index)
+server = app.server
 
 # ------------------------
 # Main
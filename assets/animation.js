@@ -0,0 +1,121 @@
+/*
+ * Clientside callbacks for the Play animation (see modules/callbacks/animation.py).
+ *
+ * Frames hold only the per-year arrays of each chart; everything else
+ * (layout, colorbar, trace styling) is kept from the figure already on screen.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    animation: {
+        syncYear: function (year, isPaused, country, framesLoadedAt, currentYear) {
+            var noUpdate = window.dash_clientside.no_update;
+            // While playing with frames loaded, the browser draws the charts itself
+            if (!isPaused && framesLoadedAt > 0 && !country) {
+                return noUpdate;
+            }
+            return year === currentYear ? noUpdate : year;
+        },
+
+        requestFrames: function (nClicks, framesLoadedAt, dataChangedAt, dataVersion, requested) {
+            var noUpdate = window.dash_clientside.no_update;
+            var triggered = window.dash_clientside.callback_context.triggered;
+            var triggeredId = triggered.length ? triggered[0].prop_id.split(".")[0] : null;
+
+            // Frames arrived: clear the loading note
+            if (triggeredId === "animation-frames") {
+                return [noUpdate, ""];
+            }
+            // Loaded since the last data change, or already on their way
+            var fresh = framesLoadedAt > Math.max(dataChangedAt || 0, 0);
+            if (fresh || requested === dataVersion) {
+                return [noUpdate, noUpdate];
+            }
+            return [dataVersion, "Loading frames…"];
+        },
+
+        step: function (nClicks, nIntervals, year, maxYear, isPaused, frames,
+                        viewType, wealthMode, country, wealthFig, mapFig, treeFig) {
+            var noUpdate = window.dash_clientside.no_update;
+            var triggered = window.dash_clientside.callback_context.triggered;
+            var triggeredId = triggered.length ? triggered[0].prop_id.split(".")[0] : null;
+
+            // Handle play button logic
+            if (triggeredId === "play-button") {
+                if (isPaused) {
+                    return [year, noUpdate, noUpdate, noUpdate, false, "Pause"];
+                }
+                return [year, noUpdate, noUpdate, noUpdate, true, "Play"];
+            }
+
+            // Handle interval animation logic
+            if (isPaused) {
+                return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+            var nextYear = Math.min(year + 1, maxYear);
+            var done = nextYear === maxYear;
+
+            // Country views are not preloaded; the server renders those
+            var frame = frames && !country ? frames.years[String(nextYear)] : null;
+            var figures = [noUpdate, noUpdate, noUpdate];
+            if (frame) {
+                figures = [
+                    applyWealthFrame(wealthFig, frame.wealth, wealthMode),
+                    applyMapFrame(mapFig, frame.map[viewType]),
+                    applyTreemapFrame(treeFig, frame.treemap, frames.palette)
+                ];
+            }
+            return [nextYear].concat(figures, [done, done ? "Play" : "Pause"]);
+        }
+    }
+});
+
+function applyWealthFrame(figure, frame, mode) {
+    if (!figure || !frame || !frame.x[mode]) {
+        return window.dash_clientside.no_update;
+    }
+    var bar = Object.assign({}, figure.data[0], {
+        y: frame.y, x: frame.x[mode], customdata: frame.customdata[mode]
+    });
+    return Object.assign({}, figure, {data: [bar]});
+}
+
+function applyMapFrame(figure, frame) {
+    if (!figure || !frame) {
+        return window.dash_clientside.no_update;
+    }
+    var data = [Object.assign({}, figure.data[0], frame.choropleth)];
+    if (frame.scatter) {
+        data.push(frame.scatter);
+    }
+    return Object.assign({}, figure, {data: data});
+}
+
+function applyTreemapFrame(figure, frame, palette) {
+    if (!figure || !frame) {
+        return window.dash_clientside.no_update;
+    }
+    // Parents always come after their children, so resolve ids recursively
+    var ids = new Array(frame.labels.length);
+    function idOf(i) {
+        if (ids[i] === undefined) {
+            var parent = frame.parent[i];
+            ids[i] = parent < 0 ? frame.labels[i] : idOf(parent) + "/" + frame.labels[i];
+        }
+        return ids[i];
+    }
+    var parents = frame.parent.map(function (parent) {
+        return parent < 0 ? "" : idOf(parent);
+    });
+    frame.labels.forEach(function (label, i) { idOf(i); });
+
+    var treemap = Object.assign({}, figure.data[0], {
+        ids: ids,
+        labels: frame.labels,
+        parents: parents,
+        values: frame.values,
+        customdata: undefined,
+        marker: Object.assign({}, figure.data[0].marker, {
+            colors: frame.color.map(function (c) { return palette[c]; })
+        })
+    });
+    return Object.assign({}, figure, {data: [treemap]});
+}
@@ -0,0 +1,372 @@
+/*
+ * Clientside country filter (see modules/callbacks/country_filter.py).
+ *
+ * A country click or a click on the map background redraws the wealth chart,
+ * treemap and movers panel from the selected year's rows (the year-rows
+ * store) the way the server builds them: the leaderboard in
+ * modules/data/leaderboard.py, the hierarchy in modules/data/treemap.py and
+ * the panel in modules/visualizations/movers.py. Layouts and trace styling
+ * are kept from the figures already on screen. The rows of a year are only
+ * fetched on its first click; the charts are drawn when they arrive.
+ */
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    countryFilter: {
+        selectCountry: function (clickData, nClicks, yearRows, currentCountry, year, dataVersion,
+                                 wealthMode, wealthFig, treeFig) {
+            var noUpdate = window.dash_clientside.no_update;
+            var triggered = window.dash_clientside.callback_context.triggered;
+            if (!triggered.length) {
+                return [null, noUpdate, noUpdate, noUpdate, noUpdate];
+            }
+            var triggeredId = triggered[0].prop_id.split(".")[0];
+            var selected = noUpdate;
+            var country;
+
+            if (triggeredId === "year-rows") {
+                // Rows asked for by a click arrived: draw the country it selected,
+                // unless the year has moved on (the server draws that one)
+                if (!yearRows || yearRows.year !== year) {
+                    return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+                }
+                country = currentCountry || null;
+            } else {
+                country = triggeredId === "map-container" ? null : clickedCountry(clickData);
+                // Re-selecting the same country would redraw the charts for nothing
+                if (country === (currentCountry || null)) {
+                    return [noUpdate, noUpdate, noUpdate, noUpdate, noUpdate];
+                }
+                // First click in this year (or since a data reload): ask for its rows
+                if (!yearRows || yearRows.year !== year || yearRows.version !== dataVersion) {
+                    return [country, noUpdate, noUpdate, noUpdate, {year: year, version: dataVersion}];
+                }
+                selected = country;
+            }
+            var view = countryView(yearRows, country);
+            return [
+                selected,
+                drawWealthChart(wealthFig, view, wealthMode),
+                drawTreemap(treeFig, view, country),
+                moversPanel(view, country),
+                noUpdate
+            ];
+        }
+    }
+});
+
+// Country of a map click, as click_data_info (modules/visualizations/click_data.py)
+function clickedCountry(clickData) {
+    if (!clickData || !clickData.points) {
+        return null;
+    }
+    var text = clickData.points[0].text;
+    if (typeof text !== "string" || text.slice(-5) === ": nan") {
+        return null;
+    }
+    return text.split("<br>")[0];
+}
+
+// Row records of the year, limited to a country (all of them for null)
+function countryView(yearRows, country) {
+    var code = country === null ? null : yearRows.countries.indexOf(country);
+    function records(columns) {
+        var names = Object.keys(columns);
+        var records = [];
+        columns.name.forEach(function (name, i) {
+            if (code !== null && columns.country[i] !== code) {
+                return;
+            }
+            var record = {};
+            names.forEach(function (column) { record[column] = columns[column][i]; });
+            var flag = record.flag < 0 ? "" : yearRows.flags[record.flag];
+            record.label = name + " " + flag + " ";
+            record.industry = record.industry === undefined || record.industry < 0
+                ? null : yearRows.industries[record.industry];
+            records.push(record);
+        });
+        return records;
+    }
+    return {yearRows: yearRows, rows: records(yearRows.rows), dropouts: records(yearRows.dropouts)};
+}
+
+// Array.prototype.sort is stable, so ties keep the order of the rows
+function sortedBy(records, key, descending) {
+    return records.slice().sort(function (a, b) {
+        return descending ? key(b) - key(a) : key(a) - key(b);
+    });
+}
+
+// |value| to digits places as Python's format() writes it: exact ties round to
+// even ("81.2" for 81.25), where toFixed() rounds them up
+function fixed(value, digits) {
+    var x = Math.abs(value);
+    var exact = x.toFixed(digits + 25);
+    var kept = exact.slice(0, -25).replace(/\.$/, "");
+    if (exact.slice(-25) === "5" + "0".repeat(24) && Number(kept.slice(-1)) % 2 === 0) {
+        return kept;
+    }
+    return x.toFixed(digits);
+}
+
+function signed(value, digits) {
+    return (value < 0 ? "-" : "+") + fixed(value, digits);
+}
+
+// Net worth change of a row since the previous year, computed as in year_over_year()
+function change(row, column) {
+    var before = row[column + "_previous"];
+    if (before === null || row[column] === null) {
+        return null;
+    }
+    return {change: row[column] - before, pct: (row[column] / before - 1) * 100};
+}
+
+// Hover text of a bar, as movement_text() (modules/data/movers.py)
+function movementText(row, column, previousYear) {
+    if (row.rank === null) {
+        return "";
+    }
+    var move = "";
+    if (row.newcomer) {
+        move = "new on the list";
+    } else if (row.rank_change > 0) {
+        move = "▲" + row.rank_change;
+    } else if (row.rank_change < 0) {
+        move = "▼" + -row.rank_change;
+    } else if (row.rank_change === 0) {
+        move = "no change";
+    }
+    var text = "Rank #" + row.rank + (move ? " (" + move + ")" : "");
+    var since = change(row, column);
+    if (since) {
+        text += "<br>" + (since.change >= 0 ? "+" : "-") + "$" + fixed(since.change, 1) + "B"
+            + " (" + signed(since.pct, 1) + "%) since " + previousYear;
+    }
+    return text;
+}
+
+function drawWealthChart(figure, view, mode) {
+    if (!figure || !figure.data) {
+        return window.dash_clientside.no_update;
+    }
+    var ranked = sortedBy(view.rows.filter(function (row) { return row.net_worth !== null; }),
+                          function (row) { return row.net_worth; }, true);
+    var top = ranked.slice(0, view.yearRows.size);
+    var bar = Object.assign({}, figure.data[0], {
+        y: top.map(function (row) { return row.label; }),
+        x: top.map(function (row) { return row[mode]; }),
+        customdata: top.map(function (row) {
+            return movementText(row, mode, view.yearRows.previous_year);
+        })
+    });
+    return Object.assign({}, figure, {data: [bar]});
+}
+
+// Float sum as pandas' groupby sum() adds up (Kahan summation), so totals and
+// the industry colors ranked by them come out as on the server
+function GroupSum() {
+    this.value = 0;
+    this.compensation = 0;
+}
+
+GroupSum.prototype.add = function (value) {
+    var y = value - this.compensation;
+    var t = this.value + y;
+    this.compensation = t - this.value - y;
+    this.value = t;
+};
+
+// Root -> industry -> billionaire hierarchy, as TreemapStore builds it
+function treemapArrays(view, country) {
+    var topK = view.yearRows.top_k;
+    var title = country === null ? "All Billionaires in the World" : "All Billionaires in " + country;
+
+    // Net worth per (industry, name), in order of appearance
+    var leaves = [];
+    var leafIndex = {};
+    view.rows.forEach(function (row) {
+        if (row.industry === null) {
+            return;
+        }
+        var key = JSON.stringify([row.industry, row.name]);
+        if (!(key in leafIndex)) {
+            leafIndex[key] = leaves.length;
+            leaves.push({industry: row.industry, name: row.name, sum: new GroupSum()});
+        }
+        leaves[leafIndex[key]].sum.add(row.net_worth === null ? 0 : row.net_worth);
+    });
+    leaves.forEach(function (leaf) { leaf.value = leaf.sum.value; });
+
+    // At most top_k billionaires per industry, the rest rolled into "Other"
+    if (topK !== null && topK !== undefined) {
+        var kept = [];
+        var others = {};
+        var seen = {};
+        sortedBy(leaves, function (leaf) { return leaf.value; }, true).forEach(function (leaf) {
+            seen[leaf.industry] = (seen[leaf.industry] || 0) + 1;
+            if (seen[leaf.industry] <= topK) {
+                kept.push(leaf);
+                return;
+            }
+            if (!(leaf.industry in others)) {
+                others[leaf.industry] = {industry: leaf.industry, name: "Other", sum: new GroupSum()};
+            }
+            others[leaf.industry].sum.add(leaf.value);
+        });
+        leaves = kept.concat(Object.keys(others).map(function (industry) {
+            var other = others[industry];
+            other.value = other.sum.value;
+            return other;
+        }));
+    }
+
+    // Leaves by industry name then descending net worth; industries in name order
+    leaves = leaves.slice().sort(function (a, b) {
+        return a.industry < b.industry ? -1 : a.industry > b.industry ? 1 : b.value - a.value;
+    });
+    var totals = {};
+    var industries = [];
+    leaves.forEach(function (leaf) {
+        if (!(leaf.industry in totals)) {
+            totals[leaf.industry] = new GroupSum();
+            industries.push(leaf.industry);
+        }
+        totals[leaf.industry].add(leaf.value);
+    });
+
+    // Industry colors by total net worth, largest first; the root takes the next one
+    var color = {};
+    sortedBy(industries, function (industry) { return totals[industry].value; }, true)
+        .forEach(function (industry, i) { color[industry] = i; });
+
+    var arrays = {ids: [], labels: [], parents: [], values: [], colors: []};
+    function add(id, label, parent, value, colorIndex) {
+        arrays.ids.push(id);
+        arrays.labels.push(label);
+        arrays.parents.push(parent);
+        arrays.values.push(value);
+        arrays.colors.push(colorIndex);
+    }
+    leaves.forEach(function (leaf) {
+        add(title + "/" + leaf.industry + "/" + leaf.name, leaf.name, title + "/" + leaf.industry,
+            leaf.value, color[leaf.industry]);
+    });
+    var total = new GroupSum();
+    industries.forEach(function (industry) {
+        add(title + "/" + industry, industry, title, totals[industry].value, color[industry]);
+        total.add(totals[industry].value);
+    });
+    if (industries.length) {
+        add(title, title, "", total.value, industries.length);
+    }
+    return arrays;
+}
+
+function drawTreemap(figure, view, country) {
+    if (!figure || !figure.data) {
+        return window.dash_clientside.no_update;
+    }
+    var arrays = treemapArrays(view, country);
+    var palette = view.yearRows.palette;
+    var treemap = Object.assign({}, figure.data[0], {
+        ids: arrays.ids,
+        labels: arrays.labels,
+        parents: arrays.parents,
+        values: arrays.values,
+        marker: Object.assign({}, figure.data[0].marker, {
+            colors: arrays.colors.map(function (c) { return palette[c % palette.length]; })
+        })
+    });
+    return Object.assign({}, figure, {data: [treemap]});
+}
+
+// Dash component as the renderer takes it from a callback
+function component(namespace, type, props) {
+    return {namespace: namespace, type: type, props: props};
+}
+
+function html(type, children, className) {
+    var props = {children: children};
+    if (className) {
+        props.className = className;
+    }
+    return component("dash_html_components", type, props);
+}
+
+function rankChange(change) {
+    if (change === null || change === 0) {
+        return "";
+    }
+    return change > 0 ? "▲" + change : "▼" + -change;
+}
+
+function moversTable(title, rows, cells) {
+    var body = rows.map(function (row) {
+        return html("Tr", [html("Td", row.label)].concat(cells(row).map(function (cell) {
+            return html("Td", cell, "text-end");
+        })));
+    });
+    return component("dash_bootstrap_components", "Col", {
+        children: [
+            html("H6", title, "mb-1"),
+            body.length
+                ? component("dash_bootstrap_components", "Table", {
+                    children: html("Tbody", body), size: "sm", borderless: true, className: "mb-0"
+                })
+                : html("P", "None", "text-muted small mb-0")
+        ],
+        width: 3
+    });
+}
+
+// Movers panel, as MoversStore and create_movers_panel() build it
+function moversPanel(view, country) {
+    var yearRows = view.yearRows;
+    if (yearRows.previous_year === null) {
+        return html("P", "No earlier year to compare " + yearRows.year + " with.", "text-muted mb-0");
+    }
+    var size = yearRows.movers_size;
+    var local = country !== null;
+    var rows = view.rows.filter(function (row) { return row.sequence !== null; }).map(function (row) {
+        var since = change(row, "net_worth");
+        return Object.assign({}, row, {
+            change: since && since.change,
+            pct: since && since.pct,
+            rank: local ? row.country_rank : row.rank,
+            rank_change: local ? row.country_rank_change : row.rank_change
+        });
+    });
+    var movements = sortedBy(rows, function (row) { return row.sequence; }, false);
+    var compared = movements.filter(function (row) { return row.change !== null; });
+    var risers = sortedBy(compared.filter(function (row) { return row.change > 0; }),
+                          function (row) { return row.change; }, true);
+    var fallers = sortedBy(compared.filter(function (row) { return row.change < 0; }),
+                           function (row) { return row.change; }, false);
+    var newcomers = sortedBy(movements.filter(function (row) { return row.newcomer; }),
+                             function (row) { return row.net_worth; }, true);
+    var dropouts = sortedBy(sortedBy(view.dropouts, function (row) { return row.sequence; }, false),
+                            function (row) { return row.net_worth; }, true);
+
+    var scope = local ? " in " + country : "";
+    return html("Div", [
+        html("H5", "Biggest movers" + scope + " since " + yearRows.previous_year, "mb-2"),
+        component("dash_bootstrap_components", "Row", {
+            children: [
+                moversTable("Risers", risers.slice(0, size), function (row) {
+                    return ["+$" + fixed(row.change, 1) + "B (" + signed(row.pct, 0) + "%)",
+                            rankChange(row.rank_change)];
+                }),
+                moversTable("Fallers", fallers.slice(0, size), function (row) {
+                    return ["-$" + fixed(row.change, 1) + "B (" + signed(row.pct, 0) + "%)",
+                            rankChange(row.rank_change)];
+                }),
+                moversTable("Newcomers (" + newcomers.length + ")", newcomers.slice(0, size), function (row) {
+                    return ["$" + fixed(row.net_worth, 1) + "B", "#" + row.rank];
+                }),
+                moversTable("Dropped off (" + dropouts.length + ")", dropouts.slice(0, size), function (row) {
+                    return ["was $" + fixed(row.net_worth, 1) + "B"];
+                })
+            ],
+            className: "g-3"
+        })
+    ]);
+}
@@ -0,0 +1,591 @@
+"""
+Load test: many concurrent simulated dashboard sessions against the app.
+
+Each session loads the page and then drags the slider, plays the animation,
+clicks countries on the map, switches the map view or the wealth chart
+mode and looks up billionaires, with random think times in between. The callback graph comes from the
+app's own /_dash-dependencies, and the harness plays the part of the Dash
+renderer: it posts the same /_dash-update-component payloads a browser would,
+feeds each response back into the component values and fires the callbacks
+that depend on what changed. The few clientside callbacks are run by Python ports
+(CLIENTSIDE), and the dcc.Interval components tick on a simulated clock.
+
+Targets:
+    (default)         the app in this process, through its WSGI server
+    --url URL         a running server
+    --workers N ...   gunicorn with each worker count, for every --cache-modes
+                      value (BILLIONAIRE_RESPONSE_CACHE; '' turns it off)
+
+--record FILE saves every payload the sessions sent; --replay FILE sends a
+saved recording (or a browser HAR export) again instead of simulating.
+
+Reports throughput and p50/p95/p99 latency per callback.
+
+Usage:
+    python -m benchmarks.load [--sessions N] [--duration S] [--speed X]
+                              [--url URL | --workers N ... [--cache-modes MODE ...]]
+                              [--record FILE | --replay FILE] [--save FILE]
+"""
+import argparse
+import asyncio
+import collections
+import concurrent.futures
+import json
+import random
+import sys
+import time
+
+import httpx
+import numpy as np
+import pandas as pd
+
+from .run import _payload
+from .workers import serve
+
+UPDATE_PATH = "/_dash-update-component"
+
+# What a session does after loading the page, and how often
+ACTIONS = {"drag": 0.30, "click": 0.25, "toggle": 0.15, "play": 0.10, "reset": 0.10, "inspect": 0.10}
+ACTIONS_PER_SESSION = (5, 15)
+
+# Callback chains longer than this are reported and cut short
+MAX_ROUNDS = 10
+
+COLUMNS = ["callback", "requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "mean_kb"]
+
+
+class NoUpdate:
+    """dash.no_update of the clientside ports."""
+
+
+NO_UPDATE = NoUpdate()
+
+
+def _sync_year(year, is_paused, country, frames_loaded_at, current_year, triggered):
+    """animation.syncYear (assets/animation.js)."""
+    if not is_paused and (frames_loaded_at or 0) > 0 and not country:
+        return [NO_UPDATE]
+    return [NO_UPDATE if year == current_year else year]
+
+
+def _request_frames(n_clicks, frames_loaded_at, data_changed_at, data_version, requested, triggered):
+    """animation.requestFrames (assets/animation.js)."""
+    if triggered == "animation-frames":
+        return [NO_UPDATE, ""]
+    if (frames_loaded_at or 0) > max(data_changed_at or 0, 0) or requested == data_version:
+        return [NO_UPDATE, NO_UPDATE]
+    return [data_version, "Loading frames…"]
+
+
+def _step(n_clicks, n_intervals, year, max_year, is_paused, frames, view_type, wealth_mode, country,
+          wealth_figure, map_figure, treemap_figure, triggered):
+    """animation.step (assets/animation.js), without drawing the frames."""
+    if triggered == "play-button":
+        return [year, NO_UPDATE, NO_UPDATE, NO_UPDATE, not is_paused, "Play" if is_paused else "Pause"]
+    if is_paused:
+        return [NO_UPDATE] * 6
+    next_year = min(year + 1, max_year)
+    done = next_year == max_year
+    return [next_year, NO_UPDATE, NO_UPDATE, NO_UPDATE, done, "Play" if done else "Pause"]
+
+
+def _select_country(click_data, n_clicks, year_rows, country, year, data_version, wealth_mode,
+                    wealth_figure, treemap_figure, triggered):
+    """countryFilter.selectCountry (assets/country_filter.js), without drawing the charts."""
+    if triggered == "year-rows":
+        return [NO_UPDATE] * 5
+    selected = None
+    if triggered != "map-container" and click_data and click_data.get("points"):
+        text = click_data["points"][0].get("text") or ""
+        selected = None if text.endswith(": nan") else text.split("<br>")[0]
+    if selected == country:
+        return [NO_UPDATE] * 5
+    if not year_rows or year_rows.get("year") != year or year_rows.get("version") != data_version:
+        return [selected, NO_UPDATE, NO_UPDATE, NO_UPDATE, {"year": year, "version": data_version}]
+    return [selected] + [NO_UPDATE] * 4
+
+
+# (namespace, function_name) -> Python port, called with the input and state
+# values and the id of the component that triggered it
+CLIENTSIDE = {
+    ("animation", "syncYear"): _sync_year,
+    ("animation", "requestFrames"): _request_frames,
+    ("animation", "step"): _step,
+    ("countryFilter", "selectCountry"): _select_country,
+}
+
+
+def _prop(dependency):
+    return f"{dependency['id']}.{dependency['property']}"
+
+
+def _output_props(output):
+    """'id.prop' of each output of a dependencies entry, '@' suffixes dropped."""
+    if output.startswith(".."):
+        parts = output.strip(".").split("...")
+    else:
+        parts = [output]
+    return [part.split("@")[0] for part in parts]
+
+
+def _label(callback):
+    """Report name of a callback: the ids of its outputs."""
+    ids = dict.fromkeys(prop.rsplit(".", 1)[0] for prop in _output_props(callback["output"]))
+    return "+".join(ids)
+
+
+def _walk_layout(node, values, intervals):
+    """Collect the props of every component with an id in the layout."""
+    if isinstance(node, list):
+        for child in node:
+            _walk_layout(child, values, intervals)
+        return
+    if not isinstance(node, dict) or "props" not in node:
+        return
+    props = node["props"]
+    component_id = props.get("id")
+    if isinstance(component_id, str):
+        for prop, value in props.items():
+            if prop != "children" or not isinstance(value, (dict, list)):
+                values[f"{component_id}.{prop}"] = value
+        if node.get("type") == "Store":
+            values.setdefault(f"{component_id}.modified_timestamp", -1)
+        if node.get("type") == "Interval":
+            values.setdefault(f"{component_id}.n_intervals", 0)
+            intervals[component_id] = props.get("interval", 1000)
+    _walk_layout(props.get("children"), values, intervals)
+
+
+class Stats:
+    """Latency and size of every request, by callback."""
+
+    def __init__(self):
+        self.latency = collections.defaultdict(list)
+        self.size = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.started = time.perf_counter()
+        self.stopped = None
+
+    def add(self, label, seconds, size, ok=True):
+        self.latency[label].append(seconds)
+        self.size[label].append(size)
+        if not ok:
+            self.errors[label] += 1
+
+    def report(self):
+        duration = (self.stopped or time.perf_counter()) - self.started
+        rows = []
+        labels = sorted(self.latency)
+        every = [*labels, "all"]
+        for label in every:
+            if label == "all":
+                latency = np.concatenate([self.latency[name] for name in labels]) if labels else np.array([])
+                size = np.concatenate([self.size[name] for name in labels]) if labels else np.array([])
+                errors = sum(self.errors.values())
+            else:
+                latency, size, errors = np.array(self.latency[label]), np.array(self.size[label]), self.errors[label]
+            if not len(latency):
+                continue
+            p50, p95, p99 = np.percentile(latency, [50, 95, 99]) * 1000
+            rows.append({
+                "callback": label,
+                "requests": len(latency),
+                "errors": errors,
+                "rps": round(len(latency) / duration, 2),
+                "p50_ms": round(p50, 1),
+                "p95_ms": round(p95, 1),
+                "p99_ms": round(p99, 1),
+                "mean_kb": round(size.mean() / 1024, 2),
+            })
+        return pd.DataFrame(rows, columns=COLUMNS)
+
+
+class Session:
+    """One simulated browser tab on the dashboard."""
+
+    def __init__(self, client, dependencies, stats, rng, think, speed, recording=None):
+        self.client = client
+        self.callbacks = dependencies
+        self.stats = stats
+        self.rng = rng
+        self.think = think
+        self.speed = speed
+        self.recording = recording
+        self.values = collections.defaultdict(lambda: None)
+        self.intervals = {}
+        self.due = {}  # interval id -> simulated ms of its next tick
+        self.clock = 0.0  # simulated ms since the page load
+
+    async def _request(self, label, method, path, **kwargs):
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats.add(label, time.perf_counter() - start, 0, ok=False)
+            return None
+        self.stats.add(label, time.perf_counter() - start, len(response.content),
+                       ok=response.status_code in (200, 204))
+        return response
+
+    async def load_page(self):
+        await self._request("page", "GET", "/")
+        response = await self._request("layout", "GET", "/_dash-layout")
+        await self._request("dependencies", "GET", "/_dash-dependencies")
+        if response is None or response.status_code != 200:
+            raise RuntimeError("could not load /_dash-layout")
+        _walk_layout(response.json(), self.values, self.intervals)
+        self._schedule_intervals()
+        await self.dispatch(None)
+
+    def _schedule_intervals(self):
+        # An enabled interval restarts its timer; a disabled one stops
+        for interval_id, period in self.intervals.items():
+            if self.values[f"{interval_id}.disabled"]:
+                self.due.pop(interval_id, None)
+            elif interval_id not in self.due:
+                self.due[interval_id] = self.clock + period
+
+    def _set(self, prop, value):
+        self.values[prop] = value
+        component_id, name = prop.rsplit(".", 1)
+        if name == "data" and f"{component_id}.modified_timestamp" in self.values:
+            self.values[f"{component_id}.modified_timestamp"] = int(time.time() * 1000)
+
+    async def _post(self, callback, changed):
+        payload = _payload(callback["output"], callback, self.values, changed)
+        if self.recording is not None:
+            self.recording.append({"at": round(self.clock), "payload": payload})
+        response = await self._request(_label(callback), "POST", UPDATE_PATH, json=payload)
+        if response is None or response.status_code != 200:
+            return set()
+        updated = set()
+        for component_id, props in response.json().get("response", {}).items():
+            for prop, value in props.items():
+                if isinstance(value, dict) and "__dash_patch_update" in value:
+                    value = self.values[f"{component_id}.{prop}"]  # patches aren't applied
+                self._set(f"{component_id}.{prop}", value)
+                updated.add(f"{component_id}.{prop}")
+        return updated
+
+    def _clientside(self, callback, changed):
+        function = callback["clientside_function"]
+        port = CLIENTSIDE.get((function["namespace"], function["function_name"]))
+        if port is None:
+            return set()
+        args = [self.values[_prop(d)] for d in callback["inputs"] + callback["state"]]
+        triggered = next(iter(changed), "").rsplit(".", 1)[0] or None
+        updated = set()
+        for prop, value in zip(_output_props(callback["output"]), port(*args, triggered=triggered)):
+            if value is not NO_UPDATE:
+                self._set(prop, value)
+                updated.add(prop)
+        return updated
+
+    async def dispatch(self, changed):
+        """Fire the callbacks of changed props ('id.prop'), then those of their outputs.
+
+        changed is None for the initial render of the page.
+        """
+        for _ in range(MAX_ROUNDS):
+            if changed is None:
+                fired = [c for c in self.callbacks if not c.get("prevent_initial_call")]
+            else:
+                fired = [c for c in self.callbacks if any(_prop(d) in changed for d in c["inputs"])]
+            if not fired:
+                break
+            updated = set()
+            requests = []
+            for callback in fired:
+                inputs = [_prop(d) for d in callback["inputs"]]
+                triggered = [] if changed is None else [prop for prop in inputs if prop in changed]
+                if callback.get("clientside_function"):
+                    updated |= self._clientside(callback, triggered)
+                else:
+                    requests.append(self._post(callback, triggered))
+            for result in await asyncio.gather(*requests):
+                updated |= result
+            changed = updated
+            self._schedule_intervals()
+        else:
+            print(f"callback chain longer than {MAX_ROUNDS} rounds: {sorted(changed)}", file=sys.stderr)
+
+    async def wait(self, ms):
+        """Let ms of simulated time pass, ticking the enabled intervals."""
+        until = self.clock + ms
+        while self.due and min(self.due.values()) <= until:
+            interval_id = min(self.due, key=self.due.get)
+            await asyncio.sleep((self.due[interval_id] - self.clock) / 1000 / self.speed)
+            self.clock = self.due[interval_id]
+            self.due[interval_id] = self.clock + self.intervals[interval_id]
+            prop = f"{interval_id}.n_intervals"
+            self._set(prop, (self.values[prop] or 0) + 1)
+            await self.dispatch({prop})
+        await asyncio.sleep((until - self.clock) / 1000 / self.speed)
+        self.clock = until
+
+    async def act(self, prop, value):
+        self._set(prop, value)
+        await self.dispatch({prop})
+
+    # User actions
+
+    async def drag(self):
+        """Drag the slider across a few years, a change every 100-300 ms."""
+        marks = sorted(int(year) for year in self.values["year-slider.marks"] or {})
+        if not marks:
+            return
+        start = self.rng.randrange(len(marks))
+        end = min(max(start + self.rng.randint(-5, 5), 0), len(marks) - 1)
+        step = 1 if end >= start else -1
+        for i in range(start, end + step, step):
+            await self.act("year-slider.value", marks[i])
+            await self.wait(self.rng.uniform(100, 300))
+
+    async def click(self):
+        """Click a country on the map."""
+        figure = self.values["choro-map.figure"] or {}
+        texts = [text for text in (figure.get("data") or [{}])[0].get("text") or [] if text]
+        if texts:
+            await self.act("choro-map.clickData", {"points": [{"text": self.rng.choice(texts)}]})
+
+    async def reset(self):
+        """Click the map background, back to the world view."""
+        await self.act("map-container.n_clicks", (self.values["map-container.n_clicks"] or 0) + 1)
+
+    async def toggle(self):
+        """Switch the map to another view, or now and then the wealth chart's mode."""
+        radio = self.rng.choice(["switch-options"] * 3 + ["wealth-options"])
+        options = [o["value"] for o in self.values[f"{radio}.options"] or []]
+        others = [value for value in options if value != self.values[f"{radio}.value"]]
+        if others:
+            await self.act(f"{radio}.value", self.rng.choice(others))
+
+    async def inspect(self):
+        """Open a billionaire's trajectory from a wealth chart bar, or type a name and pick it."""
+        figure = self.values["wealth-chart.figure"] or {}
+        labels = list((figure.get("data") or [{}])[0].get("y") or [])
+        if not labels:
+            return
+        label = self.rng.choice(labels)
+        if self.rng.random() < 0.5:
+            await self.act("wealth-chart.clickData", {"points": [{"label": label, "y": label}]})
+            return
+        name = label.split()[-2] if len(label.split()) > 1 else label
+        for length in range(1, min(len(name), 5) + 1):
+            await self.act("person-search.search_value", name[:length])
+            await self.wait(self.rng.uniform(100, 250))
+        options = self.values["person-search.options"] or []
+        if options:
+            await self.act("person-search.value", options[0]["value"])
+
+    async def play(self):
+        """Press Play and watch the animation to the end (or pause it half-way)."""
+        enabled = set(self.due)
+        await self.act("play-button.n_clicks", (self.values["play-button.n_clicks"] or 0) + 1)
+        started = set(self.due) - enabled
+        if not started:
+            return
+        pause_after = self.rng.choice([None, None, self.rng.randint(2, 6)])
+        ticks = 0
+        while started & set(self.due) and ticks < 100:
+            if ticks == pause_after:
+                await self.act("play-button.n_clicks", self.values["play-button.n_clicks"] + 1)
+                break
+            await self.wait(min(self.intervals[i] for i in started))
+            ticks += 1
+
+    async def run(self, actions):
+        await self.load_page()
+        names, weights = zip(*ACTIONS.items())
+        for _ in range(actions):
+            await self.wait(self.rng.expovariate(1 / self.think) * 1000)
+            await getattr(self, self.rng.choices(names, weights)[0])()
+
+
+async def _user(client, dependencies, stats, rng, args, deadline, recordings):
+    """Run sessions back to back until deadline."""
+    while time.perf_counter() < deadline:
+        recording = [] if recordings is not None else None
+        session = Session(client, dependencies, stats, rng, args.think, args.speed, recording)
+        try:
+            await session.run(rng.randint(*ACTIONS_PER_SESSION))
+        except RuntimeError as exc:
+            print(f"session failed: {exc}", file=sys.stderr)
+            await asyncio.sleep(1)
+        if recording:
+            recordings.append(recording)
+
+
+async def _replay_session(client, session, stats, speed):
+    start = time.perf_counter()
+    for request in session:
+        delay = start + request["at"] / 1000 / speed - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        payload = request["payload"]
+        label = _label({"output": payload["output"]})
+        sent = time.perf_counter()
+        try:
+            response = await client.post(UPDATE_PATH, json=payload)
+        except httpx.HTTPError:
+            stats.add(label, time.perf_counter() - sent, 0, ok=False)
+            continue
+        stats.add(label, time.perf_counter() - sent, len(response.content),
+                  ok=response.status_code in (200, 204))
+
+
+def load_recording(path):
+    """Sessions of a saved recording, or of a HAR export (one session per page)."""
+    with open(path) as f:
+        data = json.load(f)
+    if "log" not in data:
+        return data["sessions"]
+    sessions = collections.defaultdict(list)
+    for entry in data["log"]["entries"]:
+        request = entry["request"]
+        if request["method"] != "POST" or not request["url"].split("?")[0].endswith(UPDATE_PATH):
+            continue
+        started = pd.Timestamp(entry["startedDateTime"])
+        sessions[entry.get("pageref")].append((started, json.loads(request["postData"]["text"])))
+    replay = []
+    for requests in sessions.values():
+        requests.sort(key=lambda request: request[0])
+        first = requests[0][0]
+        replay.append([
+            {"at": (started - first).total_seconds() * 1000, "payload": payload}
+            for started, payload in requests
+        ])
+    return replay
+
+
+async def run_load(client, args, replay=None):
+    """Run args.sessions concurrent users against client for args.duration seconds."""
+    stats = Stats()
+    recordings = [] if args.record else None
+    rng = random.Random(args.seed)
+    deadline = time.perf_counter() + args.ramp + args.duration
+
+    async def user(i):
+        await asyncio.sleep(args.ramp * i / args.sessions)
+        if replay is not None:
+            while time.perf_counter() < deadline:
+                await _replay_session(client, replay[i % len(replay)], stats, args.speed)
+            return
+        await _user(client, dependencies, stats, random.Random(rng.random()), args, deadline, recordings)
+
+    dependencies = None
+    if replay is None:
+        response = await client.get("/_dash-dependencies")
+        response.raise_for_status()
+        dependencies = response.json()
+    await asyncio.gather(*(user(i) for i in range(args.sessions)))
+    stats.stopped = time.perf_counter()
+
+    if args.record:
+        with open(args.record, "w") as f:
+            json.dump({"sessions": recordings}, f)
+    return stats
+
+
+class _ThreadedWSGIClient:
+    """httpx.AsyncClient stand-in that calls a WSGI app on worker threads."""
+
+    def __init__(self, wsgi_app, threads):
+        self.client = httpx.Client(transport=httpx.WSGITransport(app=wsgi_app), base_url="http://localhost")
+        self.pool = concurrent.futures.ThreadPoolExecutor(threads)
+
+    async def request(self, method, url, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.pool, lambda: self.client.request(method, url, **kwargs))
+
+    async def get(self, url, **kwargs):
+        return await self.request("GET", url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request("POST", url, **kwargs)
+
+    async def aclose(self):
+        self.pool.shutdown()
+        self.client.close()
+
+
+async def _run_target(base_url, args, replay):
+    if base_url is None:
+        # Imported here: importing app loads the real dataset
+        from app import server
+        client = _ThreadedWSGIClient(server, args.sessions)
+    else:
+        limits = httpx.Limits(max_connections=args.sessions)
+        client = httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120)
+    try:
+        return await run_load(client, args, replay)
+    finally:
+        await client.aclose()
+
+
+def _print(title, report):
+    print(f"\n{title}")
+    with pd.option_context("display.max_rows", None, "display.width", 200):
+        print(report.to_string(index=False))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=60, help="seconds of load after the ramp-up")
+    parser.add_argument("--ramp", type=float, default=5, help="seconds over which the users start")
+    parser.add_argument("--think", type=float, default=2.0, help="mean seconds between a user's actions")
+    parser.add_argument("--speed", type=float, default=1.0, help="play think times and intervals this much faster")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="load an already running server")
+    parser.add_argument("--workers", type=int, nargs="+", help="start gunicorn with each worker count")
+    parser.add_argument("--cache-modes", nargs="+", default=None,
+                        help="BILLIONAIRE_RESPONSE_CACHE values to run --workers with, e.g. disk memory ''")
+    parser.add_argument("--port", type=int, default=8865)
+    parser.add_argument("--record", metavar="FILE", help="save the simulated sessions' payloads")
+    parser.add_argument("--replay", metavar="FILE", help="replay a saved recording or a HAR export")
+    parser.add_argument("--save", metavar="FILE", help="write the reports as JSON")
+    args = parser.parse_args(argv)
+    if args.url and args.workers:
+        parser.error("--url and --workers are exclusive")
+    if args.cache_modes is not None and not args.workers:
+        parser.error("--cache-modes needs --workers")
+
+    replay = load_recording(args.replay) if args.replay else None
+    if replay is not None and not replay:
+        parser.error(f"no {UPDATE_PATH} requests in {args.replay}")
+
+    reports = {}
+    if args.workers:
+        port = args.port
+        for workers in args.workers:
+            for mode in args.cache_modes if args.cache_modes is not None else [None]:
+                env = {} if mode is None else {"BILLIONAIRE_RESPONSE_CACHE": mode}
+                title = f"workers={workers}" + ("" if mode is None else f" cache={mode or 'off'}")
+                with serve(workers, port, env) as (base_url, _):
+                    stats = asyncio.run(_run_target(base_url, args, replay))
+                port += 1  # a stopped server can hold its port for a while
+                reports[title] = stats.report()
+                _print(title, reports[title])
+    else:
+        title = args.url or "in-process"
+        reports[title] = asyncio.run(_run_target(args.url, args, replay)).report()
+        _print(title, reports[title])
+
+    if len(reports) > 1:
+        summary = pd.DataFrame([
+            {"target": title, **report[report["callback"] == "all"].iloc[0].drop("callback").to_dict()}
+            for title, report in reports.items()
+        ])
+        _print("All requests by target:", summary)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({title: report.to_dict("records") for title, report in reports.items()}, f, indent=1)
+
+    errors = sum(int(report["errors"].sum()) for report in reports.values())
+    return 1 if errors else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
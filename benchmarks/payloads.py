@@ -0,0 +1,120 @@
+"""
+Byte sizes of the figures and callback responses, against payload budgets.
+
+For each figure the report gives the JSON size of the plain go.Figure, of
+the compact form the app sends (serialize_figure) and of that compressed
+with gzip and, if the brotli package is installed, brotli. Callback
+responses are requested through the app with Accept-Encoding: gzip, so
+their size is what goes over the wire. A case whose gzip size exceeds its
+entry in BUDGETS fails the run (exit code 1).
+
+Usage:
+    python -m benchmarks.payloads [--year YEAR] [--country COUNTRY] [--save FILE]
+"""
+import argparse
+import gzip
+import json
+import sys
+
+import pandas as pd
+import plotly.io as pio
+
+from modules.callbacks.compression import brotli
+from modules.config import COMPRESSION_LEVELS, MAP_VIEW_LABELS
+from modules.visualizations import create_treemap, create_wealth_chart, serialize_figure
+from modules.visualizations import world_map as wm
+from .run import SAMPLE_COUNTRY, _clear_caches, callback_cases
+
+# Gzip bytes per case; raise one deliberately when a payload is meant to grow
+BUDGETS = {
+    'wealth_chart': 2_000,
+    'wealth_chart[country]': 2_000,
+    'world_map[billionaire_count]': 3_500,
+    'world_map[percent_of_gdp]': 3_500,
+    'world_map[billionaires_per_million]': 3_500,
+    'world_map[wealth_per_capita]': 3_500,
+    'treemap': 70_000,
+    'treemap[country]': 20_000,
+    'callback:update_dashboard': 75_000,
+    'callback:update_dashboard[year]': 75_000,
+    'callback:load_animation_frames': 450_000,
+    'callback:update_selected_country': 1_000,
+}
+
+COLUMNS = ['case', 'figure_json', 'compact_json', 'gzip', 'brotli', 'budget', 'over_budget']
+
+
+def _sizes(case, body, figure_json=None):
+    return {
+        'case': case,
+        'figure_json': figure_json,
+        'compact_json': len(body),
+        'gzip': len(gzip.compress(body, compresslevel=COMPRESSION_LEVELS['gzip'])),
+        'brotli': len(brotli.compress(body, quality=COMPRESSION_LEVELS['br'])) if brotli else None,
+    }
+
+
+def figure_cases(data_index, year, country):
+    """(case, go.Figure) for each chart in its world and country form."""
+    yield 'wealth_chart', create_wealth_chart(data_index.leaderboard(year))
+    yield 'wealth_chart[country]', create_wealth_chart(data_index.leaderboard(year, country))
+    for view_type in MAP_VIEW_LABELS:
+        min_val, max_val = data_index.color_range(view_type)
+        yield f'world_map[{view_type}]', wm.create_world_map(
+            view_type, data_index.country_stats(year), data_index.scatter(year), min_val, max_val
+        )
+    yield 'treemap', create_treemap(data_index.treemap(year))
+    yield 'treemap[country]', create_treemap(data_index.treemap(year, country))
+
+
+def payload_report(app, data_index, year, country):
+    """Size rows for every figure and callback response."""
+    rows = []
+    for case, figure in figure_cases(data_index, year, country):
+        compact = pio.to_json(serialize_figure(figure), validate=False).encode()
+        rows.append(_sizes(case, compact, len(pio.to_json(figure, validate=False))))
+
+    client = app.server.test_client()
+    for case, payload in callback_cases(app, data_index):
+        _clear_caches()
+        response = client.post('/_dash-update-component', json=payload)
+        row = _sizes(case, response.get_data())
+        wire = client.post('/_dash-update-component', json=payload, headers={'Accept-Encoding': 'gzip'})
+        row['gzip'] = len(wire.get_data())
+        rows.append(row)
+
+    for row in rows:
+        row['budget'] = BUDGETS.get(row['case'])
+        row['over_budget'] = 'OVER' if row['budget'] and row['gzip'] > row['budget'] else ''
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--year', type=int, help="year of the figures (default: the last one)")
+    parser.add_argument('--country', default=SAMPLE_COUNTRY, help="country of the [country] cases")
+    parser.add_argument('--save', metavar='FILE', help="write the report as JSON")
+    args = parser.parse_args(argv)
+
+    # Imported here: importing app loads the real dataset
+    from app import app, data_index
+
+    year = args.year if args.year is not None else data_index.years[-1]
+    rows = payload_report(app, data_index, year, args.country)
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'year': year, 'country': args.country, 'results': rows}, f, indent=1)
+
+    report = pd.DataFrame(rows, columns=COLUMNS).astype({'figure_json': 'Int64', 'brotli': 'Int64'})
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(report.to_string(index=False))
+
+    over = sum(1 for row in rows if row['over_budget'])
+    if over:
+        print(f"\n{over} case(s) over their payload budget", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,327 @@
+"""
+Benchmarks for data loading, figure builders and callbacks.
+
+Each case reports its median and best wall time, the peak memory allocated
+while it runs (tracemalloc, measured in a separate run) and the size of the
+JSON it produces. Callbacks are invoked through the app's
+/_dash-update-component endpoint with Flask's test client, so the figures
+are built, serialized and sent exactly as for a browser request.
+
+Usage:
+    python -m benchmarks.run [--scale N ...] [--extra-years N] [--repeat N]
+                             [--save FILE] [--compare FILE] [--threshold FRACTION]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+import dash
+import numpy as np
+import pandas as pd
+import plotly
+import plotly.io as pio
+
+from modules.callbacks.figure_cache import figure_caches
+from modules.callbacks.world_map import build_world_map
+from modules.config import MAP_VIEW_LABELS, WEALTH_CHART_MODES
+from modules.data import DataIndex, load_and_preprocess_data
+from modules.data.build import DATA_DIR
+from modules.visualizations import create_treemap, create_wealth_chart, serialize_figure
+from .synthetic import dataset_name, generate
+
+BENCHMARK_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_ROOT = os.path.join(BENCHMARK_DIR, '.data')
+
+# Country used for the per-country cases
+SAMPLE_COUNTRY = 'United States'
+
+# A metric only counts as a regression if it also grew by more than this
+NOISE_FLOOR = {'median_ms': 1.0, 'peak_mb': 0.5, 'json_kb': 0.5}
+
+COLUMNS = ['dataset', 'case', 'median_ms', 'min_ms', 'peak_mb', 'json_kb']
+
+
+def measure(fn, repeat, setup=None, memory=True):
+    """Time fn() repeat times, then measure its peak allocation in one more run.
+
+    Returns (last result, wall times in seconds, peak bytes or None).
+    """
+    times = []
+    result = None
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+
+    peak = None
+    if memory:
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            fn()
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result, times, peak
+
+
+def figure_bytes(figure):
+    """Size of a figure serialized the way Dash sends it."""
+    return len(pio.to_json(figure, validate=False))
+
+
+def _result(dataset, case, times, peak, size=None):
+    return {
+        'dataset': dataset,
+        'case': case,
+        'median_ms': round(statistics.median(times) * 1000, 3),
+        'min_ms': round(min(times) * 1000, 3),
+        'peak_mb': None if peak is None else round(peak / 2**20, 3),
+        'json_kb': None if size is None else round(size / 1024, 3),
+    }
+
+
+def _sample_inputs(data_index):
+    """Values sent for each callback input/state, keyed by 'id.property'."""
+    richest = data_index.leaderboard(data_index.years[-1]).iloc[0]
+    return {
+        'selected-year.data': data_index.years[-1],
+        'selected-country.children': None,
+        'switch-options.value': next(iter(MAP_VIEW_LABELS)),
+        'wealth-options.value': next(iter(WEALTH_CHART_MODES)),
+        'play-button.n_clicks': 1,
+        'animation-frames.modified_timestamp': -1,
+        'animation-frames-request.data': data_index.version,
+        'year-rows-request.data': {'year': data_index.years[-1], 'version': data_index.version},
+        'choro-map.clickData': {'points': [{'text': f'{SAMPLE_COUNTRY}<br>Billionaire Count: 1'}]},
+        'map-container.n_clicks': None,
+        'data-version.data': data_index.version,
+        'data-version.modified_timestamp': -1,
+        'data-version-interval.n_intervals': 1,
+        'year-slider.value': data_index.years[-1],
+        'person-search.search_value': richest['full_name'].split()[-1][:4],
+        'person-search.value': data_index.people.ids[data_index.people.code(richest['full_name'])],
+        'wealth-chart.clickData': {'points': [{'label': richest['name_with_flag']}]},
+        'industrytreemap.clickData': None,
+    }
+
+
+def _outputs(output):
+    """Output spec of a callback_map key, as the renderer sends it."""
+    def spec(part):
+        component_id, prop = part.split('@')[0].rsplit('.', 1)
+        return {'id': component_id, 'property': prop}
+
+    if output.startswith('..'):
+        return [spec(part) for part in output.strip('.').split('...')]
+    return spec(output)
+
+
+def _payload(output, callback, values, changed):
+    def props(dependencies):
+        return [
+            {'id': d['id'], 'property': d['property'], 'value': values[f"{d['id']}.{d['property']}"]}
+            for d in dependencies
+        ]
+
+    return {
+        'output': output,
+        'outputs': _outputs(output),
+        'inputs': props(callback['inputs']),
+        'state': props(callback['state']),
+        'changedPropIds': changed,
+    }
+
+
+def callback_cases(app, data_index):
+    """(case, payload) for every server-side callback.
+
+    Each callback is run as a full render (every input changed) and, if it
+    takes the selected year, as a year-only step of the slider.
+    """
+    values = _sample_inputs(data_index)
+    for output, callback in app.callback_map.items():
+        if 'callback' not in callback:
+            continue  # clientside
+        name = callback['callback'].__name__
+        input_ids = [f"{d['id']}.{d['property']}" for d in callback['inputs']]
+        missing = [prop for prop in input_ids + [f"{d['id']}.{d['property']}" for d in callback['state']]
+                   if prop not in values]
+        if missing:
+            print(f"callback:{name}: skipped, no sample value for {', '.join(missing)}", file=sys.stderr)
+            continue
+
+        yield f'callback:{name}', _payload(output, callback, values, input_ids)
+        if 'selected-year.data' in input_ids and len(input_ids) > 1:
+            yield f'callback:{name}[year]', _payload(output, callback, values, ['selected-year.data'])
+
+
+def _clear_caches():
+    # Every call should do the work, not hit a figure or response cache. The
+    # app is built with a memory response cache, so this never clears the
+    # disk or Redis cache the running workers share.
+    for cache in figure_caches().values():
+        cache.invalidate()
+
+
+def run_dataset(label, data_dir, cache_dir, repeat, memory=True):
+    """Run every benchmark case against the CSVs in data_dir."""
+    # Imported here: importing app loads the real dataset
+    from app import create_app
+
+    results = []
+
+    def bench(case, fn, size=None, setup=None):
+        result, times, peak = measure(fn, repeat, setup, memory)
+        results.append(_result(label, case, times, peak, size(result) if size else None))
+        print(f"{label:>10} {case:<40} {results[-1]['median_ms']:>10.1f} ms", file=sys.stderr)
+        return result
+
+    # Loading
+    bench('load_and_preprocess_data[parse]', lambda: load_and_preprocess_data(False, data_dir))
+    load_and_preprocess_data(True, data_dir, cache_dir)  # make sure the column cache exists
+    df, bill_df, scatter_data = bench(
+        'load_and_preprocess_data[cached]', lambda: load_and_preprocess_data(True, data_dir, cache_dir)
+    )
+    data_index = bench('DataIndex', lambda: DataIndex(df, bill_df, scatter_data))
+
+    # Figure builders
+    year = data_index.years[-1]
+    for country, suffix in ((None, ''), (SAMPLE_COUNTRY, '[country]')):
+        bench(f'create_wealth_chart{suffix}',
+              lambda: serialize_figure(create_wealth_chart(data_index.leaderboard(year, country))),
+              figure_bytes)
+        bench(f'create_treemap{suffix}',
+              lambda: serialize_figure(create_treemap(data_index.treemap(year, country))), figure_bytes)
+    for view_type in MAP_VIEW_LABELS:
+        bench(f'create_world_map[{view_type}]',
+              lambda: build_world_map(data_index, year, view_type), figure_bytes)
+
+    # Name index lookups
+    people = data_index.people
+    richest = data_index.leaderboard(year).iloc[0]['full_name']
+    bench('PeopleIndex.search[prefix]', lambda: people.search(richest.split()[-1][:4]))
+    bench('PeopleIndex.search[fuzzy]', lambda: people.search(richest.split()[-1][::-1]))
+    bench('PeopleIndex.trajectory', lambda: people.trajectory(people.code(richest)))
+
+    # Callbacks, through the Dash request handler
+    app = create_app(data_index, response_cache='memory')
+    client = app.server.test_client()
+
+    def post(payload):
+        response = client.post('/_dash-update-component', json=payload)
+        if response.status_code not in (200, 204):
+            raise RuntimeError(f"{payload['output']}: HTTP {response.status_code}")
+        return response
+
+    for case, payload in callback_cases(app, data_index):
+        bench(case, lambda: post(payload), lambda response: len(response.data), _clear_caches)
+
+    return results
+
+
+def compare(results, baseline, threshold):
+    """Add the change against baseline to each result and flag regressions.
+
+    A metric regresses when it grew by more than threshold (a fraction) and
+    by more than its NOISE_FLOOR. Returns the number of regressed cases.
+    """
+    previous = {(r['dataset'], r['case']): r for r in baseline['results']}
+    regressions = 0
+    for result in results:
+        base = previous.get((result['dataset'], result['case']))
+        if base is None:
+            result['vs_baseline'], result['regression'] = 'new', ''
+            continue
+        change = result['median_ms'] / base['median_ms'] - 1 if base['median_ms'] else 0.0
+        result['vs_baseline'] = f'{change:+.1%}'
+        regressed = [
+            metric for metric, floor in NOISE_FLOOR.items()
+            if result[metric] is not None and base.get(metric) is not None
+            and result[metric] > base[metric] * (1 + threshold)
+            and result[metric] - base[metric] > floor
+        ]
+        result['regression'] = ','.join(regressed)
+        regressions += bool(regressed)
+    return regressions
+
+
+def _metadata(args):
+    return {
+        'created': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'versions': {
+            'dash': dash.__version__,
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'plotly': plotly.__version__,
+        },
+        'scale': args.scale,
+        'extra_years': args.extra_years,
+        'repeat': args.repeat,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scale', type=int, nargs='+', default=[1],
+                        help="billionaire row multipliers to benchmark, e.g. 1 10 100")
+    parser.add_argument('--extra-years', type=int, default=0, help="synthetic years added after the last one")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the synthetic data")
+    parser.add_argument('--repeat', type=int, default=3, help="timed runs per case")
+    parser.add_argument('--no-memory', action='store_true', help="skip the peak memory run")
+    parser.add_argument('--data-root', default=DATA_ROOT, help="directory for the synthetic datasets")
+    parser.add_argument('--save', metavar='FILE', help="write the results as a JSON baseline")
+    parser.add_argument('--compare', metavar='FILE', help="compare against a saved baseline")
+    parser.add_argument('--threshold', type=float, default=0.25,
+                        help="relative growth flagged as a regression (default: 0.25)")
+    args = parser.parse_args(argv)
+
+    results = []
+    for scale in args.scale:
+        label = f'x{scale}' + (f'+{args.extra_years}y' if args.extra_years else '')
+        dataset_dir = os.path.join(args.data_root, dataset_name(scale, args.extra_years, args.seed))
+        if scale == 1 and not args.extra_years:
+            data_dir = DATA_DIR
+        else:
+            data_dir = generate(dataset_dir, scale, args.extra_years, args.seed)
+        cache_dir = os.path.join(dataset_dir, '.cache')
+        results += run_dataset(label, data_dir, cache_dir, args.repeat, memory=not args.no_memory)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({'meta': _metadata(args), 'results': results}, f, indent=1)
+
+    columns = COLUMNS
+    regressions = 0
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.threshold)
+        columns = COLUMNS + ['vs_baseline', 'regression']
+
+    report = pd.DataFrame(results, columns=columns)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(report.to_string(index=False))
+        if len(args.scale) > 1:
+            print("\nMedian ms by dataset size:")
+            print(report.pivot(index='case', columns='dataset', values='median_ms')
+                  [report['dataset'].unique()].to_string())
+
+    if regressions:
+        print(f"\n{regressions} case(s) regressed by more than {args.threshold:.0%}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
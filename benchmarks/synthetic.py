@@ -0,0 +1,88 @@
+"""
+Synthetic scale-up of the Billionaires Dashboard datasets.
+
+Copies the billionaires and World Bank inputs with extra years and scale
+times as many billionaires per year, then runs the data build pipeline on
+them so every CSV the app reads is consistent with the synthetic rows.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from modules.data.build import BILLIONAIRES_UPDATED, COUNTRY_DATA, DATA_DIR, SCATTER, WORLD_BANK, build
+
+# Fractional range of the original net worth given to each synthetic copy
+COPY_NET_WORTH = (0.2, 1.0)
+
+# Mean yearly growth of net worth in the added years
+YEARLY_GROWTH = 1.05
+
+
+def _add_years(df, extra_years, rng):
+    """Append extra_years copies of the last year, with net worth drifting upwards."""
+    last_year = df['year'].max()
+    last = df[df['year'] == last_year]
+    years = [df]
+    for offset in range(1, extra_years + 1):
+        drift = YEARLY_GROWTH ** offset * rng.lognormal(0, 0.1, len(last))
+        years.append(last.assign(
+            year=last_year + offset,
+            net_worth=(last['net_worth'] * drift).round(1),
+            age=last['age'] + offset,
+        ))
+    return pd.concat(years, ignore_index=True)
+
+
+def _scale_rows(df, scale, rng):
+    """scale copies of every row, the extra ones with numbered names and less net worth."""
+    copies = [df]
+    for copy in range(2, scale + 1):
+        low, high = COPY_NET_WORTH
+        copies.append(df.assign(
+            full_name=df['full_name'] + f' ({copy})',
+            net_worth=(df['net_worth'] * rng.uniform(low, high, len(df))).round(1).clip(lower=1.0),
+        ))
+    return pd.concat(copies, ignore_index=True)
+
+
+def _extend_world_bank(world_bank, last_year):
+    """Repeat each country's latest World Bank row for the years up to last_year."""
+    max_year = world_bank['year'].max()
+    if last_year <= max_year:
+        return world_bank
+    latest = world_bank.sort_values('year', ascending=False, kind='stable').drop_duplicates('country_name')
+    added = [latest.assign(year=year) for year in range(max_year + 1, last_year + 1)]
+    return pd.concat([world_bank, *added], ignore_index=True)
+
+
+def dataset_name(scale, extra_years, seed=0):
+    """Directory name of a synthetic dataset."""
+    return f'x{scale}-y{extra_years}-s{seed}'
+
+
+def generate(out_dir, scale=1, extra_years=0, seed=0, source_dir=DATA_DIR, force=False):
+    """Write a synthetic copy of the app's CSVs to out_dir.
+
+    Every year keeps the original billionaires plus scale - 1 renamed copies,
+    and extra_years years are added after the last one. Existing output is
+    reused unless force is set. Returns out_dir.
+    """
+    outputs = [os.path.join(out_dir, name) for name in (COUNTRY_DATA, SCATTER)]
+    if not force and all(os.path.exists(path) for path in outputs):
+        return out_dir
+
+    os.makedirs(out_dir, exist_ok=True)
+    rng = np.random.default_rng(seed)
+
+    df = pd.read_csv(os.path.join(source_dir, BILLIONAIRES_UPDATED), low_memory=False)
+    df = _scale_rows(_add_years(df, extra_years, rng), scale, rng)
+    df['rank'] = df.groupby('year')['net_worth'].rank(ascending=False, method='min')
+    df.to_csv(os.path.join(out_dir, BILLIONAIRES_UPDATED), index=False)
+
+    world_bank = pd.read_csv(os.path.join(source_dir, WORLD_BANK))
+    world_bank = _extend_world_bank(world_bank, df['year'].max())
+    world_bank.to_csv(os.path.join(out_dir, WORLD_BANK), index=False)
+
+    build(out_dir, stages=['country_data', 'country_stats', 'scatter'], force=True)
+    return out_dir
@@ -0,0 +1,115 @@
+"""
+Memory of the app under gunicorn as the number of workers grows.
+
+Starts gunicorn with each worker count, sends every callback request a few
+times so all workers have served real traffic, then sums the proportional
+set size (PSS: shared pages split between the processes sharing them) of the
+master and its workers.
+
+Usage:
+    python -m benchmarks.workers [--workers N ...] [--requests N] [--no-shared]
+"""
+import argparse
+import contextlib
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import psutil
+
+from .run import callback_cases
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _wait_until_up(url, process, timeout=120):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"gunicorn exited with code {process.returncode}")
+        try:
+            urllib.request.urlopen(url, timeout=5).read()
+            return
+        except OSError:  # refused, reset or timed out while starting
+            time.sleep(0.5)
+    raise TimeoutError(f"{url} not up after {timeout}s")
+
+
+def _post(url, payload):
+    request = urllib.request.Request(
+        url, data=json.dumps(payload).encode(), headers={"Content-Type": "application/json"}
+    )
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.read()
+
+
+def _pss_mb(process):
+    total = 0
+    for proc in [process, *process.children(recursive=True)]:
+        try:
+            total += proc.memory_full_info().pss
+        except psutil.NoSuchProcess:
+            pass
+    return total / 2**20
+
+
+@contextlib.contextmanager
+def serve(workers, port, env=None):
+    """Run gunicorn with this many workers on port; yields (base URL, its Popen)."""
+    env = dict(os.environ, **(env or {}), GUNICORN_BIND=f"127.0.0.1:{port}")
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "--workers", str(workers), "app:server"],
+        cwd=REPO_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        base = f"http://127.0.0.1:{port}"
+        _wait_until_up(base + "/_dash-layout", process)
+        yield base, process
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def measure_workers(workers, payloads, requests_per_callback, shared, port):
+    """Total PSS in MiB of gunicorn with this many workers, after serving traffic."""
+    env = {"BILLIONAIRE_SHARED_DATA": "1" if shared else "0"}
+    with serve(workers, port, env) as (base, process):
+        for _ in range(requests_per_callback * workers):
+            for payload in payloads:
+                _post(base + "/_dash-update-component", payload)
+        return _pss_mb(psutil.Process(process.pid))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, 8])
+    parser.add_argument("--requests", type=int, default=3, help="requests per callback and worker")
+    parser.add_argument("--no-shared", action="store_true", help="also measure without SHARED_DATA")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args(argv)
+
+    # Imported here: importing app loads the real dataset
+    from app import app, data_index
+
+    # The animation frames are large and built once per worker; leave them out
+    payloads = [
+        payload for case, payload in callback_cases(app, data_index)
+        if "load_animation_frames" not in case
+    ]
+
+    modes = [True, False] if args.no_shared else [True]
+    print(f"{'workers':>8} " + " ".join(f"{'shared' if m else 'private':>12}" for m in modes) + "   (total PSS, MiB)")
+    port = args.port
+    for workers in args.workers:
+        sizes = []
+        for shared in modes:
+            sizes.append(measure_workers(workers, payloads, args.requests, shared, port))
+            port += 1  # a stopped server can hold its port for a while
+        print(f"{workers:>8} " + " ".join(f"{size:>12.1f}" for size in sizes))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
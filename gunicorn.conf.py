@@ -0,0 +1,37 @@
+"""
+Gunicorn settings for serving the Billionaires Dashboard.
+
+    gunicorn app:server
+
+The master process imports the app once (preload_app), loading the datasets
+from the memory-mapped column cache with SHARED_DATA and building the data
+index, and the workers are forked from it. The dataset columns are views of
+the cache files, so every worker shares the same page-cache pages, and the
+index built in the master is shared copy-on-write. Memory per extra worker
+is then only what it allocates while serving requests.
+
+Set BILLIONAIRE_SHARED_DATA=0 to have each worker load its own copy instead.
+"""
+import gc
+import os
+
+os.environ.setdefault("BILLIONAIRE_SHARED_DATA", "1")
+
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:8050")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+preload_app = os.environ["BILLIONAIRE_SHARED_DATA"] == "1"
+
+
+def when_ready(server):
+    # Move everything the master loaded out of the garbage collector's view,
+    # so collections in the workers don't write to (and copy) shared pages
+    if preload_app:
+        gc.freeze()
+
+
+def child_exit(server, worker):
+    # Drop an exited worker's live metrics when they are aggregated across workers
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,4 @@
+"""
+Read-only REST API over the dashboard datasets.
+"""
+from .routes import install_api
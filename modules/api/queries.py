@@ -0,0 +1,69 @@
+"""
+Tables served by the data API, read from the same data index as the callbacks.
+"""
+import numpy as np
+import pandas as pd
+
+BILLIONAIRE_COLUMNS = [
+    'full_name', 'net_worth', 'net_worth_constant', 'age', 'gender', 'country_of_citizenship', 'iso3c',
+    'country_of_residence', 'city_of_residence', 'organization_name', 'industry',
+]
+COUNTRY_COLUMNS = [
+    'country_of_citizenship', 'iso3c', 'billionaire_count', 'total_wealth', 'current_gdp', 'percent_of_gdp',
+    'population', 'billionaires_per_million', 'wealth_per_capita',
+]
+
+# Net worth and GDP figures are given to the hundredth of a billion
+DECIMALS = 2
+
+
+def _rounded(values, decimals=DECIMALS):
+    """values as float64 rounded to decimals (the stored columns may be float32)."""
+    return values.astype('float64').round(decimals)
+
+
+def years(data_index, year=None, country=None):
+    """Every year with data."""
+    return pd.DataFrame({'year': data_index.years})
+
+
+def billionaires(data_index, year, country=None):
+    """Billionaires of a year (optionally of one country), richest first.
+
+    rank is the position within that year and country.
+    """
+    rows = data_index.billionaires(year, country).sort_values('net_worth', ascending=False, kind='stable')
+    table = rows[BILLIONAIRE_COLUMNS].reset_index(drop=True)
+    table['net_worth'] = _rounded(table['net_worth'])
+    table['net_worth_constant'] = _rounded(table['net_worth_constant'])
+    table.insert(0, 'rank', np.arange(1, len(table) + 1))
+    return table
+
+
+def countries(data_index, year, country=None):
+    """Billionaire count, wealth, share of GDP and per-capita figures per country, most billionaires first."""
+    rows = data_index.country_stats(year, country).sort_values(
+        ['billionaire_count', 'total_wealth'], ascending=False, kind='stable'
+    )
+    table = rows[COUNTRY_COLUMNS].reset_index(drop=True)
+    for column in ('total_wealth', 'current_gdp', 'percent_of_gdp'):
+        table[column] = _rounded(table[column])
+    table['billionaires_per_million'] = _rounded(table['billionaires_per_million'], 4)
+    table['wealth_per_capita'] = _rounded(table['wealth_per_capita'])
+    return table
+
+
+def industries(data_index, year, country=None):
+    """Billionaire count and wealth per industry, wealthiest first."""
+    rows = data_index.billionaires(year, country)
+    table = (
+        rows.groupby('industry', observed=True, sort=False)['net_worth']
+        .agg(billionaire_count='size', total_net_worth='sum')
+        .sort_values('total_net_worth', ascending=False, kind='stable')
+        .reset_index()
+    )
+    table['industry'] = table['industry'].astype(object)
+    total_net_worth = table['total_net_worth'].astype('float64')
+    table['share_of_wealth'] = _rounded(total_net_worth / total_net_worth.sum(), 4)
+    table['total_net_worth'] = _rounded(total_net_worth)
+    return table
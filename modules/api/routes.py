@@ -0,0 +1,166 @@
+"""
+Paginated, cached JSON and Arrow endpoints on the Dash app's Flask server.
+
+    GET /api/v1/years
+    GET /api/v1/billionaires?year=2015[&country=Germany]
+    GET /api/v1/countries?year=2015[&country=Germany]
+    GET /api/v1/industries?year=2015[&country=Germany]
+
+Pages are selected with limit (default API_PAGE_SIZE, at most
+API_MAX_PAGE_SIZE) and offset; the total row count and the next page are in
+the X-Total-Count and Link headers, and in the JSON body. format=arrow (or
+Accept: application/vnd.apache.arrow.stream) returns an Arrow IPC stream,
+which needs the optional pyarrow package.
+
+Every response carries an ETag derived from the data and code versions
+and the request, so a revalidation with If-None-Match is answered with a 304
+without running the query. Encoded pages are kept in an LRU cache.
+"""
+import hashlib
+import json
+from urllib.parse import urlencode
+
+from flask import Blueprint, Response, jsonify, request
+from modules.callbacks.figure_cache import FigureCache
+from modules.callbacks.response_cache import CODE_VERSION
+from modules.config import (
+    API_CACHE_SIZE,
+    API_ENABLED,
+    API_MAX_AGE,
+    API_MAX_PAGE_SIZE,
+    API_PAGE_SIZE,
+    API_PREFIX,
+)
+from . import queries
+
+ARROW_MIMETYPE = "application/vnd.apache.arrow.stream"
+
+# name -> (query, whether it takes a year)
+ENDPOINTS = {
+    "years": (queries.years, False),
+    "billionaires": (queries.billionaires, True),
+    "countries": (queries.countries, True),
+    "industries": (queries.industries, True),
+}
+
+# Encoded pages only depend on the request and the data, like the figures
+api_cache = FigureCache(maxsize=API_CACHE_SIZE, name="api")
+
+
+class ApiError(Exception):
+    """A request the API can't answer, with its HTTP status."""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_arg(name, default, minimum=0, maximum=None):
+    value = request.args.get(name)
+    if value is None:
+        return default
+    try:
+        value = int(value)
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer") from None
+    if value < minimum or (maximum is not None and value > maximum):
+        bounds = f"between {minimum} and {maximum}" if maximum is not None else f"at least {minimum}"
+        raise ApiError(400, f"{name} must be {bounds}")
+    return value
+
+
+def _year_arg(data_index):
+    if "year" not in request.args:
+        raise ApiError(400, "year is required")
+    year = _int_arg("year", None)
+    if year not in data_index.years:
+        raise ApiError(404, f"no data for {year}")
+    return year
+
+
+def _format_arg():
+    name = request.args.get("format")
+    if name is None:
+        best = request.accept_mimetypes.best_match(["application/json", ARROW_MIMETYPE])
+        return "arrow" if best == ARROW_MIMETYPE else "json"
+    if name not in ("json", "arrow"):
+        raise ApiError(400, "format must be json or arrow")
+    return name
+
+
+def _next_url(params, offset, limit, total):
+    if offset + limit >= total:
+        return None
+    return f"{request.path}?{urlencode({**params, 'limit': limit, 'offset': offset + limit})}"
+
+
+def _arrow(frame):
+    try:
+        import pyarrow as pa
+    except ImportError:
+        raise ApiError(406, "Arrow output needs the pyarrow package") from None
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _encode(frame, params, offset, limit, fmt):
+    """(body, total, next URL) of one page of frame; params are the request's filters."""
+    total = len(frame)
+    page = frame.iloc[offset:offset + limit]
+    next_url = _next_url(params, offset, limit, total)
+    if fmt == "arrow":
+        return _arrow(page), total, next_url
+    meta = json.dumps({"total": total, "offset": offset, "limit": limit, "next": next_url}, separators=(",", ":"))
+    records = page.to_json(orient="records", force_ascii=False)
+    return f'{{"data":{records},{meta[1:]}'.encode(), total, next_url
+
+
+def _headers(etag, total=None, next_url=None):
+    headers = {"ETag": f'"{etag}"', "Cache-Control": f"public, max-age={API_MAX_AGE}", "Vary": "Accept"}
+    if total is not None:
+        headers["X-Total-Count"] = str(total)
+    if next_url is not None:
+        headers["Link"] = f'<{next_url}>; rel="next"'
+    return headers
+
+
+def install_api(app, data):
+    """Serve the read-only data API for data, the app's DataHandle, under API_PREFIX."""
+    if not API_ENABLED:
+        return
+    api = Blueprint("api", __name__, url_prefix=app.config.routes_pathname_prefix.rstrip("/") + API_PREFIX)
+
+    @api.errorhandler(ApiError)
+    def api_error(error):
+        return jsonify(error=error.message), error.status
+
+    @api.get("/<name>")
+    def table(name):
+        if name not in ENDPOINTS:
+            raise ApiError(404, f"unknown endpoint {name!r}, expected one of {', '.join(ENDPOINTS)}")
+        query, takes_year = ENDPOINTS[name]
+        data_index = data.current
+        year = _year_arg(data_index) if takes_year else None
+        country = request.args.get("country") or None
+        limit = _int_arg("limit", API_PAGE_SIZE, minimum=1, maximum=API_MAX_PAGE_SIZE)
+        offset = _int_arg("offset", 0)
+        fmt = _format_arg()
+
+        key = (name, year, country, limit, offset, fmt)
+        etag = hashlib.sha256(repr((data_index.version, CODE_VERSION, key)).encode()).hexdigest()[:32]
+        if request.if_none_match.contains_weak(etag):
+            return Response(status=304, headers=_headers(etag))
+
+        params = {"year": year, "country": country, "format": fmt if fmt == "arrow" else None}
+        params = {param: value for param, value in params.items() if value is not None}
+        body, total, next_url = api_cache.get(
+            data_index, key, lambda: _encode(query(data_index, year, country), params, offset, limit, fmt)
+        )
+        mimetype = ARROW_MIMETYPE if fmt == "arrow" else "application/json"
+        return Response(body, mimetype=mimetype, headers=_headers(etag, total, next_url))
+
+    app.server.register_blueprint(api)
@@ -3,4 +3,15 @@ Callback registration for the Billionaires Dashboard.
 """
 from .wealth_chart import register_wealth_chart_callbacks
 from .world_map import register_world_map_callbacks
-from .treemap import register_treemap_callbacks
\ No newline at end of file
+from .treemap import register_treemap_callbacks
+from .movers import register_movers_callbacks
+from .dashboard import register_dashboard_callbacks
+from .animation import register_animation_callbacks
+from .trajectory import register_trajectory_callbacks
+from .country_filter import register_country_filter_callbacks
+from .metrics import instrument_app
+from .response_cache import install_response_cache
+from .static_bundle import install_static_bundle
+from .compression import install_compression
+from .topology import install_topology
+from .data_reload import install_data_reload
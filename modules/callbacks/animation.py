@@ -0,0 +1,251 @@
+"""
+Callbacks for the Play animation and the year shared by the figure callbacks.
+
+With CLIENTSIDE_ANIMATION the browser loads compact per-year frames for all
+three charts once, on the first Play click, and the interval ticks are
+handled by clientside callbacks (assets/animation.js) without any server
+requests. Otherwise each tick advances the slider on the server and the
+figure callbacks re-render as usual.
+
+The frames are built once per data index in each process, on a background
+thread started by the first request after a data change, so a Play click
+usually finds them ready. The click requests them with the data version
+only, so every client gets the same shared response cache entry.
+"""
+import os
+import threading
+
+from dash import ClientsideFunction, Input, Output, State
+import dash
+from dash.exceptions import PreventUpdate
+from modules.config import CLIENTSIDE_ANIMATION, MAP_VIEW_LABELS, WEALTH_CHART_MODES
+from modules.visualizations import create_treemap, create_wealth_chart, serialize_figure
+from .figure_cache import FigureCache
+from .world_map import build_world_map, world_map_cache
+
+# Frames only depend on the data, so they are built once per data index
+animation_frames_cache = FigureCache(maxsize=1, name="animation_frames")
+# One build at a time, so a request during the background build waits for it
+_frames_lock = threading.Lock()
+
+
+def _wealth_frame(leaderboard):
+    """Bar labels plus the bar lengths and hover text of every wealth chart mode."""
+    bars = {
+        mode: serialize_figure(create_wealth_chart(leaderboard, mode))["data"][0]
+        for mode in WEALTH_CHART_MODES
+    }
+    return {
+        "y": list(next(iter(bars.values()))["y"]),
+        "x": {mode: list(bar["x"]) for mode, bar in bars.items()},
+        "customdata": {mode: list(bar.get("customdata", [])) for mode, bar in bars.items()},
+    }
+
+
+def _map_frame(figure):
+    choropleth = figure["data"][0]
+    frame = {
+        "choropleth": {
+            "locations": list(choropleth["locations"]),
+            "z": list(choropleth["z"]),
+            "text": list(choropleth["text"]),
+        },
+        "scatter": None,
+    }
+    if len(figure["data"]) > 1:
+        frame["scatter"] = figure["data"][1]
+    return frame
+
+
+def _treemap_frame(figure, palette):
+    """Encode a treemap as labels plus parent/color indices.
+
+    Every id is its parent's id + "/" + label, so ids and parents are
+    rebuilt in the browser instead of being shipped as full path strings.
+    """
+    treemap = figure["data"][0]
+    position = {node_id: i for i, node_id in enumerate(treemap["ids"])}
+    colors = []
+    for color in treemap["marker"]["colors"]:
+        if color not in palette:
+            palette[color] = len(palette)
+        colors.append(palette[color])
+    return {
+        "labels": list(treemap["labels"]),
+        "parent": [position.get(parent, -1) for parent in treemap["parents"]],
+        "values": list(treemap["values"]),
+        "color": colors,
+    }
+
+
+def build_animation_frames(data_index):
+    """Build the compact world-level frames for every year."""
+    palette = {}
+    years = {}
+    for year in data_index.years:
+        years[str(year)] = {
+            "wealth": _wealth_frame(data_index.leaderboard(year)),
+            "map": {
+                view_type: _map_frame(world_map_cache.get(
+                    data_index,
+                    (year, view_type),
+                    lambda: build_world_map(data_index, year, view_type),
+                ))
+                for view_type in MAP_VIEW_LABELS
+            },
+            "treemap": _treemap_frame(serialize_figure(create_treemap(data_index.treemap(year))), palette),
+        }
+    return {"years": years, "palette": list(palette)}
+
+
+def animation_frames(data_index):
+    """The frames of data_index, built on first use."""
+    with _frames_lock:
+        return animation_frames_cache.get(
+            data_index, "frames", lambda: build_animation_frames(data_index)
+        )
+
+
+def _install_frame_warmer(app, data):
+    """Build the frames of each new data index on a background thread.
+
+    Started from the first request after a data change, so gunicorn workers
+    forked from a preloaded app each warm their own cache.
+    """
+    warmed = {"pid": None, "data_index": None}
+    lock = threading.Lock()
+
+    @app.server.before_request
+    def warm_animation_frames():
+        data_index = data.latest
+        pid = os.getpid()
+        if warmed["data_index"] is data_index and warmed["pid"] == pid:
+            return
+        with lock:
+            if warmed["data_index"] is data_index and warmed["pid"] == pid:
+                return
+            warmed.update(pid=pid, data_index=data_index)
+        threading.Thread(
+            target=animation_frames, args=(data_index,), name="animation-frames", daemon=True
+        ).start()
+
+
+def register_animation_callbacks(app, data):
+    """Register callbacks for the Play button, animation ticks and selected year."""
+    # Forward the slider to the figure callbacks, except while the browser is
+    # drawing the animation frames itself. Pausing, stopping or selecting a
+    # country catches selected-year up with the slider.
+    app.clientside_callback(
+        ClientsideFunction(namespace="animation", function_name="syncYear"),
+        Output("selected-year", "data"),
+        [
+            Input("year-slider", "value"),
+            Input("animation-interval", "disabled"),
+            Input("selected-country", "children"),
+        ],
+        [
+            State("animation-frames", "modified_timestamp"),
+            State("selected-year", "data"),
+        ],
+    )
+
+    if CLIENTSIDE_ANIMATION:
+        app.clientside_callback(
+            ClientsideFunction(namespace="animation", function_name="step"),
+            [
+                Output("year-slider", "value"),
+                Output("wealth-chart", "figure", allow_duplicate=True),
+                Output("choro-map", "figure", allow_duplicate=True),
+                Output("industrytreemap", "figure", allow_duplicate=True),
+                Output("animation-interval", "disabled"),
+                Output("play-button", "children"),
+            ],
+            [
+                Input("play-button", "n_clicks"),
+                Input("animation-interval", "n_intervals"),
+            ],
+            [
+                State("year-slider", "value"),
+                State("year-slider", "max"),
+                State("animation-interval", "disabled"),
+                State("animation-frames", "data"),
+                State("switch-options", "value"),
+                State("wealth-options", "value"),
+                State("selected-country", "children"),
+                State("wealth-chart", "figure"),
+                State("choro-map", "figure"),
+                State("industrytreemap", "figure"),
+            ],
+            prevent_initial_call=True,
+        )
+
+        # Ask for the frames on Play when they are missing or older than the
+        # data, and show a loading note until they arrive
+        app.clientside_callback(
+            ClientsideFunction(namespace="animation", function_name="requestFrames"),
+            [
+                Output("animation-frames-request", "data"),
+                Output("animation-status", "children"),
+            ],
+            [
+                Input("play-button", "n_clicks"),
+                Input("animation-frames", "modified_timestamp"),
+            ],
+            [
+                State("data-version", "modified_timestamp"),
+                State("data-version", "data"),
+                State("animation-frames-request", "data"),
+            ],
+            prevent_initial_call=True,
+        )
+
+        @app.callback(
+            Output("animation-frames", "data"),
+            Input("animation-frames-request", "data"),
+            prevent_initial_call=True,
+        )
+        def load_animation_frames(requested_version):
+            """Send the per-year frames to the browser.
+
+            Only the requested data version is an input, so the response is
+            the same (and cached once) for every client.
+            """
+            return animation_frames(data.current)
+
+        _install_frame_warmer(app, data)
+        return
+
+    @app.callback(
+        [
+            Output("year-slider", "value"),
+            Output("animation-interval", "disabled"),
+            Output("play-button", "children"),
+        ],
+        [
+            Input("play-button", "n_clicks"),
+            Input("animation-interval", "n_intervals"),
+        ],
+        [
+            State("year-slider", "value"),
+            State("year-slider", "max"),
+            State("animation-interval", "disabled"),
+        ],
+        prevent_initial_call=True,
+    )
+    def update_animation(n_clicks, n_intervals, selected_year, max_year, is_paused):
+        triggered_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+
+        # Handle play button logic
+        if triggered_id == "play-button":
+            if is_paused:
+                return selected_year, False, "Pause"
+            else:
+                return selected_year, True, "Play"
+
+        # Handle interval animation logic
+        if is_paused:
+            raise PreventUpdate
+        next_year = min(selected_year + 1, max_year)
+        if next_year == max_year:
+            return next_year, True, "Play"
+        return next_year, False, "Pause"
@@ -10,9 +10,10 @@ def register_click_data_callbacks(app):
             Input("choro-map", "clickData"),
             Input("map-container", "n_clicks")
 
-        ])
+        ],
+        State("selected-country", "children"))
     
-    def update_selected_country(clickData,n_clicks):
+    def update_selected_country(clickData,n_clicks,current_country):
         ctx = dash.callback_context
 
         if not ctx.triggered:
@@ -21,7 +22,12 @@ def register_click_data_callbacks(app):
         triggered_id = ctx.triggered[0]['prop_id'].split('.')[0]
 
         if triggered_id == 'map-container':
-            return None
+            country = None
+        else:
+            country = cd.click_data_info(clickData)
 
-        return cd.click_data_info(clickData)
+        # Re-selecting the same country would re-render the charts for nothing
+        if country == current_country:
+            return dash.no_update
+        return country
         
\ No newline at end of file
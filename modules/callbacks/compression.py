@@ -0,0 +1,119 @@
+"""
+Brotli/gzip compression of the app's responses.
+
+Callback responses are mostly JSON with long runs of repeated strings
+(treemap ids, hover text), which compress 5-10x. Responses are compressed
+with the best encoding the client accepts: brotli when the optional brotli
+package is installed, gzip otherwise. Compressed bodies are kept in a small
+LRU keyed by a digest of the body, so responses served again (from the
+response cache, or the component bundles) are not compressed again.
+"""
+import gzip
+import hashlib
+import threading
+
+from cachetools import LRUCache
+from flask import request
+from modules.config import (
+    COMPRESSIBLE_MIMETYPES,
+    COMPRESSION_CACHE_BYTES,
+    COMPRESSION_ENABLED,
+    COMPRESSION_LEVELS,
+    COMPRESSION_MIN_BYTES,
+)
+from .figure_cache import register_cache
+
+try:
+    import brotli
+except ImportError:  # optional: gzip only
+    brotli = None
+
+
+def _compress(body, encoding):
+    if encoding == "br":
+        return brotli.compress(body, quality=COMPRESSION_LEVELS["br"])
+    return gzip.compress(body, compresslevel=COMPRESSION_LEVELS["gzip"], mtime=0)
+
+
+class Compressor:
+    """Compresses response bodies, reusing the result for bodies seen before."""
+
+    def __init__(self, max_bytes):
+        self._compressed = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encodings(self):
+        """Supported encodings, preferred first."""
+        return ("br", "gzip") if brotli is not None else ("gzip",)
+
+    def compress(self, body, encoding):
+        key = (encoding, hashlib.blake2b(body, digest_size=16).digest())
+        with self._lock:
+            compressed = self._compressed.get(key)
+            if compressed is not None:
+                self.hits += 1
+                return compressed
+            self.misses += 1
+        compressed = _compress(body, encoding)
+        with self._lock:
+            if len(compressed) <= self._compressed.maxsize:
+                self._compressed[key] = compressed
+        return compressed
+
+    def invalidate(self):
+        """Drop every kept compressed body."""
+        with self._lock:
+            self._compressed.clear()
+
+    def stats(self):
+        """Hit/miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def _accepted_encoding(compressor):
+    for encoding in compressor.encodings():
+        if request.accept_encodings.quality(encoding) > 0:
+            return encoding
+    return None
+
+
+def install_compression(app):
+    """Compress app's responses for clients that accept it.
+
+    Install before the response cache: after_request hooks run in reverse
+    order, so the cache then stores the uncompressed bodies.
+    """
+    if not COMPRESSION_ENABLED:
+        return None
+    compressor = Compressor(COMPRESSION_CACHE_BYTES)
+    register_cache("compressed", compressor)
+
+    @app.server.after_request
+    def compress_response(response):
+        if (
+            response.status_code != 200
+            or response.direct_passthrough
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = _accepted_encoding(compressor)
+        if encoding is None:
+            return response
+        body = response.get_data()
+        if len(body) < COMPRESSION_MIN_BYTES:
+            return response
+
+        response.set_data(compressor.compress(body, encoding))
+        response.headers["Content-Encoding"] = encoding
+        # The compressed body differs byte for byte; keep the tag, but weak
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+    return compressor
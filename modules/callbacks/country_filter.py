@@ -0,0 +1,150 @@
+"""
+Callbacks for filtering the charts by country in the browser.
+
+A country click only narrows the selected year down to that country's
+billionaires, so with CLIENTSIDE_COUNTRY_FILTER a clientside callback
+(assets/country_filter.js) redraws the wealth chart, treemap and movers
+panel from the year's compact rows when a country is clicked or the map is
+cleared. The rows are fetched on the first click in a year (through the
+year-rows-request store), not on every year change, so slider steps still
+cost one request and further clicks in the year cost none. The server
+callbacks take the selected country as State, so they still draw it after a
+year or mode change.
+
+The script ports the leaderboard, treemap and movers code; keep them in
+step (tests/test_country_filter.py compares the two in node).
+"""
+import numpy as np
+import pandas as pd
+from dash import ClientsideFunction, Input, Output, State
+from modules.config import (
+    CLIENTSIDE_COUNTRY_FILTER,
+    LEADERBOARD_SIZE,
+    MOVERS_SIZE,
+    TREEMAP_TOP_K,
+    YEAR_ROWS_CACHE_SIZE,
+)
+from modules.data.loader import as_float64, get_flag_emoji
+from modules.data.movers import CHANGE_COLUMNS
+from modules.visualizations.treemap import TREEMAP_COLORS
+from .figure_cache import FigureCache
+
+# Rows only depend on the data, so they are built once per (data index, year)
+year_rows_cache = FigureCache(maxsize=YEAR_ROWS_CACHE_SIZE, name="year_rows")
+
+
+def selected_country_dependency():
+    """The selected country as a dependency of the server-drawn charts.
+
+    An Input, or a State when country clicks are drawn in the browser.
+    """
+    dependency = State if CLIENTSIDE_COUNTRY_FILTER else Input
+    return dependency("selected-country", "children")
+
+
+def _floats(values):
+    return [None if value != value else value for value in np.asarray(values, dtype="float64").tolist()]
+
+
+def _ints(values):
+    return [None if value != value else int(value) for value in np.asarray(values, dtype="float64").tolist()]
+
+
+def _columns(rows, moved, countries, industries, flags):
+    """Columnar rows: names, table codes (-1 if missing), net worth and movements.
+
+    sequence is the row's position in the year-over-year movements, the
+    order the movers panel breaks ties in (None for rows it leaves out).
+    """
+    return {
+        "name": rows["full_name"].astype(str).tolist(),
+        "flag": flags.get_indexer(rows["iso3c"].astype(object)).tolist(),
+        "country": countries.get_indexer(rows["country_of_citizenship"].astype(object)).tolist(),
+        "industry": industries.get_indexer(rows["industry"].astype(object)).tolist(),
+        **{column: _floats(as_float64(rows[column])) for column in CHANGE_COLUMNS},
+        **{f"{column}_previous": _floats(moved[f"{column}_previous"]) for column in CHANGE_COLUMNS},
+        **{column: _ints(moved[column]) for column in ("rank", "rank_change", "country_rank", "country_rank_change")},
+        "newcomer": moved["newcomer"].fillna(False).astype(bool).astype(int).tolist(),
+        "sequence": _ints(moved["sequence"]),
+    }
+
+
+def build_year_rows(data_index, year):
+    """Compact rows of one year for the clientside country filter."""
+    years = data_index.years
+    position = years.index(year) if year in years else None
+    previous_year = years[position - 1] if position else None
+
+    movements = data_index.movements.assign(sequence=np.arange(len(data_index.movements)))
+    rows = data_index.billionaires(year)
+    dropouts = movements[movements["dropout"] & (movements["year"] == previous_year)]
+
+    # Tables the rows index into
+    def table(*columns):
+        return pd.Index(pd.unique(pd.concat([column.astype(object) for column in columns]).dropna()))
+
+    countries = table(rows["country_of_citizenship"], dropouts["country_of_citizenship"])
+    industries = table(rows["industry"])
+    flags = table(rows["iso3c"], dropouts["iso3c"])
+
+    return {
+        "year": year,
+        "version": data_index.version,
+        "previous_year": previous_year,
+        "size": LEADERBOARD_SIZE,
+        "movers_size": MOVERS_SIZE,
+        "top_k": TREEMAP_TOP_K,
+        "palette": list(TREEMAP_COLORS),
+        "countries": [str(country) for country in countries],
+        "industries": [str(industry) for industry in industries],
+        "flags": [get_flag_emoji(code) for code in flags],
+        "rows": _columns(rows, movements.reindex(rows.index), countries, industries, flags),
+        "dropouts": {
+            "name": dropouts["full_name"].astype(str).tolist(),
+            "flag": flags.get_indexer(dropouts["iso3c"].astype(object)).tolist(),
+            "country": countries.get_indexer(dropouts["country_of_citizenship"].astype(object)).tolist(),
+            "net_worth": _floats(dropouts["net_worth"]),
+            "sequence": dropouts["sequence"].tolist(),
+        },
+    }
+
+
+def register_country_filter_callbacks(app, data):
+    """Register the year rows store and the clientside country selection."""
+    @app.callback(
+        Output("year-rows", "data"),
+        Input("year-rows-request", "data"),
+        prevent_initial_call=True,
+    )
+    def load_year_rows(request):
+        """Send the rows of the year a country click asked for."""
+        data_index = data.current
+        year = request["year"]
+        return year_rows_cache.get(data_index, year, lambda: build_year_rows(data_index, year))
+
+    app.clientside_callback(
+        ClientsideFunction(namespace="countryFilter", function_name="selectCountry"),
+        [
+            Output("selected-country", "children"),
+            Output("wealth-chart", "figure", allow_duplicate=True),
+            Output("industrytreemap", "figure", allow_duplicate=True),
+            Output("movers-panel", "children", allow_duplicate=True),
+            Output("year-rows-request", "data"),
+        ],
+        [
+            Input("choro-map", "clickData"),
+            Input("map-container", "n_clicks"),
+            Input("year-rows", "data"),
+        ],
+        [
+            State("selected-country", "children"),
+            # The slider, not selected-year: that one stays put while the
+            # browser plays the animation frames
+            State("year-slider", "value"),
+            State("data-version", "data"),
+            State("wealth-options", "value"),
+            State("wealth-chart", "figure"),
+            State("industrytreemap", "figure"),
+        ],
+        prevent_initial_call=True,
+    )
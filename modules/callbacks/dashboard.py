@@ -0,0 +1,79 @@
+"""
+Coordinated update of every chart that follows the dashboard state.
+
+The wealth chart, world map, treemap and movers panel all depend on the
+selected year, and each also on some of the selected country, the map view
+and the wealth chart mode. Registered as separate callbacks, one slider step
+costs four requests, each looking up its year on its own. This callback
+renders all of them for one state change in a single request, and leaves
+out each chart whose own inputs didn't change (a view switch only redraws
+the map, a country click leaves it as is). The charts that are redrawn are
+built side by side (FIGURE_WORKERS). With CLIENTSIDE_COUNTRY_FILTER the
+selected country is a State: country clicks are drawn in the browser (see
+country_filter.py).
+"""
+import functools
+
+import dash
+from dash import Input, Output
+from .country_filter import selected_country_dependency
+from .movers import MOVERS_INPUTS, movers_update
+from .parallel import build_concurrently
+from .patches import year_only_change
+from .treemap import TREEMAP_INPUTS, treemap_update
+from .wealth_chart import WEALTH_CHART_INPUTS, wealth_chart_update
+from .world_map import WORLD_MAP_INPUTS, world_map_update
+
+
+def _changed(inputs, triggered):
+    """True when one of inputs triggered the callback, or on the initial call."""
+    return not triggered or bool(triggered & set(inputs))
+
+
+def register_dashboard_callbacks(app, data):
+    """Register the single callback that updates all charts for a state change.
+
+    data is the app's DataHandle; a new data version redraws every chart in full.
+    """
+    @app.callback(
+        [
+            Output("wealth-chart", "figure"),
+            Output("choro-map", "figure"),
+            Output("industrytreemap", "figure"),
+            Output("movers-panel", "children"),
+        ],
+        [
+            Input("selected-year", "data"),
+            selected_country_dependency(),
+            Input("switch-options", "value"),
+            Input("data-version", "data"),
+            Input("wealth-options", "value"),
+        ],
+    )
+    def update_dashboard(selected_year, selected_country, view_type, data_version, wealth_mode):
+        """Update the wealth chart, world map, treemap and movers panel for the current state."""
+        triggered = set(dash.ctx.triggered_prop_ids)
+        reloaded = "data-version.data" in triggered
+        data_index = data.current
+
+        # Decide what to build here: dash.ctx is only set on the request thread
+        builds = {}
+        if reloaded or _changed(WEALTH_CHART_INPUTS, triggered):
+            builds["wealth_chart"] = functools.partial(
+                wealth_chart_update, data_index, selected_year, selected_country,
+                not reloaded and year_only_change(WEALTH_CHART_INPUTS), wealth_mode,
+            )
+        if reloaded or _changed(WORLD_MAP_INPUTS, triggered):
+            builds["world_map"] = functools.partial(
+                world_map_update, data_index, selected_year, view_type,
+                not reloaded and year_only_change(WORLD_MAP_INPUTS),
+            )
+        if reloaded or _changed(TREEMAP_INPUTS, triggered):
+            builds["treemap"] = functools.partial(treemap_update, data_index, selected_year, selected_country)
+        if reloaded or _changed(MOVERS_INPUTS, triggered):
+            builds["movers"] = functools.partial(movers_update, data_index, selected_year, selected_country)
+
+        figures = dict(zip(builds, build_concurrently(list(builds.values()))))
+        return tuple(
+            figures.get(name, dash.no_update) for name in ("wealth_chart", "world_map", "treemap", "movers")
+        )
@@ -0,0 +1,109 @@
+"""
+Hot data reload: the watcher, the admin endpoint and the browser refresh.
+
+Each process runs a DataReloader (modules/data/reload.py) that swaps
+rebuilt data into the app's DataHandle. Its watcher thread is started on
+the first request a process serves, so gunicorn workers forked from a
+preloaded app each get their own.
+
+With BILLIONAIRE_ADMIN_TOKEN set, the app also serves
+    POST /admin/reload  touch the reload marker, so every worker reloads
+    GET  /admin/data    the data version and reload counters
+for requests carrying the header Authorization: Bearer <token>.
+
+Open pages poll the data version (DATA_VERSION_POLL) and, when it changed,
+get the new slider range; the version change re-renders the charts.
+"""
+import hmac
+
+import dash
+from dash import Input, Output, State
+from dash.exceptions import PreventUpdate
+from flask import abort, jsonify, request
+from modules.config import (
+    ADMIN_TOKEN,
+    DATA_RELOAD_ENABLED,
+    DATA_RELOAD_POLL,
+    RELOAD_MARKER,
+    SHARED_DATA,
+)
+from modules.data import DataReloader, build_data_index
+from modules.data.reload import touch, watched_paths
+from modules.layouts.components import year_marks
+
+
+def _authorized():
+    header = request.headers.get("Authorization", "")
+    scheme, _, token = header.partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(token.encode(), ADMIN_TOKEN.encode())
+
+
+def _install_admin(app, reloader):
+    prefix = app.config.routes_pathname_prefix
+
+    def reload_data():
+        if not _authorized():
+            abort(401)
+        touch(RELOAD_MARKER)
+        return jsonify(status="scheduled", poll_interval=DATA_RELOAD_POLL, **reloader.status()), 202
+
+    def data_status():
+        if not _authorized():
+            abort(401)
+        return jsonify(reloader.status())
+
+    app.server.add_url_rule(f"{prefix}admin/reload", "admin_reload", reload_data, methods=["POST"])
+    app.server.add_url_rule(f"{prefix}admin/data", "admin_data", data_status)
+
+
+def register_data_version_callbacks(app, handle):
+    """Send open pages the new slider range when the data version changes."""
+    @app.callback(
+        [
+            Output("data-version", "data"),
+            Output("year-slider", "min"),
+            Output("year-slider", "max"),
+            Output("year-slider", "marks"),
+            Output("year-slider", "value", allow_duplicate=True),
+        ],
+        Input("data-version-interval", "n_intervals"),
+        [
+            State("data-version", "data"),
+            State("year-slider", "value"),
+        ],
+        prevent_initial_call=True,
+    )
+    def refresh_data_version(n_intervals, known_version, year):
+        """New data version and slider range, or nothing while the version is unchanged."""
+        data_index = handle.current
+        if data_index.version == known_version:
+            raise PreventUpdate
+        min_year, max_year = int(data_index.years[0]), int(data_index.years[-1])
+        # Keep the selected year unless the new data no longer has it
+        if year is not None and min_year <= year <= max_year:
+            year = dash.no_update
+        else:
+            year = max_year
+        return data_index.version, min_year, max_year, year_marks(min_year, max_year), year
+
+
+def install_data_reload(app, handle, build=None):
+    """Reload the data into handle when its files change; returns the DataReloader, or None."""
+    register_data_version_callbacks(app, handle)
+    if not DATA_RELOAD_ENABLED:
+        return None
+
+    reloader = DataReloader(
+        handle,
+        build or (lambda: build_data_index(shared=SHARED_DATA)),
+        watched_paths(RELOAD_MARKER),
+        DATA_RELOAD_POLL,
+    )
+
+    @app.server.before_request
+    def start_data_watcher():
+        reloader.start_watching()
+
+    if ADMIN_TOKEN:
+        _install_admin(app, reloader)
+    return reloader
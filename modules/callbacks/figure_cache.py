@@ -0,0 +1,71 @@
+"""
+Bounded LRU cache for figures built by the callbacks.
+"""
+import threading
+
+from cachetools import LRUCache
+
+# Named caches, for the metrics endpoint
+_caches = {}
+
+
+def register_cache(name, cache):
+    """Make a cache with stats() and invalidate() known by name."""
+    _caches[name] = cache
+
+
+def figure_caches():
+    """Every registered cache, by name."""
+    return dict(_caches)
+
+
+class FigureCache:
+    """LRU cache of built figures, tied to the data index they were built from.
+
+    Entries are dropped as soon as a different data index is passed in, so a
+    data reload never serves figures built from the previous snapshot.
+    """
+
+    def __init__(self, maxsize, name=None):
+        self.name = name
+        if name is not None:
+            register_cache(name, self)
+        self._figures = LRUCache(maxsize=maxsize)
+        self._data_index = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, data_index, key, build):
+        """Return the cached figure for key, calling build() on a miss."""
+        with self._lock:
+            if data_index is not self._data_index:
+                self._figures.clear()
+                self._data_index = data_index
+            figure = self._figures.get(key)
+            if figure is not None:
+                self.hits += 1
+                return figure
+            self.misses += 1
+
+        figure = build()
+        with self._lock:
+            if data_index is self._data_index:
+                self._figures[key] = figure
+        return figure
+
+    def invalidate(self):
+        """Drop every cached figure."""
+        with self._lock:
+            self._figures.clear()
+            self._data_index = None
+
+    def stats(self):
+        """Hit/miss counters and current size."""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "size": len(self._figures),
+                "maxsize": self._figures.maxsize,
+            }
@@ -0,0 +1,209 @@
+"""
+Per-callback metrics, served in Prometheus text format.
+
+instrument_app wraps app.callback so every callback registered afterwards
+records its latency, what triggered it and how it ended, and adds Flask
+hooks that record the full request time and uncompressed response size of
+each /_dash-update-component request, labelled with the source that
+answered it: the callback itself, the response cache or the static bundle.
+Figure cache hit/miss counts are exported
+alongside. With PROMETHEUS_MULTIPROC_DIR set (gunicorn with several
+workers), the endpoint aggregates every worker's metrics.
+"""
+import functools
+import os
+import threading
+import time
+
+import dash
+from dash.exceptions import PreventUpdate
+from flask import Response, g, request
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from modules.config import METRICS_ENABLED, METRICS_PATH, PROFILE_DIR, PROFILE_INTERVAL, PROFILE_KEEP
+from .figure_cache import figure_caches
+from .profiler import SlowestProfiles, StackSampler
+
+# Component id -> what the user did to trigger a callback
+TRIGGER_SOURCES = {
+    "year-slider": "slider",
+    "selected-year": "slider",
+    "animation-interval": "interval",
+    "play-button": "play",
+    "choro-map": "click",
+    "map-container": "click",
+    "selected-country": "click",
+    "year-rows-request": "click",
+    "switch-options": "switch",
+    "wealth-options": "switch",
+    "person-search": "search",
+    "wealth-chart": "click",
+    "industrytreemap": "click",
+    "data-version-interval": "reload",
+    "data-version": "reload",
+}
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+BYTES_BUCKETS = tuple(2 ** k for k in range(10, 26, 2))  # 1 KiB .. 16 MiB
+
+registry = CollectorRegistry()
+
+callback_latency = Histogram(
+    "dash_callback_duration_seconds",
+    "Time spent in the callback function",
+    ["callback", "trigger"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+callback_calls = Counter(
+    "dash_callback_calls",
+    "Callback calls by trigger and outcome (ok, prevented, error)",
+    ["callback", "trigger", "outcome"],
+    registry=registry,
+)
+request_latency = Histogram(
+    "dash_callback_request_duration_seconds",
+    "Time to handle the callback request, serialization included",
+    ["callback", "source"],
+    buckets=LATENCY_BUCKETS,
+    registry=registry,
+)
+response_bytes = Histogram(
+    "dash_callback_response_bytes",
+    "Size of the serialized callback response, before compression",
+    ["callback", "source"],
+    buckets=BYTES_BUCKETS,
+    registry=registry,
+)
+cache_lookups = Counter(
+    "dash_figure_cache_lookups",
+    "Figure cache lookups by result (hit, miss)",
+    ["cache", "result"],
+    registry=registry,
+)
+
+_seen_cache_stats = {}
+_cache_lock = threading.Lock()
+
+_profiles = SlowestProfiles(PROFILE_DIR, PROFILE_KEEP) if PROFILE_DIR else None
+
+
+def trigger_source(prop_ids):
+    """Trigger label for the triggered 'id.property' strings, e.g. 'slider' or 'initial'."""
+    sources = {TRIGGER_SOURCES.get(prop_id.rsplit(".", 1)[0], "other") for prop_id in prop_ids}
+    return "+".join(sorted(sources)) or "initial"
+
+
+def _sync_cache_counters():
+    """Add the figure cache hits/misses since the last sync to the counters."""
+    with _cache_lock:
+        for name, cache in figure_caches().items():
+            stats = cache.stats()
+            seen = _seen_cache_stats.get(name, {})
+            for result, key in (("hit", "hits"), ("miss", "misses")):
+                count, last = stats[key], seen.get(key, 0)
+                # A smaller count means the cache was recreated
+                cache_lookups.labels(name, result).inc(count - last if count >= last else count)
+            _seen_cache_stats[name] = stats
+
+
+def _instrumented(func):
+    """Wrap a callback function to record its metrics (and profile, if enabled)."""
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        trigger = trigger_source(dash.ctx.triggered_prop_ids)
+        g.dash_callback = name
+        outcome = "error"
+        sampler = StackSampler(PROFILE_INTERVAL) if _profiles else None
+        start = time.perf_counter()
+        try:
+            if sampler:
+                with sampler:
+                    result = func(*args, **kwargs)
+            else:
+                result = func(*args, **kwargs)
+            outcome = "ok"
+            return result
+        except PreventUpdate:
+            outcome = "prevented"
+            raise
+        finally:
+            duration = time.perf_counter() - start
+            callback_latency.labels(name, trigger).observe(duration)
+            callback_calls.labels(name, trigger, outcome).inc()
+            if sampler:
+                _profiles.record(name, duration, sampler.stacks)
+
+    return wrapper
+
+
+def _is_callback_request(app):
+    return request.path == app.config.routes_pathname_prefix + "_dash-update-component"
+
+
+def _requested_callback(app):
+    """Name of the callback the request asks for, or None."""
+    body = request.get_json(silent=True)
+    output = body.get("output") if isinstance(body, dict) else None
+    func = app.callback_map.get(output, {}).get("callback") if isinstance(output, str) else None
+    return getattr(func, "__name__", None)
+
+
+def metrics_view():
+    """Current metrics in Prometheus text format."""
+    _sync_cache_counters()
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        scrape_registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(scrape_registry)
+    else:
+        scrape_registry = registry
+    return Response(generate_latest(scrape_registry), content_type=CONTENT_TYPE_LATEST)
+
+
+def instrument_app(app):
+    """Record metrics for the callbacks registered on app from now on and serve them at METRICS_PATH.
+
+    Install after install_compression and before the static bundle and the
+    response cache: after_request hooks run in reverse order, so the
+    response size is taken before compression, and the request start is
+    marked before either of them can answer the request.
+    """
+    if not METRICS_ENABLED:
+        return
+
+    register = app.callback
+
+    def callback(*args, **kwargs):
+        decorator = register(*args, **kwargs)
+        return lambda func: decorator(_instrumented(func))
+
+    app.callback = callback
+
+    @app.server.before_request
+    def start_callback_request():
+        if _is_callback_request(app):
+            g.dash_request_start = time.perf_counter()
+
+    @app.server.after_request
+    def record_callback_request(response):
+        start = g.get("dash_request_start")
+        if start is None or not _is_callback_request(app):
+            return response
+        # Set by the response cache or the static bundle when they answered
+        source = g.get("response_source", "callback")
+        name = g.get("dash_callback") or _requested_callback(app)
+        if name is not None:
+            request_latency.labels(name, source).observe(time.perf_counter() - start)
+            response_bytes.labels(name, source).observe(response.calculate_content_length() or 0)
+            _sync_cache_counters()
+        return response
+
+    app.server.add_url_rule(METRICS_PATH, "metrics", metrics_view)
@@ -0,0 +1,36 @@
+"""
+Callbacks for the movers panel next to the wealth chart.
+"""
+from dash import Input, Output
+from modules.config import MOVERS_CACHE_SIZE
+from modules.visualizations import create_movers_panel
+from .country_filter import selected_country_dependency
+from .figure_cache import FigureCache
+
+# Callback inputs the movers panel depends on
+MOVERS_INPUTS = ("selected-year.data", "selected-country.children")
+
+# Building the table components costs more than looking up the panel, so
+# they are built once per (year, country) and reused
+movers_cache = FigureCache(maxsize=MOVERS_CACHE_SIZE, name="movers")
+
+
+def movers_update(data_index, year, selected_country):
+    """Movers panel of the year, within the selected country if any."""
+    return movers_cache.get(
+        data_index,
+        (year, selected_country),
+        lambda: create_movers_panel(data_index.movers(year, selected_country), selected_country),
+    )
+
+
+def register_movers_callbacks(app, data):
+    """Register callbacks for the movers panel."""
+    @app.callback(
+        Output("movers-panel", "children"),
+        [Input("selected-year", "data"),
+         selected_country_dependency()]
+    )
+    def update_movers(selected_year, selected_country):
+        """Update the movers panel based on selected year and country."""
+        return movers_update(data.current, selected_year, selected_country)
@@ -0,0 +1,43 @@
+"""
+Concurrent figure builds for the charts of one state change.
+
+The chart builders are plain functions of the data index and the callback
+inputs (whatever needs dash.ctx or the Flask request is read beforehand on
+the request thread), so they can run on a thread pool. Much of their time
+goes to pandas/NumPy and JSON encoding, and the figure caches are
+thread-safe, so the charts of one update overlap instead of queueing
+behind each other.
+"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from modules.config import FIGURE_WORKERS
+
+_executor = None
+_executor_pid = None
+_lock = threading.Lock()
+
+
+def figure_executor():
+    """This process's figure thread pool, created on first use (again after a fork)."""
+    global _executor, _executor_pid
+    with _lock:
+        if _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(FIGURE_WORKERS, thread_name_prefix="figures")
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def build_concurrently(builds):
+    """Results of the zero-argument callables in builds, in order.
+
+    With FIGURE_WORKERS, all but the first run on the figure thread pool while
+    the request thread runs the first, so a busy pool delays a request's
+    other charts, never all of them.
+    """
+    if FIGURE_WORKERS <= 0 or len(builds) < 2:
+        return [build() for build in builds]
+    futures = [figure_executor().submit(build) for build in builds[1:]]
+    first = builds[0]()
+    return [first, *(future.result() for future in futures)]
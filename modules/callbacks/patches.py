@@ -0,0 +1,48 @@
+"""
+Partial figure updates with dash.Patch.
+
+When only the year changes, a figure keeps its layout and trace styling and
+just swaps its per-year arrays, so the callbacks send those arrays instead of
+a full figure (layout, colorbar and template included).
+"""
+import dash
+from dash import Patch
+from modules.config import PATCH_FIGURE_UPDATES
+
+
+def year_only_change(inputs=None):
+    """True when the year is the only one of inputs that triggered the current callback.
+
+    inputs are 'id.property' strings and default to all of the callback's inputs.
+    """
+    triggered = set(dash.ctx.triggered_prop_ids)
+    if inputs is not None:
+        triggered &= set(inputs)
+    return PATCH_FIGURE_UPDATES and triggered == {"selected-year.data"}
+
+
+def trace_patch(figure, traces):
+    """Patch that copies the given attributes of each trace from a figure dict.
+
+    traces maps a trace index to attribute paths, e.g.
+    {0: ["x", "y"], 1: [("marker", "colors")]}. A trace index missing from
+    figure is deleted, and a path of None replaces the whole trace.
+    """
+    patch = Patch()
+    for index, paths in traces.items():
+        if index >= len(figure["data"]):
+            del patch["data"][index]
+            continue
+        trace = figure["data"][index]
+        if paths is None:
+            patch["data"][index] = trace
+            continue
+        for path in paths:
+            path = (path,) if isinstance(path, str) else path
+            value, target = trace, patch["data"][index]
+            for name in path:
+                value = value[name]
+            for name in path[:-1]:
+                target = target[name]
+            target[path[-1]] = value
+    return patch
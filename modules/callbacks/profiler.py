@@ -0,0 +1,89 @@
+"""
+Sampling profiler for slow callbacks.
+
+While a callback runs, a background thread samples its Python stack every
+few milliseconds. The profiles of the slowest callbacks are written to disk
+as collapsed stacks ("outer;inner;leaf count" per line), which flamegraph.pl
+and speedscope read directly.
+"""
+import heapq
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+def _collapse(frame):
+    """'outer;...;inner' for a frame and its callers."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class StackSampler:
+    """Context manager that samples the calling thread's stack until exit."""
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.stacks = Counter()
+        self._thread_id = None
+        self._stop = threading.Event()
+        self._sampler = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is not None:
+                self.stacks[_collapse(frame)] += 1
+
+    def __enter__(self):
+        self._thread_id = threading.get_ident()
+        self._sampler = threading.Thread(target=self._run, name="callback-profiler", daemon=True)
+        self._sampler.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        self._sampler.join()
+        return False
+
+
+class SlowestProfiles:
+    """Keeps the collapsed-stack profiles of the `keep` slowest calls in directory.
+
+    Each worker process keeps its own slowest set; file names carry the
+    duration, callback name and process id.
+    """
+
+    def __init__(self, directory, keep):
+        self.directory = directory
+        self.keep = keep
+        self._slowest = []  # min-heap of (duration, path)
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def record(self, name, duration, stacks):
+        """Write the profile if duration is among the slowest seen."""
+        if not stacks:
+            return
+        with self._lock:
+            if len(self._slowest) >= self.keep and duration <= self._slowest[0][0]:
+                return
+            stamp = time.strftime("%Y%m%dT%H%M%S")
+            path = os.path.join(
+                self.directory, f"{duration * 1000:09.1f}ms-{name}-{stamp}-{os.getpid()}.folded"
+            )
+            with open(path, "w") as f:
+                for stack, count in stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            heapq.heappush(self._slowest, (duration, path))
+            if len(self._slowest) > self.keep:
+                _, evicted = heapq.heappop(self._slowest)
+                try:
+                    os.remove(evicted)
+                except OSError:
+                    pass
@@ -0,0 +1,331 @@
+"""
+Shared cache of serialized /_dash-update-component responses.
+
+A callback response only depends on the callback, its input and state
+values, which inputs triggered it, the data and the code. The cache key
+hashes all of these, so a data refresh or a deploy simply stops matching
+old entries. With the disk or Redis backend every worker (and every
+restart) reuses responses rendered by any other.
+
+The key also serves as the response's ETag. A request whose If-None-Match
+header carries it gets an empty 304 instead of the payload. Browsers don't
+revalidate POST requests on their own, so this is for proxies and API
+clients that send the header.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from cachetools import LRUCache
+from flask import Response, g, request
+from modules.config import (
+    RESPONSE_CACHE_BACKEND,
+    RESPONSE_CACHE_DIR,
+    RESPONSE_CACHE_MAX_BYTES,
+    RESPONSE_CACHE_OUTPUTS,
+    RESPONSE_CACHE_REDIS_URL,
+)
+from .figure_cache import register_cache
+
+logger = logging.getLogger(__name__)
+
+MODULES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _code_version():
+    """Hash of the package's Python sources, so a deploy invalidates cached responses."""
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(MODULES_DIR):
+        dirs.sort()
+        for filename in sorted(files):
+            if filename.endswith(".py"):
+                path = os.path.join(root, filename)
+                digest.update(os.path.relpath(path, MODULES_DIR).encode())
+                with open(path, "rb") as f:
+                    digest.update(f.read())
+    return digest.hexdigest()[:16]
+
+
+CODE_VERSION = _code_version()
+
+
+def response_key(body, data_version):
+    """Cache key of a callback request body for a data version."""
+    def values(dependencies):
+        return [[d.get("id"), d.get("property"), d.get("value")] for d in dependencies]
+
+    normalized = {
+        "output": body.get("output"),
+        "inputs": values(body.get("inputs", [])),
+        "state": values(body.get("state", [])),
+        "changed": sorted(body.get("changedPropIds", [])),
+        "data": data_version,
+        "code": CODE_VERSION,
+    }
+    encoded = json.dumps(normalized, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class MemoryBackend:
+    """Per-process LRU of responses, bounded by their total size."""
+
+    def __init__(self, max_bytes):
+        self._responses = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            return self._responses.get(key)
+
+    def set(self, key, value):
+        if len(value) > self._responses.maxsize:
+            return
+        with self._lock:
+            self._responses[key] = value
+
+    def clear(self):
+        with self._lock:
+            self._responses.clear()
+
+
+class DiskBackend:
+    """Responses as files in a directory shared by every worker.
+
+    Files are written atomically and touched when read. Once the writes
+    since the last check add up to a tenth of max_bytes, the least recently
+    used files are removed until the directory is back under 90% of it.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._written = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key)
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = f.read()
+            os.utime(path)
+            return value
+        except OSError:
+            return None
+
+    def set(self, key, value):
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(value)
+            os.replace(tmp_path, path)
+        except OSError as exc:
+            logger.warning("Could not write cached response %s: %s", key, exc)
+            return
+        with self._lock:
+            self._written += len(value)
+            if self._written < self.max_bytes // 10:
+                return
+            self._written = 0
+        self._evict()
+
+    def _entries(self):
+        for shard in os.scandir(self.directory):
+            if shard.is_dir():
+                for entry in os.scandir(shard.path):
+                    if not entry.name.endswith(".tmp"):
+                        try:
+                            stat = entry.stat()
+                        except OSError:
+                            continue
+                        yield stat.st_mtime, stat.st_size, entry.path
+
+    def _evict(self):
+        entries = sorted(self._entries())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * 9 // 10
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        for _, _, path in self._entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+class RedisBackend:
+    """Responses in a Redis-compatible server, evicted least recently used by total size."""
+
+    def __init__(self, url, max_bytes, prefix="billionaire-app:response:"):
+        import redis
+
+        self._redis = redis.Redis.from_url(url)
+        self.max_bytes = max_bytes
+        self._prefix = prefix
+        self._lru = prefix + "lru"  # sorted set of keys by last use
+        self._sizes = prefix + "sizes"  # hash of key -> bytes
+        self._total = prefix + "total"
+
+    def get(self, key):
+        value = self._redis.get(self._prefix + key)
+        if value is not None:
+            self._redis.zadd(self._lru, {key: time.time()})
+        return value
+
+    def set(self, key, value):
+        pipe = self._redis.pipeline()
+        pipe.set(self._prefix + key, value)
+        pipe.hget(self._sizes, key)
+        pipe.hset(self._sizes, key, len(value))
+        pipe.zadd(self._lru, {key: time.time()})
+        _, previous, _, _ = pipe.execute()
+        total = self._redis.incrby(self._total, len(value) - int(previous or 0))
+        if total > self.max_bytes:
+            self._evict(total)
+
+    def _evict(self, total):
+        target = self.max_bytes * 9 // 10
+        while total > target:
+            oldest = self._redis.zpopmin(self._lru, 16)
+            if not oldest:
+                break
+            keys = [key.decode() for key, _ in oldest]
+            sizes = self._redis.hmget(self._sizes, keys)
+            pipe = self._redis.pipeline()
+            pipe.delete(*(self._prefix + key for key in keys))
+            pipe.hdel(self._sizes, *keys)
+            pipe.decrby(self._total, sum(int(size or 0) for size in sizes))
+            total = pipe.execute()[-1]
+
+    def clear(self):
+        keys = [key.decode() for key in self._redis.zrange(self._lru, 0, -1)]
+        if keys:
+            self._redis.delete(*(self._prefix + key for key in keys))
+        self._redis.delete(self._lru, self._sizes, self._total)
+
+
+def create_backend(name):
+    """Response cache backend for a RESPONSE_CACHE_BACKEND value, or None."""
+    if name == "memory":
+        return MemoryBackend(RESPONSE_CACHE_MAX_BYTES)
+    if name == "disk":
+        return DiskBackend(RESPONSE_CACHE_DIR, RESPONSE_CACHE_MAX_BYTES)
+    if name == "redis":
+        return RedisBackend(RESPONSE_CACHE_REDIS_URL, RESPONSE_CACHE_MAX_BYTES)
+    if name:
+        raise ValueError(f"Unknown response cache backend: {name!r}")
+    return None
+
+
+class ResponseCache:
+    """Callback response cache over a backend, with hit/miss counters."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        try:
+            value = self.backend.get(key)
+        except Exception as exc:  # a cache outage must not break the app
+            logger.warning("Response cache get failed: %s", exc)
+            value = None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key, value):
+        try:
+            self.backend.set(key, value)
+        except Exception as exc:
+            logger.warning("Response cache set failed: %s", exc)
+
+    def invalidate(self):
+        """Drop every cached response."""
+        self.backend.clear()
+
+    def stats(self):
+        """Hit/miss counters."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+def _cacheable(body):
+    """True when every output of the callback request is in RESPONSE_CACHE_OUTPUTS."""
+    outputs = body.get("outputs")
+    if isinstance(outputs, dict):
+        outputs = [outputs]
+    if not isinstance(outputs, list) or not outputs:
+        return False
+    return all(
+        isinstance(output, dict) and f"{output.get('id')}.{output.get('property')}" in RESPONSE_CACHE_OUTPUTS
+        for output in outputs
+    )
+
+
+def _etag(key):
+    return key[:32]
+
+
+def install_response_cache(app, data, backend=RESPONSE_CACHE_BACKEND):
+    """Serve the RESPONSE_CACHE_OUTPUTS callbacks of app from a shared response cache.
+
+    data is the app's DataHandle (or a DataIndex); keys use its current version.
+    """
+    backend = create_backend(backend)
+    if backend is None:
+        return None
+    cache = ResponseCache(backend)
+    register_cache("responses", cache)
+    update_path = app.config.routes_pathname_prefix + "_dash-update-component"
+
+    @app.server.before_request
+    def serve_cached_response():
+        if request.path != update_path:
+            return None
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict) or not _cacheable(body):
+            return None
+
+        key = response_key(body, data.version)
+        if request.if_none_match.contains_weak(_etag(key)):
+            g.response_source = "cache"
+            return Response(status=304, headers={"ETag": f'"{_etag(key)}"'})
+        cached = cache.get(key)
+        if cached is not None:
+            g.response_source = "cache"
+            return Response(cached, mimetype="application/json", headers={"ETag": f'"{_etag(key)}"'})
+        g.response_cache_key = key
+        return None
+
+    @app.server.after_request
+    def store_response(response):
+        key = g.pop("response_cache_key", None)
+        if key is not None and response.status_code == 200:
+            cache.set(key, response.get_data())
+            response.set_etag(_etag(key))
+        return response
+
+    return cache
@@ -0,0 +1,116 @@
+"""
+Serving the charts from a static bundle (see modules/static/export.py).
+
+With BILLIONAIRE_STATIC_BUNDLE set, callback requests for the bundled
+outputs are answered before they reach Dash, by splicing the pre-encoded
+fragments of the requested state into a callback response: nothing is
+looked up, rendered or encoded. The values are read from the request's
+inputs and State dependencies alike, as the selected country is a State
+with CLIENTSIDE_COUNTRY_FILTER. As in the callbacks, an output is left out
+when none of its inputs changed. Requests for a state the bundle lacks, or
+made after the data was reloaded to another version, go on to the callbacks.
+"""
+import json
+import logging
+
+from flask import Response, g, request
+from modules.config import STATIC_BUNDLE, STATIC_BUNDLE_MEMORY
+from modules.static import StaticBundle
+from .figure_cache import register_cache
+from .movers import MOVERS_INPUTS
+from .response_cache import CODE_VERSION
+from .treemap import TREEMAP_INPUTS
+from .wealth_chart import WEALTH_CHART_INPUTS
+from .world_map import WORLD_MAP_INPUTS
+
+logger = logging.getLogger(__name__)
+
+# Outputs in the bundle, and the inputs their states are keyed by
+BUNDLE_OUTPUTS = {
+    "wealth-chart.figure": WEALTH_CHART_INPUTS,
+    "choro-map.figure": WORLD_MAP_INPUTS,
+    "industrytreemap.figure": TREEMAP_INPUTS,
+    "movers-panel.children": MOVERS_INPUTS,
+}
+
+
+def bundle_response(bundle, body):
+    """Encoded callback response for a request body, b"" if no output changed, or None.
+
+    None means the bundle can't answer: an output or a state isn't in it.
+    """
+    outputs = body.get("outputs")
+    if isinstance(outputs, dict):
+        outputs = [outputs]
+    if not isinstance(outputs, list) or not outputs:
+        return None
+
+    values = {
+        f"{d.get('id')}.{d.get('property')}": d.get("value")
+        for d in (body.get("inputs") or []) + (body.get("state") or []) if isinstance(d, dict)
+    }
+    changed = set(body.get("changedPropIds") or [])
+    redraw = not changed or "data-version.data" in changed
+
+    components = {}
+    for output in outputs:
+        if not isinstance(output, dict):
+            return None
+        component_id, prop = output.get("id"), output.get("property")
+        inputs = bundle.outputs.get(f"{component_id}.{prop}")
+        if inputs is None:
+            return None
+        if not redraw and not changed & set(inputs):
+            continue
+        fragment = bundle.fragment(f"{component_id}.{prop}", [values.get(name) for name in inputs])
+        if fragment is None:
+            return None
+        components.setdefault(component_id, []).append(json.dumps(prop).encode() + b":" + fragment)
+
+    if not components:
+        return b""
+    return b'{"multi":true,"response":{' + b",".join(
+        json.dumps(component_id).encode() + b":{" + b",".join(props) + b"}"
+        for component_id, props in components.items()
+    ) + b"}}"
+
+
+def install_static_bundle(app, data, path=STATIC_BUNDLE):
+    """Answer app's chart callbacks from the bundle at path; returns the StaticBundle.
+
+    Returns None when path is empty, or when the bundle can't be opened or
+    was exported from other code.
+    """
+    if not path:
+        return None
+    try:
+        bundle = StaticBundle(path, STATIC_BUNDLE_MEMORY)
+    except (OSError, ValueError, KeyError) as error:
+        logger.warning("Static bundle %s not served: %s", path, error)
+        return None
+    if bundle.code_version != CODE_VERSION:
+        logger.warning("Static bundle %s was exported from other code, not served", bundle.path)
+        return None
+    if bundle.data_version != data.version:
+        logger.warning("Static bundle %s was exported from other data, only served if it is reloaded", bundle.path)
+
+    register_cache("static_bundle", bundle)
+    update_path = app.config.routes_pathname_prefix + "_dash-update-component"
+
+    @app.server.before_request
+    def serve_from_bundle():
+        if request.path != update_path or bundle.data_version != data.version:
+            return None
+        body = request.get_json(silent=True)
+        if not isinstance(body, dict):
+            return None
+        encoded = bundle_response(bundle, body)
+        if encoded is None:
+            return None
+        g.response_source = "bundle"
+        if not encoded:
+            return Response(status=204)
+        return Response(encoded, mimetype="application/json")
+
+    logger.info("Serving the charts from static bundle %s (%d states)", bundle.path, len(bundle))
+    return bundle
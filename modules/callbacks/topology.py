@@ -0,0 +1,52 @@
+"""
+Serving the self-hosted world topology (see modules/data/topology.py).
+
+The topology is served from the app under a URL that carries a hash of its
+contents, with a year-long immutable Cache-Control, so browsers fetch it
+once and never revalidate it. The map's dcc.Graph points plotly.js at it
+with the topojsonURL config option.
+"""
+import hashlib
+import logging
+
+from flask import Response, request
+from modules.config import TOPOJSON_MAX_AGE, TOPOJSON_RESOLUTION, TOPOJSON_ROUTE
+from modules.data.topology import topology_name, topology_path
+
+logger = logging.getLogger(__name__)
+
+
+def install_topology(app, resolution=TOPOJSON_RESOLUTION):
+    """Serve the built topology for resolution from app; returns its topojsonURL.
+
+    Returns None, leaving plotly.js on its CDN, when the topology hasn't been
+    built (python -m modules.data.topology).
+    """
+    path = topology_path(resolution)
+    try:
+        with open(path, "rb") as f:
+            body = f.read()
+    except FileNotFoundError:
+        logger.warning(
+            "No world topology at %s, the map loads it from the plotly CDN "
+            "(build it with python -m modules.data.topology)", path
+        )
+        return None
+
+    digest = hashlib.sha256(body).hexdigest()[:16]
+    name = topology_name(resolution)
+
+    def serve_topology():
+        response = Response(body, mimetype="application/json")
+        response.cache_control.public = True
+        response.cache_control.max_age = TOPOJSON_MAX_AGE
+        response.cache_control.immutable = True
+        response.set_etag(digest)
+        return response.make_conditional(request)
+
+    app.server.add_url_rule(
+        f"{app.config.routes_pathname_prefix}{TOPOJSON_ROUTE}/{digest}/{name}.json",
+        "topology",
+        serve_topology,
+    )
+    return f"{app.config.requests_pathname_prefix}{TOPOJSON_ROUTE}/{digest}/"
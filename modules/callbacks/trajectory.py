@@ -0,0 +1,103 @@
+"""
+Callbacks for the name search and the wealth trajectory of one billionaire.
+
+The trajectory opens from the search box, from a bar of the wealth chart or
+from a billionaire's tile in the treemap. Bars and tiles are matched to a
+person by their label: the full name, plus a flag emoji on the bars.
+"""
+from dash import Input, Output
+import dash
+import pandas as pd
+from dash.exceptions import PreventUpdate
+from modules.config import PERSON_SEARCH_LIMIT
+from modules.visualizations import create_trajectory_chart, serialize_figure
+
+# Regional indicator letters, which make up the flags on the wealth chart bars
+_FLAG_CHARACTERS = "".join(chr(code) for code in range(0x1F1E6, 0x1F200))
+
+
+def _known(*values):
+    """The values that are not missing (None or NaN), as strings."""
+    return [str(value) for value in values if not pd.isna(value)]
+
+
+def _option(person, search_value=""):
+    details = ", ".join(_known(person.country) + [f"${person.net_worth:.1f}B in {person.year}"])
+    label = f"{person.name} ({details})"
+    # The options are already filtered here, by normalized prefix or fuzzy
+    # match; keep the dropdown's own substring filter from hiding them
+    return {"label": label, "value": person.id, "search": f"{label} {search_value}"}
+
+
+def clicked_name(click_data):
+    """Full name behind a clicked wealth chart bar or treemap tile."""
+    if not click_data or not click_data.get("points"):
+        return None
+    point = click_data["points"][0]
+    label = point.get("label", point.get("y"))
+    if not isinstance(label, str):
+        return None
+    return label.rstrip(" " + _FLAG_CHARACTERS)
+
+
+def trajectory_view(people, code):
+    """Modal title, summary line and figure for a person code."""
+    name = people.names[code]
+    trajectory = people.trajectory(code)
+    latest = trajectory.iloc[-1]
+    ranked = trajectory.dropna(subset=["rank"])
+    # Leave out a missing country or industry rather than print "None" or "nan"
+    known = ", ".join(_known(latest["country"], latest["industry"]))
+    summary = (f"{known}. " if known else "") + f"Listed in {len(trajectory)} years"
+    if len(ranked):
+        best = ranked.loc[ranked["rank"].idxmin()]
+        summary += f", highest rank #{best['rank']:.0f} in {best['year']}"
+    return name, summary + ".", serialize_figure(create_trajectory_chart(trajectory))
+
+
+def register_trajectory_callbacks(app, data):
+    """Register the name search and trajectory callbacks."""
+    @app.callback(
+        Output("person-search", "options"),
+        Input("person-search", "search_value"),
+    )
+    def search_people(search_value):
+        """Offer the names matching what has been typed so far."""
+        if not search_value:
+            raise PreventUpdate
+        people = data.current.people
+        return [_option(person, search_value) for person in people.search(search_value, PERSON_SEARCH_LIMIT)]
+
+    @app.callback(
+        [
+            Output("trajectory-modal", "is_open"),
+            Output("trajectory-title", "children"),
+            Output("trajectory-summary", "children"),
+            Output("trajectory-chart", "figure"),
+            Output("person-search", "value"),
+        ],
+        [
+            Input("person-search", "value"),
+            Input("wealth-chart", "clickData"),
+            Input("industrytreemap", "clickData"),
+        ],
+        prevent_initial_call=True,
+    )
+    def open_trajectory(person_id, bar_click, tile_click):
+        """Show the trajectory of the person searched for or clicked."""
+        triggered_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
+        if triggered_id == "person-search":
+            person = person_id
+        else:
+            # Industry, "Other" and root tiles are not people
+            person = clicked_name(bar_click if triggered_id == "wealth-chart" else tile_click)
+        if person is None:
+            raise PreventUpdate
+
+        people = data.current.people
+        code = people.code(person)
+        if code is None:
+            raise PreventUpdate
+
+        # Clear the search box, so the same name can be picked again
+        return (True, *trajectory_view(people, code), None)
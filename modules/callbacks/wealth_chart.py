@@ -4,50 +4,38 @@ Callbacks for the wealth chart visualization.
 from dash import Input, Output, State
 import dash
 import json
+from modules.visualizations import create_wealth_chart, serialize_figure
+from .country_filter import selected_country_dependency
+from .patches import trace_patch, year_only_change
 
-def register_wealth_chart_callbacks(app, df):
+# Callback inputs the wealth chart depends on
+WEALTH_CHART_INPUTS = ("selected-year.data", "selected-country.children", "wealth-options.value")
+
+
+def wealth_chart_update(data_index, selected_year, selected_country, year_only=False, mode="net_worth"):
+    """Wealth chart figure, or a patch of its bars when only the year changed."""
+    # Look up the precomputed leaderboard and create visualization
+    top_df = data_index.leaderboard(selected_year, selected_country)
+    wealth_chart = serialize_figure(create_wealth_chart(top_df, mode))
+
+    # Same country, new year: only the bars and their hover text change
+    if year_only:
+        return trace_patch(wealth_chart, {0: ["x", "y", "customdata"]})
+    return wealth_chart
+
+
+def register_wealth_chart_callbacks(app, data):
     """Register callbacks for wealth chart."""
     @app.callback(
+        Output("wealth-chart", "figure"),
         [
-            Output("year-slider", "value"),
-            Output("wealth-chart", "figure"),
-            Output("animation-interval", "disabled"),
-            Output("play-button", "children"),
-        ],
-        [
-            Input("play-button", "n_clicks"),
-            Input("animation-interval", "n_intervals"),
-            Input("year-slider", "value"),
-            Input("selected-country", "children"),
-        ],
-        [
-            State("year-slider", "max"),
-            State("animation-interval", "disabled"),
+            Input("selected-year", "data"),
+            selected_country_dependency(),
+            Input("wealth-options", "value"),
         ],
     )
-    def update_wealth_chart(n_clicks, n_intervals, selected_year,selected_country, max_year, is_paused):
-        triggered_id = dash.callback_context.triggered[0]["prop_id"].split(".")[0]
-        
-        # Handle play button logic
-        if triggered_id == "play-button":
-            if is_paused:
-                return selected_year, dash.no_update, False, "Pause"
-            else:
-                return selected_year, dash.no_update, True, "Play"
-
-        # Handle interval animation logic
-        if triggered_id == "animation-interval":
-            if not is_paused:
-                next_year = min(selected_year + 1, max_year)
-                if next_year == max_year:
-                    return next_year, dash.no_update, True, "Play"
-                selected_year = next_year
-
-        is_paused = bool(is_paused)
-                
-        # Filter data and create visualization
-        year_df = df[df['year'].dt.year == selected_year]
-        from modules.visualizations import create_wealth_chart
-        wealth_chart = create_wealth_chart(year_df,selected_country)
-        
-        return selected_year, wealth_chart, is_paused, "Pause" if not is_paused else "Play"
+    def update_wealth_chart(selected_year, selected_country, mode):
+        """Update wealth chart based on selected year, country and mode."""
+        return wealth_chart_update(
+            data.current, selected_year, selected_country, year_only_change(WEALTH_CHART_INPUTS), mode
+        )
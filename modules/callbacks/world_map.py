@@ -4,20 +4,56 @@ Callbacks for the world map visualization.
 from dash import Input, Output, State
 import dash
 import json
-from modules.visualizations import world_map as wm
+from modules.config import WORLD_MAP_CACHE_SIZE
+from modules.visualizations import serialize_figure, world_map as wm
+from .figure_cache import FigureCache
+from .patches import trace_patch, year_only_change
 
-def register_world_map_callbacks(app, bill_df, scatter_data):
+# Callback inputs the world map depends on
+WORLD_MAP_INPUTS = ("selected-year.data", "switch-options.value")
+
+# Map figures only depend on (year, view_type), so they are built once and reused
+world_map_cache = FigureCache(maxsize=WORLD_MAP_CACHE_SIZE, name="world_map")
+
+
+def build_world_map(data_index, selected_year, view_type):
+    """Build the serialized world map figure for a year and view from the data index."""
+    min_val, max_val = data_index.color_range(view_type)
+    return serialize_figure(wm.create_world_map(
+        view_type,
+        data_index.country_stats(selected_year),
+        data_index.scatter(selected_year),
+        min_val,
+        max_val,
+    ))
+
+
+def world_map_update(data_index, selected_year, view_type, year_only=False):
+    """World map figure, or a patch of its per-year traces when only the year changed."""
+    figure = world_map_cache.get(
+        data_index,
+        (selected_year, view_type),
+        lambda: build_world_map(data_index, selected_year, view_type),
+    )
+
+    # Same view, new year: only the country values and markers change
+    if year_only:
+        return trace_patch(figure, {0: ["locations", "z", "text"], 1: None})
+    return figure
+
+
+def register_world_map_callbacks(app, data):
     """Register callbacks for world map."""
     @app.callback(
             Output("choro-map", "figure"),
 
         [
-            Input("year-slider", "value"),
+            Input("selected-year", "data"),
             Input("switch-options", "value"),
         ]
     )
     def update_world_map(selected_year, view_type):
         """Update world map based on year and view type."""
-        figure = wm.create_world_map(selected_year, view_type, bill_df, scatter_data)
-        return figure
-        
\ No newline at end of file
+        return world_map_update(
+            data.current, selected_year, view_type, year_only_change(WORLD_MAP_INPUTS)
+        )
@@ -1,14 +1,44 @@
 """
 Configuration settings for the Billionaires Dashboard.
 """
+import os
+
+# Data cache settings
+DATA_CACHE_DIR = os.environ.get(
+    "BILLIONAIRE_DATA_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", ".cache"),
+)
+
+# Load the datasets as categoricals over the memory-mapped column cache, with
+# no per-row Python objects (gunicorn.conf.py turns this on for the workers)
+SHARED_DATA = os.environ.get("BILLIONAIRE_SHARED_DATA", "0") == "1"
+
+# Hot data reload: each process watches the source CSVs and RELOAD_MARKER and
+# swaps in the rebuilt data when they change; open pages pick up the new
+# years every DATA_VERSION_POLL. POST /admin/reload (with the
+# BILLIONAIRE_ADMIN_TOKEN bearer token) touches the marker.
+DATA_RELOAD_ENABLED = os.environ.get("BILLIONAIRE_DATA_RELOAD", "1") == "1"
+DATA_RELOAD_POLL = 5.0  # seconds between checks of the watched files
+DATA_VERSION_POLL = 60_000  # milliseconds between the browser's data version checks
+RELOAD_MARKER = os.path.join(DATA_CACHE_DIR, "reload")
+ADMIN_TOKEN = os.environ.get("BILLIONAIRE_ADMIN_TOKEN")
 
 # Visualization settings
 CHART_HEIGHT = 400
 MAP_HEIGHT = 350
 TREEMAP_HEIGHT = 400
+LEADERBOARD_SIZE = 20  # billionaires shown in the wealth chart
+TREEMAP_TOP_K = None  # keep at most K billionaires per industry, the rest roll into "Other"
+PERSON_SEARCH_LIMIT = 10  # names offered by the search box
+MOVERS_SIZE = 5  # billionaires in each list of the movers panel
 
 # Animation settings
 ANIMATION_INTERVAL = 1000  # milliseconds
+CLIENTSIDE_ANIMATION = True  # Play steps through preloaded year frames in the browser
+
+# Country clicks on the map filter the selected year's rows in the browser
+# instead of re-rendering the wealth chart, treemap and movers panel
+CLIENTSIDE_COUNTRY_FILTER = os.environ.get("BILLIONAIRE_CLIENTSIDE_COUNTRY_FILTER", "1") == "1"
 
 # Color settings
 CHOROPLETH_COLORSCALE = "agsunset_r"
@@ -16,6 +46,122 @@ TREEMAP_COLORSCALE = "turbo" # not currently used
 OCEAN_COLOR = "LightBlue"
 LAND_COLOR = "White"
 
+# Map view settings (switch-options value -> colorbar/hover label)
+MAP_VIEW_LABELS = {
+    "billionaire_count": "Billionaire Count",
+    "percent_of_gdp": "Wealth as a Percent of GDP",
+    "billionaires_per_million": "Billionaires per Million People",
+    "wealth_per_capita": "Billionaire Wealth per Capita (USD)",
+}
+
+# Map views whose color scale tops out at this quantile, so a few outliers
+# (Monaco, Cyprus) don't wash out every other country
+MAP_VIEW_COLOR_QUANTILE = {
+    "percent_of_gdp": 0.90,
+    "billionaires_per_million": 0.90,
+    "wealth_per_capita": 0.90,
+}
+
+# Net worth in constant dollars of this year (deflated with the US GDP deflator)
+CONSTANT_USD_YEAR = 2015
+
+# Wealth chart modes (wealth-options value -> net worth column, axis title)
+WEALTH_CHART_MODES = {
+    "net_worth": "Net Worth (Billions USD)",
+    "net_worth_constant": f"Net Worth (Billions of {CONSTANT_USD_YEAR} USD)",
+}
+
+# Send only the changed trace arrays (dash.Patch) when just the year changes;
+# the wealth chart and world map only, a treemap's arrays are all of it
+PATCH_FIGURE_UPDATES = True
+COORDINATED_UPDATES = True  # One callback (and request) updates all charts for a state change
+
+# Threads that build the charts of one coordinated update side by side, shared
+# by the requests of a worker process (0 builds them one after another)
+FIGURE_WORKERS = int(os.environ.get("BILLIONAIRE_FIGURE_WORKERS", "4"))
+
+# Send figures without the unused parts of the plotly template and with
+# their arrays rounded to FIGURE_DECIMALS (trace type -> attribute -> places)
+COMPACT_FIGURES = True
+FIGURE_DECIMALS = {
+    "bar": {"x": 2},  # net worth is given to the hundredth of a billion
+    "choropleth": {"z": 3},  # only sets the color; the hover text is precomputed
+    "scattergeo": {"lat": 3, "lon": 3, "marker.color": 3},
+}
+
+# Figure cache settings
+WORLD_MAP_CACHE_SIZE = 128  # (year, view_type) entries
+MOVERS_CACHE_SIZE = 512  # (year, country) entries
+YEAR_ROWS_CACHE_SIZE = 64  # year entries of the clientside country filter
+
+# Shared cache of serialized callback responses: "disk" (shared by all
+# workers), "redis", "memory" (per worker) or "" to turn it off
+RESPONSE_CACHE_BACKEND = os.environ.get("BILLIONAIRE_RESPONSE_CACHE", "disk")
+RESPONSE_CACHE_DIR = os.path.join(DATA_CACHE_DIR, "responses")
+RESPONSE_CACHE_MAX_BYTES = 512 * 2**20
+RESPONSE_CACHE_REDIS_URL = os.environ.get("BILLIONAIRE_REDIS_URL", "redis://localhost:6379/0")
+# Outputs whose callbacks only depend on their inputs and the data
+RESPONSE_CACHE_OUTPUTS = (
+    "wealth-chart.figure",
+    "choro-map.figure",
+    "industrytreemap.figure",
+    "movers-panel.children",
+    "animation-frames.data",
+    "year-rows.data",
+)
+
+# Response compression (brotli needs the optional brotli package)
+COMPRESSION_ENABLED = True
+COMPRESSION_MIN_BYTES = 1024
+COMPRESSION_LEVELS = {"br": 5, "gzip": 6}
+COMPRESSION_CACHE_BYTES = 64 * 2**20  # compressed bodies kept for reuse
+COMPRESSIBLE_MIMETYPES = (
+    "application/json",
+    "application/javascript",
+    "text/javascript",
+    "text/css",
+    "text/html",
+    "text/plain",
+    "application/vnd.apache.arrow.stream",
+)
+
+# Self-hosted world topology for the map, built by python -m modules.data.topology
+TOPOJSON_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "geo")
+TOPOJSON_RESOLUTION = int(os.environ.get("BILLIONAIRE_TOPOJSON_RESOLUTION", 110))  # 110 or 50 (1:110m, 1:50m)
+TOPOJSON_SOURCE = "https://cdn.plot.ly/{name}.json"
+TOPOJSON_TOLERANCE = {110: 0.05, 50: 0.02}  # degrees of simplification per resolution
+TOPOJSON_LAYERS = ("land", "ocean", "lakes", "countries", "coastlines")  # layers the map shows
+TOPOJSON_ROUTE = "geo"
+TOPOJSON_MAX_AGE = 365 * 24 * 3600  # URLs carry the content hash, so the files never change
+
+# Static export: python -m modules.static.export pre-renders every chart
+# state into a content-hashed bundle under STATIC_EXPORT_DIR. Set
+# BILLIONAIRE_STATIC_BUNDLE to a bundle (or to STATIC_EXPORT_DIR, for the
+# latest one) to serve the charts from it instead of rendering them.
+STATIC_EXPORT_DIR = os.path.join(DATA_CACHE_DIR, "static")
+STATIC_EXPORT_WORKERS = int(os.environ.get("BILLIONAIRE_EXPORT_WORKERS", os.cpu_count() or 1))
+STATIC_EXPORT_GZIP_LEVEL = 9
+STATIC_BUNDLE = os.environ.get("BILLIONAIRE_STATIC_BUNDLE", "")
+STATIC_BUNDLE_MEMORY = 64 * 2**20  # decompressed responses kept in memory
+
+# Read-only data API (modules/api); Arrow output needs the optional pyarrow package
+API_ENABLED = True
+API_PREFIX = "/api/v1"
+API_PAGE_SIZE = 100
+API_MAX_PAGE_SIZE = 1000
+API_CACHE_SIZE = 256  # encoded pages
+API_MAX_AGE = 300  # seconds clients may reuse a page before revalidating
+
+# Callback metrics, served in Prometheus text format
+METRICS_ENABLED = True
+METRICS_PATH = "/metrics"
+
+# Sampling profiler for slow callbacks: set BILLIONAIRE_PROFILE_DIR to keep
+# collapsed-stack profiles of the PROFILE_KEEP slowest callbacks there
+PROFILE_DIR = os.environ.get("BILLIONAIRE_PROFILE_DIR")
+PROFILE_INTERVAL = 0.005  # seconds between stack samples
+PROFILE_KEEP = 20
+
 # Map projection settings
 MAP_ROTATION_LON = -98.5795
 MAP_ROTATION_LAT = 37.0902
@@ -50,6 +196,14 @@ PLAY_BUTTON_STYLE = {
     "marginRight": "-10px"  # Negative margin to pull slider closer
 }
 
+# "Loading frames…" note shown while the animation frames download
+ANIMATION_STATUS_STYLE = {
+    "fontSize": "0.8rem",
+    "color": "#6c757d",
+    "whiteSpace": "nowrap",
+    "marginRight": "5px"
+}
+
 # Remove the complex flex layout and use simpler positioning
 CONTROLS_CONTAINER_STYLE = {
     "marginTop": "20px"  # Add some space above controls
@@ -1,4 +1,7 @@
 """
 Data loading and preprocessing functionality.
 """
-from .loader import load_and_preprocess_data, get_flag_emoji
\ No newline at end of file
+from .loader import load_and_preprocess_data, get_flag_emoji, memory_report
+from .index import DataIndex
+from .handle import DataHandle
+from .reload import DataReloader, build_data_index
@@ -0,0 +1,330 @@
+"""
+Build pipeline for the datasets the dashboard consumes.
+
+Replaces the manual steps in data_wrangle.ipynb with incremental, vectorized
+stages. Each stage records the SHA-256 of its inputs and outputs in
+.build_state.json and is skipped when nothing it depends on has changed.
+
+The outputs replace the tracked CSVs in modules/data unless --out-dir
+names another directory; stages then read the files they need from there
+when an earlier stage wrote them, and from --data-dir otherwise.
+
+Usage:
+    python -m modules.data.build [--data-dir DIR] [--out-dir DIR] [--force] [--fetch-world-bank] [stage ...]
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+from .column_cache import file_hash
+from .countries import CUSTOM_ISO3, world_bank_by_iso3
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+STATE_FILE = '.build_state.json'
+
+RAW_BILLIONAIRES = 'all_billionaires_1997_2024.csv'
+BILLIONAIRES = 'billionaire_data.csv'
+BILLIONAIRES_UPDATED = 'billionaire_data_updated.csv'
+WORLD_BANK = 'world_bank_data_with_iso3c.csv'
+COUNTRY_DATA = 'billionaires_with_country_data.csv'
+COUNTRY_STATS = 'billionaire_count_and_wealth_data.csv'
+SCATTER = 'scatter_geo_data_complete.csv'
+
+BILLIONAIRE_COLUMNS = [
+    'year', 'rank', 'net_worth', 'full_name', 'age', 'gender', 'country_of_citizenship',
+    'country_of_residence', 'city_of_residence', 'organization_name', 'industry',
+]
+
+
+# Countries too small to click on the choropleth get a scatter marker instead
+SCATTER_COUNTRIES = pd.DataFrame(
+    [
+        ('Hong Kong', 'HKG', 22.3193, 114.1694),
+        ('Singapore', 'SGP', 1.3521, 103.8198),
+        ('Monaco', 'MCO', 43.7384, 7.4246),
+        ('St. Kitts and Nevis', 'KNA', 17.3578, -62.783),
+        ('Liechtenstein', 'LIE', 47.166, 9.5554),
+    ],
+    columns=['country_of_citizenship', 'iso3c', 'lattitude', 'longitude'],
+)
+
+WORLD_BANK_INDICATORS = {
+    'NY.GDP.MKTP.CD': 'gdp_pc_current_usd',
+    'NY.GDP.MKTP.KD': 'gdp_pc_constant_2015_usd',
+    'NY.GDP.PCAP.PP.KD': 'gdp_per_capita_ppp_constant',
+    'NY.GDP.DEFL.ZS.AD': 'gdp_deflator',
+    'PA.NUS.FCRF': 'official_exchange_rate',
+    'SP.POP.TOTL': 'population',
+}
+
+# Years a missing citizenship may be borrowed from, in the order they are tried
+CITIZENSHIP_SEARCH_OFFSETS = (-2, -1, 0, 1, 2)
+
+
+@lru_cache(maxsize=None)
+def _pycountry_iso3(country_name):
+    import pycountry
+    try:
+        # search_fuzzy prints subdivision matches; keep the build output readable
+        with contextlib.redirect_stdout(io.StringIO()):
+            return pycountry.countries.search_fuzzy(country_name)[0].alpha_3
+    except LookupError:
+        return None
+
+
+def country_iso3(names):
+    """Map country names to ISO3 codes, resolving each distinct name once."""
+    lookup = {
+        name: CUSTOM_ISO3.get(name) or _pycountry_iso3(name)
+        for name in pd.unique(names.dropna())
+        if str(name).strip()
+    }
+    return names.map(lookup)
+
+
+def _read(path):
+    return pd.read_csv(path, low_memory=False)
+
+
+def _write(frame, path):
+    """Write a CSV atomically so readers never see a half-written file."""
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    frame.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+# ------------------------
+# Stages
+# ------------------------
+
+def clean_raw_billionaires(inputs, outputs):
+    """Raw Forbes export -> one industry per row, numeric net worth."""
+    raw = _read(inputs[0])
+
+    # business_industries holds a Python-style list literal; keep its first entry
+    industries = raw['business_industries']
+    is_list = industries.str.match(r'^\s*\[.*\]\s*$', na=False)
+    first = industries.str.extract(r'''^\s*\[\s*(['"])(.*?)\1''')[1].str.strip()
+    raw['industry'] = industries.where(~is_list, first)
+
+    raw['net_worth'] = raw['net_worth'].str.replace(r'\s*B', '', regex=True).astype(float)
+    _write(raw[BILLIONAIRE_COLUMNS], outputs[0])
+
+
+def fill_citizenship(inputs, outputs):
+    """Borrow missing citizenships from adjacent years and add ISO3 codes."""
+    df = _read(inputs[0])
+    country = df['country_of_citizenship']
+
+    # First known citizenship per (name, year), looked up at each offset in order
+    known = df.loc[country.notna(), ['full_name', 'year', 'country_of_citizenship']]
+    known = known.drop_duplicates(['full_name', 'year']).set_index(['full_name', 'year'])
+    known = known['country_of_citizenship']
+
+    missing = df.loc[country.isna(), ['full_name', 'year']]
+    found = pd.Series(np.nan, index=missing.index, dtype=object)
+    for offset in CITIZENSHIP_SEARCH_OFFSETS:
+        keys = pd.MultiIndex.from_arrays([missing['full_name'], missing['year'] + offset])
+        found = found.fillna(pd.Series(known.reindex(keys).to_numpy(), index=missing.index))
+
+    df['country_of_citizenship'] = country.fillna(found)
+    df.insert(
+        df.columns.get_loc('country_of_citizenship') + 1,
+        'iso3c',
+        country_iso3(df['country_of_citizenship']),
+    )
+    print(f"  filled {found.notna().sum()} of {len(missing)} missing citizenships")
+    _write(df, outputs[0])
+
+
+def fetch_world_bank(inputs, outputs):
+    """Download World Bank indicators for every country (needs network access)."""
+    import wbdata
+
+    wb = wbdata.get_dataframe(
+        WORLD_BANK_INDICATORS,
+        country='all',
+        date=('1997', str(pd.Timestamp.now().year)),
+    ).reset_index()
+
+    # Aggregates (regions, income groups) are listed before 'World'
+    geos = pd.Series(wb['country'].unique())
+    aggregates = geos[: geos[geos == 'World'].index[0] + 1]
+    wb = wb[~wb['country'].isin(aggregates)]
+
+    wb = wb.rename(columns={'country': 'country_name', 'date': 'year'})
+    wb['year'] = pd.to_numeric(wb['year'])
+    wb['iso3c'] = country_iso3(wb['country_name'])
+    wb = wb.sort_values(['country_name', 'year'], ascending=[True, False], kind='stable')
+    _write(wb[['country_name', 'year', *WORLD_BANK_INDICATORS.values(), 'iso3c']], outputs[0])
+
+
+def _world_bank_by_iso3(path):
+    """World Bank rows with one row per (iso3c, year), without the country name."""
+    return world_bank_by_iso3(_read(path)).drop(columns='country_name')
+
+
+def join_world_bank(inputs, outputs):
+    """Billionaires joined with their citizenship country's World Bank data."""
+    df = _read(inputs[0])
+    merged = df.merge(_world_bank_by_iso3(inputs[1]), on=['iso3c', 'year'], how='left')
+    _write(merged, outputs[0])
+
+
+def country_stats(inputs, outputs):
+    """Billionaire count, total wealth and wealth as a percent of GDP per country and year."""
+    df = _read(inputs[0])
+    stats = (
+        df.groupby(['country_of_citizenship', 'year', 'iso3c'])
+        .agg(billionaire_count=('full_name', 'size'), total_wealth=('net_worth', 'sum'))
+        .reset_index()
+    )
+    gdp = _world_bank_by_iso3(inputs[1])[['iso3c', 'year', 'gdp_pc_current_usd']]
+    stats = stats.merge(gdp, on=['iso3c', 'year'], how='left')
+
+    # GDP in billions of current USD, like net worth
+    stats['current_gdp'] = stats.pop('gdp_pc_current_usd') / 1e9
+    stats['percent_of_gdp'] = stats['total_wealth'] / stats['current_gdp'] * 100
+
+    # Years the World Bank has no GDP for yet keep each country's share of
+    # the last year it has, so the map's latest year isn't blank
+    last_gdp_year = gdp.dropna(subset=['gdp_pc_current_usd'])['year'].max()
+    last_share = stats.loc[stats['year'] == last_gdp_year].set_index('country_of_citizenship')['percent_of_gdp']
+    beyond = stats['year'] > last_gdp_year
+    stats.loc[beyond, 'percent_of_gdp'] = stats.loc[beyond, 'country_of_citizenship'].map(last_share)
+    _write(stats.sort_values(['year', 'country_of_citizenship'], kind='stable'), outputs[0])
+
+
+def scatter_geo(inputs, outputs):
+    """Yearly marker rows for the small countries in SCATTER_COUNTRIES."""
+    stats = _read(inputs[0])
+    years = pd.DataFrame({'year': np.arange(stats['year'].min(), stats['year'].max() + 1)})
+    grid = years.merge(SCATTER_COUNTRIES, how='cross')
+    scatter = grid.merge(
+        stats.drop(columns='country_of_citizenship'), on=['iso3c', 'year'], how='left'
+    )
+    columns = [*SCATTER_COUNTRIES.columns, 'year', 'billionaire_count', 'total_wealth',
+               'current_gdp', 'percent_of_gdp']
+    _write(scatter[columns], outputs[0])
+
+
+# Bump a stage's version when its code changes so it reruns
+Stage = namedtuple('Stage', ['name', 'inputs', 'outputs', 'run', 'version'])
+
+STAGES = [
+    Stage('clean', [RAW_BILLIONAIRES], [BILLIONAIRES], clean_raw_billionaires, 1),
+    Stage('citizenship', [BILLIONAIRES], [BILLIONAIRES_UPDATED], fill_citizenship, 1),
+    Stage('world_bank', [], [WORLD_BANK], fetch_world_bank, 1),
+    Stage('country_data', [BILLIONAIRES_UPDATED, WORLD_BANK], [COUNTRY_DATA], join_world_bank, 3),
+    Stage('country_stats', [BILLIONAIRES_UPDATED, WORLD_BANK], [COUNTRY_STATS], country_stats, 3),
+    Stage('scatter', [COUNTRY_STATS], [SCATTER], scatter_geo, 1),
+]
+
+# Stages that are only run when asked for explicitly
+NETWORK_STAGES = {'world_bank'}
+
+
+def _load_state(data_dir):
+    try:
+        with open(os.path.join(data_dir, STATE_FILE)) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_state(data_dir, state):
+    tmp_path = os.path.join(data_dir, f'{STATE_FILE}.{os.getpid()}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, os.path.join(data_dir, STATE_FILE))
+
+
+def _hashes(paths):
+    return {name: file_hash(path) for name, path in paths.items() if os.path.exists(path)}
+
+
+def build(data_dir=DATA_DIR, stages=None, force=False, fetch_world_bank=False, out_dir=None):
+    """Run the pipeline, skipping stages whose inputs and outputs are unchanged.
+
+    Outputs are written to out_dir (default: data_dir), and inputs are read
+    from out_dir when a stage built them there. Returns the names of the
+    stages that ran.
+    """
+    out_dir = out_dir or data_dir
+    os.makedirs(out_dir, exist_ok=True)
+    state = _load_state(out_dir)
+    ran = []
+
+    def input_path(name):
+        built = os.path.join(out_dir, name)
+        return built if os.path.exists(built) else os.path.join(data_dir, name)
+
+    for stage in STAGES:
+        if stages and stage.name not in stages:
+            continue
+        if stage.name in NETWORK_STAGES and not (fetch_world_bank or (stages and stage.name in stages)):
+            continue
+
+        input_paths = {name: input_path(name) for name in stage.inputs}
+        output_paths = {name: os.path.join(out_dir, name) for name in stage.outputs}
+        inputs = _hashes(input_paths)
+        outputs = _hashes(output_paths)
+        missing_inputs = [name for name in stage.inputs if name not in inputs]
+        if missing_inputs:
+            if all(os.path.exists(input_path(name)) for name in stage.outputs):
+                print(f"{stage.name}: skipped, {', '.join(missing_inputs)} not found; keeping existing output")
+                continue
+            raise FileNotFoundError(f"{stage.name}: missing input(s) {', '.join(missing_inputs)}")
+
+        recorded = state.get(stage.name, {})
+        up_to_date = (
+            recorded.get('version') == stage.version
+            and recorded.get('inputs') == inputs
+            and recorded.get('outputs') == outputs
+            and len(outputs) == len(stage.outputs)
+        )
+        if up_to_date and not force:
+            print(f"{stage.name}: up to date")
+            continue
+
+        start = time.perf_counter()
+        stage.run(list(input_paths.values()), list(output_paths.values()))
+        state[stage.name] = {
+            'version': stage.version,
+            'inputs': inputs,
+            'outputs': _hashes(output_paths),
+        }
+        _save_state(out_dir, state)
+        ran.append(stage.name)
+        print(f"{stage.name}: built {', '.join(stage.outputs)} in {time.perf_counter() - start:.2f}s")
+
+    return ran
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('stages', nargs='*', help=f"stages to run (default: all of {[s.name for s in STAGES]})")
+    parser.add_argument('--data-dir', default=DATA_DIR, help="directory holding the CSV files")
+    parser.add_argument('--out-dir', help="write the built CSVs here instead of over those in --data-dir")
+    parser.add_argument('--force', action='store_true', help="rerun stages even if up to date")
+    parser.add_argument('--fetch-world-bank', action='store_true', help="download fresh World Bank data")
+    args = parser.parse_args(argv)
+
+    unknown = set(args.stages) - {stage.name for stage in STAGES}
+    if unknown:
+        parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+
+    build(args.data_dir, args.stages, args.force, args.fetch_world_bank, args.out_dir)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
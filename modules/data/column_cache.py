@@ -0,0 +1,248 @@
+"""
+On-disk columnar cache for the preprocessed datasets.
+
+Each dataset is stored as one ``.npy`` file per column plus a JSON manifest
+that records a fingerprint of the source CSV. Numeric and datetime columns are
+memory-mapped straight back in; string columns are stored as integer codes
+plus a fixed-width unicode array of their unique values, so loading never
+parses text. The cache is rebuilt automatically when the source CSV's size,
+mtime or content hash changes, or when the preprocessing version is bumped.
+
+Loaded frames keep one block per column, so the numeric columns and the
+string/category codes stay views of the mapped files: every process that
+loads the same cache shares those pages through the OS page cache.
+
+A rebuild holds a lock file, so when several processes find the cache stale
+at once (gunicorn workers reloading the same change), one parses the CSV and
+the others wait and load what it wrote. Files of the manifest a rebuild
+replaces are kept for RETIRED_GRACE seconds, for processes that read that
+manifest just before and are still loading it.
+"""
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import time
+import uuid
+
+import numpy as np
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # not on Windows: concurrent rebuilds each parse the CSV
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 2
+RETIRED_GRACE = 300  # seconds the files of a replaced manifest are kept
+
+
+def file_hash(path):
+    """SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _fingerprint(path, known=None):
+    """Size/mtime/hash of a source file, reusing the known hash if size and mtime match."""
+    stat = os.stat(path)
+    fingerprint = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+    if known and all(known.get(k) == v for k, v in fingerprint.items()):
+        fingerprint['sha256'] = known['sha256']
+    else:
+        fingerprint['sha256'] = file_hash(path)
+    return fingerprint
+
+
+def _read_manifest(dataset_dir):
+    try:
+        with open(os.path.join(dataset_dir, 'manifest.json')) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write_manifest(dataset_dir, manifest):
+    tmp_path = os.path.join(dataset_dir, f'manifest.{uuid.uuid4().hex}.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp_path, os.path.join(dataset_dir, 'manifest.json'))
+
+
+def _codes_dtype(n_values):
+    """Smallest signed integer dtype for codes 0..n_values - 1 and -1, as pandas uses."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _save_column(dataset_dir, stem, name, series):
+    """Save one column, returning its manifest entry."""
+    base = os.path.join(dataset_dir, stem)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes, uniques = series.cat.codes.to_numpy(), series.cat.categories.to_numpy()
+        kind = 'category'
+    elif series.dtype == object:
+        codes, uniques = pd.factorize(series, use_na_sentinel=True)
+        kind = 'string'
+    else:
+        np.save(base + '.npy', series.to_numpy())
+        return {'name': name, 'kind': 'array', 'file': os.path.basename(base) + '.npy'}
+
+    np.save(base + '.codes.npy', codes.astype(_codes_dtype(len(uniques))))
+    np.save(base + '.values.npy', np.asarray(uniques).astype(str))
+    return {'name': name, 'kind': kind, 'file': os.path.basename(base)}
+
+
+def _save_index(dataset_dir, stem, index):
+    if isinstance(index, pd.RangeIndex):
+        return {'name': '__index__', 'kind': 'range', 'start': index.start, 'stop': index.stop, 'step': index.step}
+    return _save_column(dataset_dir, stem, '__index__', index.to_series())
+
+
+def _load_column(dataset_dir, entry, shared=False):
+    if entry['kind'] == 'range':
+        return pd.RangeIndex(entry['start'], entry['stop'], entry['step'])
+    path = os.path.join(dataset_dir, entry['file'])
+    if entry['kind'] == 'array':
+        return np.load(path, mmap_mode='r')
+
+    codes = np.load(path + '.codes.npy', mmap_mode='r')
+    uniques = np.load(path + '.values.npy')
+    if entry['kind'] == 'category' or shared:
+        return pd.Categorical.from_codes(codes, categories=uniques.astype(object))
+
+    # Append a NaN so the -1 missing-value code looks up NaN
+    lookup = np.append(uniques.astype(object), np.nan)
+    return lookup[codes]
+
+
+@contextlib.contextmanager
+def _build_lock(dataset_dir):
+    """Hold the dataset's lock file, shared by every process, while rebuilding it."""
+    try:
+        f = open(os.path.join(dataset_dir, 'build.lock'), 'a')
+    except OSError:  # an unwritable cache is reported when saving
+        f = None
+    if f is None or fcntl is None:
+        yield
+        return
+    with f:
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def _save(dataset_dir, frame, source, version):
+    previous = _read_manifest(dataset_dir) or {}
+    prefix = uuid.uuid4().hex
+    now = time.time()
+    retired = [entry for entry in previous.get('retired', []) if now - entry['at'] < RETIRED_GRACE]
+    if previous.get('prefix'):
+        retired.append({'prefix': previous['prefix'], 'at': now})
+
+    columns = [_save_index(dataset_dir, f'{prefix}.index', frame.index)]
+    columns += [
+        _save_column(dataset_dir, f'{prefix}.{i}', name, frame[name])
+        for i, name in enumerate(frame.columns)
+    ]
+    _write_manifest(dataset_dir, {
+        'format': FORMAT_VERSION,
+        'version': version,
+        'source': source,
+        'prefix': prefix,
+        'retired': retired,
+        'columns': columns,
+    })
+
+    # Remove files left behind by earlier builds, except those of recently
+    # replaced manifests and any written in the last RETIRED_GRACE seconds
+    keep = {prefix, *(entry['prefix'] for entry in retired)}
+    for filename in os.listdir(dataset_dir):
+        if not filename.endswith('.npy') or filename.split('.', 1)[0] in keep:
+            continue
+        path = os.path.join(dataset_dir, filename)
+        try:
+            if now - os.path.getmtime(path) >= RETIRED_GRACE:
+                os.remove(path)
+        except OSError:
+            pass
+
+
+def _load(dataset_dir, manifest, shared=False):
+    entries = manifest['columns']
+    index = _load_column(dataset_dir, entries[0])
+    data = {entry['name']: _load_column(dataset_dir, entry, shared) for entry in entries[1:]}
+    # copy=False keeps one block per column instead of copying into consolidated blocks
+    return pd.DataFrame(
+        data, index=index if isinstance(index, pd.Index) else pd.Index(index), copy=False
+    )
+
+
+def _load_fresh(dataset_dir, name, source_path, version, shared):
+    """(frame, source fingerprint); frame is None unless the cache is up to date."""
+    manifest = _read_manifest(dataset_dir)
+    known = manifest['source'] if manifest else None
+    source = _fingerprint(source_path, known)
+
+    if (
+        manifest
+        and manifest.get('format') == FORMAT_VERSION
+        and manifest.get('version') == version
+        and known.get('sha256') == source['sha256']
+    ):
+        try:
+            frame = _load(dataset_dir, manifest, shared)
+            if known != source:
+                # Source was touched but not changed; just refresh the mtime
+                _write_manifest(dataset_dir, {**manifest, 'source': source})
+            return frame, source
+        except (OSError, ValueError, KeyError) as exc:
+            logger.warning("Column cache for %s unreadable, rebuilding: %s", name, exc)
+    return None, source
+
+
+def load_cached(cache_dir, name, source_path, parse, version, shared=False):
+    """Load a preprocessed dataset from the columnar cache, rebuilding it if stale.
+
+    parse(source_path) must return the preprocessed DataFrame; it is only
+    called when the cache is missing, stale or unreadable. With shared,
+    string columns are returned as categoricals over the mapped codes
+    instead of per-process arrays of Python strings.
+    """
+    dataset_dir = os.path.join(cache_dir, name)
+    frame, source = _load_fresh(dataset_dir, name, source_path, version, shared)
+    if frame is not None:
+        return frame
+
+    try:
+        os.makedirs(dataset_dir, exist_ok=True)
+    except OSError as exc:
+        logger.warning("Could not write column cache for %s: %s", name, exc)
+        return parse(source_path)
+
+    with _build_lock(dataset_dir):
+        # Another process may have rebuilt it while this one waited
+        frame, source = _load_fresh(dataset_dir, name, source_path, version, shared)
+        if frame is not None:
+            return frame
+        frame = parse(source_path)
+        try:
+            _save(dataset_dir, frame, source, version)
+        except OSError as exc:
+            logger.warning("Could not write column cache for %s: %s", name, exc)
+            return frame
+    # Reload so the frame is backed by the mapped files like a cache hit
+    try:
+        return _load(dataset_dir, _read_manifest(dataset_dir), shared)
+    except (OSError, ValueError, KeyError, TypeError):
+        return frame
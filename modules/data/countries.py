@@ -0,0 +1,47 @@
+"""
+Country name to ISO 3166-1 alpha-3 mappings shared by the build pipeline and the loader.
+"""
+
+# Names pycountry does not resolve (or resolves wrongly)
+CUSTOM_ISO3 = {
+    'Turkey': 'TUR',
+    'St. Kitts and Nevis': 'KNA',
+    'Swaziland': 'SWZ',
+    'Macau': 'MAC',
+    'Eswatini (Swaziland)': 'SWZ',
+    'Hong Kong': 'HKG',
+    'Hong Kong SAR, China': 'HKG',
+    'Egypt, Arab Rep.': 'EGY',
+    'Venezuela, RB': 'VEN',
+    'Korea, Rep.': 'KOR',
+    "Korea, Dem. People's Rep.": 'PRK',
+    'Macao SAR, China': 'MAC',
+    'Iran, Islamic Rep.': 'IRN',
+    'Yemen, Rep.': 'YEM',
+    'Congo, Dem. Rep.': 'COD',
+    'Congo, Rep.': 'COG',
+    'Bahamas, The': 'BHS',
+    'Gambia, The': 'GMB',
+    'Lao PDR': 'LAO',
+    'Micronesia, Fed. Sts.': 'FSM',
+    'St. Lucia': 'LCA',
+    'St. Vincent and the Grenadines': 'VCT',
+    'St. Martin (French part)': 'MAF',
+    'Virgin Islands (U.S.)': 'VIR',
+    'West Bank and Gaza': 'PSE',
+}
+
+
+def world_bank_by_iso3(wb):
+    """World Bank rows with one row per (iso3c, year), sorted by both.
+
+    Rows without a code get it from CUSTOM_ISO3 (the World Bank spellings,
+    e.g. 'Korea, Rep.', that older downloads left without one). Fuzzy name
+    matching gave a few territories their neighbour's code (Niger -> NGA,
+    Curacao -> NLD, Kosovo -> SRB); where codes collide, the most populous
+    row is kept, the country itself.
+    """
+    wb = wb.assign(iso3c=wb['iso3c'].fillna(wb['country_name'].map(CUSTOM_ISO3)))
+    wb = wb.dropna(subset=['iso3c'])
+    wb = wb.sort_values('population', ascending=False, kind='stable', na_position='last')
+    return wb.drop_duplicates(['iso3c', 'year']).sort_values(['iso3c', 'year'], kind='stable')
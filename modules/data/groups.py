@@ -0,0 +1,58 @@
+"""
+Per-group lookups into one frame.
+
+The stores look up rows by year or (year, country), and there are ~1,500
+such groups. Building a frame per group is most of what building them used
+to cost, so each store keeps its rows ordered by group in one frame and
+slices a group out of it on lookup instead.
+"""
+import numpy as np
+
+
+def group_order(frame, keys, sort=False):
+    """(positions, slices): an order of frame's rows that puts each group together.
+
+    frame.take(positions).iloc[slices[key]] are the rows of the group key in
+    their original order, as groupby(keys) yields them. keys are anything
+    groupby() accepts; groups with a missing key are left out.
+    """
+    groups = frame.groupby(keys, sort=sort, observed=True).indices
+    if not groups:
+        return np.array([], dtype='int64'), {}
+    positions = np.concatenate(list(groups.values()))
+    stops = np.cumsum([len(part) for part in groups.values()])
+    slices = {key: slice(stop - len(part), stop) for (key, part), stop in zip(groups.items(), stops)}
+    return positions, slices
+
+
+class GroupedRows:
+    """Rows of a frame by group, sliced out of one frame on lookup."""
+
+    def __init__(self, rows, slices, empty):
+        self.rows = rows
+        self._slices = slices
+        self._empty = empty
+
+    @classmethod
+    def split(cls, frame, keys, sort=False, prepare=None, empty=None):
+        """Group frame's rows by keys.
+
+        prepare(rows) may add columns, once for all groups. empty is returned
+        for a missing group and defaults to no rows of frame (prepared).
+        """
+        positions, slices = group_order(frame, keys, sort)
+        rows = frame.take(positions)
+        if empty is None:
+            empty = frame.iloc[0:0]
+            empty = empty if prepare is None else prepare(empty)
+        if prepare is not None:
+            rows = prepare(rows)
+        return cls(rows, slices, empty)
+
+    def __contains__(self, key):
+        return key in self._slices
+
+    def get(self, key):
+        """Rows of the group key, or the empty frame."""
+        part = self._slices.get(key)
+        return self._empty if part is None else self.rows.iloc[part]
@@ -0,0 +1,46 @@
+"""
+Versioned handle on the current data index, so reloaded data can be swapped in.
+"""
+import threading
+
+from flask import g, has_request_context
+
+
+class DataHandle:
+    """The current DataIndex, replaced atomically by swap().
+
+    Inside a Flask request, current is pinned to the index it returned on
+    first use, so every callback, hook and query of one request sees the same
+    snapshot even if a reload swaps in a new index half-way through it.
+    """
+
+    def __init__(self, data_index):
+        self._current = data_index
+        self._lock = threading.Lock()
+        self.generation = 0  # number of swaps so far
+
+    @property
+    def latest(self):
+        """The most recently swapped-in index, ignoring any request pin."""
+        return self._current
+
+    @property
+    def current(self):
+        """The index for the current request (the latest one outside requests)."""
+        if not has_request_context():
+            return self._current
+        if "data_index" not in g:
+            g.data_index = self._current
+        return g.data_index
+
+    @property
+    def version(self):
+        """Version of the current index, so a handle can stand in for a DataIndex."""
+        return self.current.version
+
+    def swap(self, data_index):
+        """Make data_index the latest index; returns the one it replaces."""
+        with self._lock:
+            previous, self._current = self._current, data_index
+            self.generation += 1
+        return previous
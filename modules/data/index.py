@@ -0,0 +1,121 @@
+"""
+Partitioned in-memory index over the Billionaires Dashboard datasets.
+
+The callbacks only ever look at one year (and optionally one country) at a
+time, so the datasets are split once at load into per-year and
+per-(year, country) partitions instead of being masked on every request.
+"""
+import hashlib
+
+import pandas as pd
+
+from modules.config import (
+    LEADERBOARD_SIZE, MAP_VIEW_COLOR_QUANTILE, MAP_VIEW_LABELS, MOVERS_SIZE, TREEMAP_TOP_K,
+)
+from .groups import GroupedRows
+from .leaderboard import LeaderboardStore
+from .movers import MoversStore, year_over_year
+from .people import PeopleIndex
+from .treemap import TreemapStore
+
+
+def _build_partitions(frame, years):
+    """Split a frame by year and by (year, country_of_citizenship)."""
+    years = years.to_numpy()
+    return (
+        GroupedRows.split(frame, years),
+        GroupedRows.split(frame, [years, frame['country_of_citizenship'].to_numpy()]),
+    )
+
+
+def _color_range(bill_df, view_type):
+    """Get the min/max values for color scaling across all years."""
+    min_val = bill_df[view_type].min()
+    max_val = bill_df[view_type].max()
+
+    # Cap skewed views at a quantile
+    if view_type in MAP_VIEW_COLOR_QUANTILE:
+        max_val = bill_df[view_type].quantile(MAP_VIEW_COLOR_QUANTILE[view_type])
+
+    return min_val, max_val
+
+
+def data_version(*frames):
+    """Short content hash of the frames; equal data gives the same version in every process."""
+    digest = hashlib.sha256()
+    for frame in frames:
+        digest.update(",".join(map(str, frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _with_hover_text(frame):
+    """Add a preformatted '<view>_hover' text column for every map view."""
+    hover = {}
+    for view_type, label in MAP_VIEW_LABELS.items():
+        values = frame[view_type].map(lambda x: f"{x:.2f}".rstrip("0").rstrip("."))
+        countries = frame["country_of_citizenship"].astype(object)
+        hover[f"{view_type}_hover"] = countries + f"<br>{label}: " + values
+    return frame.assign(**hover)
+
+
+class DataIndex:
+    """Year and (year, country) partitions of the dashboard datasets."""
+
+    def __init__(self, df, bill_df, scatter_data):
+        self.version = data_version(df, bill_df, scatter_data)
+        self.df = df
+        self.bill_df = bill_df = _with_hover_text(bill_df)
+        self.scatter_data = scatter_data = _with_hover_text(scatter_data)
+
+        self._color_ranges = {
+            view_type: _color_range(bill_df, view_type) for view_type in MAP_VIEW_LABELS
+        }
+
+        df_years = df['year']
+        self.years = sorted(int(year) for year in df_years.unique())
+
+        self._billionaires = _build_partitions(df, df_years)
+        self._country_stats = _build_partitions(bill_df, bill_df['year'])
+        self._scatter = _build_partitions(scatter_data, scatter_data['year'])
+
+        self.movements = movements = year_over_year(df, df_years)
+        self.movers_panels = MoversStore(movements, MOVERS_SIZE)
+        self.leaderboards = LeaderboardStore(df, df_years, LEADERBOARD_SIZE, movements)
+        self.treemaps = TreemapStore(df, df_years, TREEMAP_TOP_K)
+        self.people = PeopleIndex(df, df_years, movements)
+
+    @staticmethod
+    def _lookup(partitions, year, country):
+        by_year, by_year_country = partitions
+        if country is None:
+            return by_year.get(year)
+        return by_year_country.get((year, country))
+
+    def color_range(self, view_type):
+        """Precomputed (min, max) color scale bounds for a map view."""
+        return self._color_ranges[view_type]
+
+    def billionaires(self, year, country=None):
+        """Billionaire rows for a year, optionally limited to one country."""
+        return self._lookup(self._billionaires, year, country)
+
+    def leaderboard(self, year, country=None):
+        """Precomputed top-N billionaires for a year, optionally in one country."""
+        return self.leaderboards.top(year, country)
+
+    def movers(self, year, country=None):
+        """Precomputed biggest risers, fallers, newcomers and dropouts of a year."""
+        return self.movers_panels.panel(year, country)
+
+    def treemap(self, year, country=None):
+        """Precomputed treemap hierarchy arrays for a year, optionally in one country."""
+        return self.treemaps.arrays(year, country)
+
+    def country_stats(self, year, country=None):
+        """Per-country billionaire count and wealth rows for a year."""
+        return self._lookup(self._country_stats, year, country)
+
+    def scatter(self, year, country=None):
+        """Scatter-geo marker rows for a year."""
+        return self._lookup(self._scatter, year, country)
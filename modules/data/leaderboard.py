@@ -0,0 +1,57 @@
+"""
+Precomputed top-N leaderboards for the wealth chart.
+"""
+from .groups import GroupedRows
+from .loader import as_float64, flag_labels
+from .movers import CHANGE_COLUMNS, movement_text
+
+# year_over_year() columns the hover text is made of
+MOVEMENT_COLUMNS = ['rank', 'rank_change', 'newcomer', 'previous_year'] + [
+    f'{column}_change{suffix}' for column in CHANGE_COLUMNS for suffix in ('', '_pct')
+]
+
+
+class LeaderboardStore:
+    """Top-N billionaires for every year and every (year, country).
+
+    With the year_over_year() movements of df, the rows also get each wealth
+    chart mode's hover text ('movement_<mode>').
+    """
+
+    def __init__(self, df, years, size, movements=None):
+        self.size = size
+        self._movements = None if movements is None else movements[MOVEMENT_COLUMNS]
+
+        # Sort once by year and descending net worth; ties keep their original order
+        ranked = df[df['net_worth'].notna()].assign(_year=years)
+        ranked = ranked.sort_values('net_worth', ascending=False, kind='stable')
+
+        by_year = ranked.groupby('_year', sort=False).head(size)
+        by_year_country = ranked.groupby(
+            ['_year', 'country_of_citizenship'], sort=False, observed=True
+        ).head(size)
+
+        def prepare(rows):
+            return self._label(rows).drop(columns='_year')
+
+        self._by_year = GroupedRows.split(by_year, '_year', prepare=prepare)
+        self._by_year_country = GroupedRows.split(
+            by_year_country, ['_year', 'country_of_citizenship'], prepare=prepare
+        )
+
+    def _label(self, top):
+        top = top.assign(
+            name_with_flag=flag_labels(top),
+            net_worth=as_float64(top['net_worth']),
+            net_worth_constant=as_float64(top['net_worth_constant']),
+        )
+        if self._movements is None:
+            return top
+        moved = self._movements.reindex(top.index)
+        return top.assign(**{f'movement_{column}': movement_text(moved, column) for column in CHANGE_COLUMNS})
+
+    def top(self, year, country=None):
+        """Top-N rows (descending net worth) with a name_with_flag column."""
+        if country is None:
+            return self._by_year.get(year)
+        return self._by_year_country.get((year, country))
@@ -1,36 +1,231 @@
 """
 Data loading and preprocessing functionality for the Billionaires Dashboard.
 """
+import sys
+
+import numpy as np
 import pandas as pd
 import os
+from modules.config import CONSTANT_USD_YEAR, DATA_CACHE_DIR
+from .column_cache import load_cached
+from .countries import world_bank_by_iso3
+
+# Bump when the preprocessing below changes so cached columns are rebuilt
+PREPROCESSING_VERSION = 2
+
+# In-memory dtypes. 'category' is used for low-cardinality strings and
+# 'interned' for names, which stay object strings but share one Python
+# object per distinct value. Numeric columns not listed default to float32.
+BILLIONAIRE_SCHEMA = {
+    'year': 'int16',
+    'rank': 'float32',
+    'net_worth': 'float32',
+    'age': 'float32',
+    'full_name': 'interned',
+    'organization_name': 'interned',
+    'gender': 'category',
+    'country_of_citizenship': 'category',
+    'iso3c': 'category',
+    'country_of_residence': 'category',
+    'city_of_residence': 'category',
+    'industry': 'category',
+}
+
+# The per-country frames are small and feed the map's colour scale and hover
+# text, so their measures keep full float64 precision.
+COUNTRY_SCHEMA = {
+    'year': 'int16',
+    'country_of_citizenship': 'category',
+    'iso3c': 'category',
+}
+
+# World Bank indicators joined onto the datasets at load, by (iso3c, year)
+WORLD_BANK_SCHEMA = {
+    'year': 'int16',
+    'iso3c': 'category',
+}
+WORLD_BANK_COLUMNS = ['iso3c', 'year', 'population', 'gdp_deflator']
+
+# Source CSV of each dataset, in data_dir
+DATASET_FILES = {
+    'billionaires': 'billionaires_with_country_data.csv',
+    'country_stats': 'billionaire_count_and_wealth_data.csv',
+    'scatter': 'scatter_geo_data_complete.csv',
+    'world_bank': 'world_bank_data_with_iso3c.csv',
+}
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Net worth is published in billions with at most two decimals
+NET_WORTH_DECIMALS = 2
+
+
+def _intern_strings(series):
+    """Object column where equal strings share a single Python object."""
+    codes, uniques = pd.factorize(series)
+    lookup = np.append(np.asarray(uniques, dtype=object), np.nan)
+    return pd.Series(lookup[codes], index=series.index, name=series.name)
+
+
+def _apply_schema(frame, schema, default_float=None):
+    """Cast frame columns to the dtypes in schema."""
+    frame = frame.copy()
+    for column in frame.columns:
+        dtype = schema.get(column)
+        if dtype is None:
+            if default_float and pd.api.types.is_float_dtype(frame[column]):
+                frame[column] = frame[column].astype(default_float)
+        elif dtype == 'interned':
+            frame[column] = _intern_strings(frame[column])
+        else:
+            frame[column] = frame[column].astype(dtype)
+    return frame
 
-def load_and_preprocess_data():
-    """Load and preprocess all required datasets."""
-    # Get the current directory
-    current_dir = os.path.dirname(os.path.abspath(__file__))
-    
+
+def as_float64(values, decimals=NET_WORTH_DECIMALS):
+    """Widen a float32 column for display, dropping float32 representation noise."""
+    return values.astype('float64').round(decimals)
+
+
+def _read_billionaires(path):
+    """Parse and preprocess the main billionaires CSV."""
     # Load main billionaires dataset with low_memory=False to avoid dtype warning
-    df = pd.read_csv(
-        os.path.join(current_dir, 'billionaires_with_country_data.csv'),
-        low_memory=False
+    df = pd.read_csv(path, low_memory=False)
+    df = df[df['year'] >= 2000].reset_index(drop=True)
+    df = df.assign(net_worth=pd.to_numeric(df['net_worth'], errors='coerce'))
+    return _apply_schema(df, BILLIONAIRE_SCHEMA, default_float='float32')
+
+
+def _read_yearly(path):
+    """Parse a per-country yearly CSV, keeping years from 2000 on."""
+    data = pd.read_csv(path)
+    data = data[data['year'] >= 2000].reset_index(drop=True)
+    return _apply_schema(data, COUNTRY_SCHEMA)
+
+
+def _read_world_bank(path):
+    """Parse the World Bank indicators, one row per (iso3c, year)."""
+    wb = world_bank_by_iso3(pd.read_csv(path))
+    return _apply_schema(wb[WORLD_BANK_COLUMNS].reset_index(drop=True), WORLD_BANK_SCHEMA)
+
+
+def country_year_table(wb, last_year):
+    """World Bank indicators indexed by (iso3c, year), for every year up to last_year.
+
+    Missing values, and the years after the latest World Bank release, take the
+    country's latest earlier value.
+    """
+    codes = wb['iso3c'].astype(str).to_numpy()
+    years = wb['year'].to_numpy(dtype=int)
+    table = wb.drop(columns=['iso3c', 'year']).set_axis(
+        pd.MultiIndex.from_arrays([codes, years], names=['iso3c', 'year'])
+    )
+    grid = pd.MultiIndex.from_product(
+        [pd.unique(codes), range(years.min(), last_year + 1)], names=['iso3c', 'year']
     )
-    df['year'] = pd.to_datetime(df['year'], format='%Y')
-    df = df[df['year'].dt.year >= 2000]
-    df['net_worth'] = pd.to_numeric(df['net_worth'], errors='coerce')
+    return table.reindex(grid).groupby(level='iso3c', sort=False).ffill()
+
+
+def _country_year_rows(table, frame):
+    """Rows of table for each (iso3c, year) of frame, NaN where it has none."""
+    keys = pd.MultiIndex.from_arrays([
+        frame['iso3c'].astype(object).to_numpy(), frame['year'].to_numpy(dtype=int)
+    ])
+    return table.reindex(keys)
+
+
+def join_world_bank(df, bill_df, scatter_data, wb):
+    """Add the World Bank derived columns to the datasets, in place.
+
+    bill_df and scatter_data get population, billionaires_per_million and
+    wealth_per_capita (USD per person); df gets net_worth_constant, net worth
+    in billions of CONSTANT_USD_YEAR US dollars. Columns are added rather
+    than assigned so the loaded columns stay views of the cache.
+    """
+    last_year = max(int(df['year'].max()), int(bill_df['year'].max()))
+    table = country_year_table(wb, last_year)
+
+    for frame in (bill_df, scatter_data):
+        population = _country_year_rows(table, frame)['population'].to_numpy()
+        frame['population'] = population
+        frame['billionaires_per_million'] = frame['billionaire_count'].to_numpy() / population * 1e6
+        frame['wealth_per_capita'] = frame['total_wealth'].to_numpy() * 1e9 / population
+
+    # Net worth is in US dollars, so it follows the US price level
+    deflator = table.loc['USA', 'gdp_deflator']
+    factor = (deflator[CONSTANT_USD_YEAR] / deflator).reindex(df['year'].to_numpy(dtype=int))
+    df['net_worth_constant'] = (df['net_worth'].to_numpy() * factor.to_numpy()).astype('float32')
+
+
+def load_and_preprocess_data(use_cache=True, data_dir=None, cache_dir=DATA_CACHE_DIR, shared=False):
+    """Load and preprocess all required datasets.
+
+    The CSVs are read from data_dir (default: this package's directory). With
+    use_cache, each dataset is read from the columnar cache in cache_dir and
+    the CSVs are only parsed when they have changed. shared keeps the string
+    columns as categoricals over the cached codes too, so the frames hold no
+    per-row Python objects (see SHARED_DATA).
+    """
+    # Default to the current directory
+    data_dir = data_dir or DATA_DIR
+
+    def load(name, parse):
+        path = os.path.join(data_dir, DATASET_FILES[name])
+        if not use_cache:
+            return parse(path)
+        return load_cached(cache_dir, name, path, parse, PREPROCESSING_VERSION, shared)
+
+    df = load('billionaires', _read_billionaires)
 
     # Load billionaire counts and wealth data
-    bill_df = pd.read_csv(os.path.join(current_dir, 'billionaire_count_and_wealth_data.csv'))
-    bill_df = bill_df[bill_df['year'] >= 2000]
+    bill_df = load('country_stats', _read_yearly)
 
     # Load geographical data
-    scatter_data = pd.read_csv(os.path.join(current_dir, 'scatter_geo_data_complete.csv'))
-    scatter_data = scatter_data[scatter_data['year'] >= 2000]
+    scatter_data = load('scatter', _read_yearly)
+
+    # Per-capita and constant-dollar columns, joined once here
+    join_world_bank(df, bill_df, scatter_data, load('world_bank', _read_world_bank))
 
     return df, bill_df, scatter_data
 
+
+def data_files(data_dir=None):
+    """Paths of the source CSVs, by dataset name."""
+    data_dir = data_dir or DATA_DIR
+    return {name: os.path.join(data_dir, filename) for name, filename in DATASET_FILES.items()}
+
+def _column_bytes(series):
+    """Bytes held by a column, counting each shared string object once."""
+    if series.dtype != object:
+        return int(series.memory_usage(deep=True, index=False))
+    values = series.to_numpy()
+    unique_objects = {id(value): value for value in values}
+    return int(values.nbytes + sum(sys.getsizeof(value) for value in unique_objects.values()))
+
+
+def memory_report(df, bill_df, scatter_data):
+    """Bytes per dataset and column, largest first within each dataset."""
+    rows = []
+    for dataset, frame in (('billionaires', df), ('country_stats', bill_df), ('scatter', scatter_data)):
+        rows.append((dataset, '(index)', str(frame.index.dtype), int(frame.index.memory_usage(deep=True))))
+        for column in frame.columns:
+            rows.append((dataset, column, str(frame[column].dtype), _column_bytes(frame[column])))
+
+    report = pd.DataFrame(rows, columns=['dataset', 'column', 'dtype', 'bytes'])
+    order = report['dataset'].map({'billionaires': 0, 'country_stats': 1, 'scatter': 2})
+    return report.assign(_order=order).sort_values(['_order', 'bytes'], ascending=[True, False]).drop(columns='_order')
+
+
 def get_flag_emoji(iso3):
     """Convert ISO3 country code to flag emoji."""
     if pd.isna(iso3) or len(iso3) != 3:
         return ''
     iso2 = iso3[:2]
     return ''.join(chr(ord(c) + 127397) for c in iso2)
+
+
+def flag_labels(frame):
+    """Vectorized 'full_name flag ' labels for a frame of billionaires."""
+    iso3c = frame['iso3c'].astype(object)
+    flags = {code: get_flag_emoji(code) for code in iso3c.dropna().unique()}
+    return frame['full_name'].astype(str) + ' ' + iso3c.map(flags).fillna('') + ' '
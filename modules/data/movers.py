@@ -0,0 +1,209 @@
+"""
+Year-over-year rank and net worth movements of every billionaire.
+
+Each row is compared with the same person's row in the previous year of the
+data with one sort and shifted columns over the whole frame, instead of
+joining a year with the one before on every request. The risers, fallers,
+newcomers and dropouts of every year and every (year, country) are then
+split out once, so the movers panel is a dict lookup.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .groups import GroupedRows
+from .loader import as_float64, flag_labels
+
+# Net worth columns compared from year to year (the wealth chart modes)
+CHANGE_COLUMNS = ('net_worth', 'net_worth_constant')
+
+# One year's panel: frames of the top risers, fallers, newcomers and
+# dropouts, and the total number of newcomers and dropouts
+Movers = namedtuple('Movers', [
+    'year', 'previous_year', 'risers', 'fallers', 'newcomers', 'dropouts',
+    'newcomer_count', 'dropout_count',
+])
+
+
+def year_over_year(df, years):
+    """Rank and change since the previous year of the data, for every row of df.
+
+    Returns a frame on df's index with the person's rank in the world and in
+    their country that year (by net worth, ties in row order like the
+    leaderboard), rank_change and country_rank_change (positive is up),
+    '<column>_previous', '<column>_change' and '<column>_change_pct' for
+    CHANGE_COLUMNS, previous_year, newcomer (not on the previous year's
+    list) and dropout (not on the next year's list). Rows without a net
+    worth, and the poorer of two rows under one name in a year, are left out.
+    """
+    frame = pd.DataFrame({
+        'full_name': df['full_name'],
+        'iso3c': df['iso3c'],
+        'country_of_citizenship': df['country_of_citizenship'],
+        'year': years,
+        **{column: as_float64(df[column]) for column in CHANGE_COLUMNS},
+    }, index=df.index)
+    frame = frame[frame['net_worth'].notna() & frame['full_name'].notna()]
+    frame = frame.sort_values('net_worth', ascending=False, kind='stable')
+    frame = frame[~frame.duplicated(['full_name', 'year'])]
+
+    frame['rank'] = frame.groupby('year', sort=False).cumcount() + 1
+    frame['country_rank'] = frame.groupby(
+        ['year', 'country_of_citizenship'], sort=False, observed=True
+    ).cumcount() + 1
+
+    # Sort by person and year, so the previous row of a person is the one before
+    all_years = np.sort(np.asarray(pd.unique(frame['year'])))
+    person = pd.factorize(frame['full_name'])[0]
+    position = np.searchsorted(all_years, frame['year'].to_numpy())
+    order = np.lexsort((position, person))
+    frame = frame.iloc[order]
+    person, position = person[order], position[order]
+
+    has_previous = np.zeros(len(frame), dtype=bool)
+    has_previous[1:] = (person[1:] == person[:-1]) & (position[1:] == position[:-1] + 1)
+    has_next = np.zeros(len(frame), dtype=bool)
+    has_next[:-1] = has_previous[1:]
+
+    def previous(column):
+        values = frame[column].to_numpy(dtype='float64')
+        shifted = np.full(len(values), np.nan)
+        shifted[1:] = values[:-1]
+        return np.where(has_previous, shifted, np.nan)
+
+    same_country = np.zeros(len(frame), dtype=bool)
+    countries = frame['country_of_citizenship'].astype(object).to_numpy()
+    same_country[1:] = countries[1:] == countries[:-1]
+
+    frame['rank_change'] = previous('rank') - frame['rank']
+    frame['country_rank_change'] = np.where(
+        same_country, previous('country_rank') - frame['country_rank'], np.nan
+    )
+    for column in CHANGE_COLUMNS:
+        before = previous(column)
+        frame[f'{column}_previous'] = before
+        frame[f'{column}_change'] = frame[column] - before
+        frame[f'{column}_change_pct'] = (frame[column] / before - 1) * 100
+    frame['previous_year'] = np.where(position > 0, all_years[np.maximum(position - 1, 0)], np.nan)
+    frame['newcomer'] = ~has_previous & (position > 0)
+    frame['dropout'] = ~has_next & (position < len(all_years) - 1)
+    return frame
+
+
+def _with_flags(rows):
+    return rows.assign(name_with_flag=flag_labels(rows))
+
+
+class MoversStore:
+    """Biggest risers and fallers, newcomers and dropouts of every year and (year, country).
+
+    Risers and fallers are ranked by net worth change in current dollars,
+    newcomers and dropouts by net worth. Country panels use the rank within
+    the country (as rank and rank_change). Rows carry name_with_flag labels
+    like the leaderboards.
+    """
+
+    def __init__(self, movements, size):
+        self.size = size
+        years = sorted(int(year) for year in pd.unique(movements['year']))
+        self._previous_year = dict(zip(years[1:], years[:-1]))
+
+        # Dropouts show up in the panel of the year they are missing from
+        dropouts = movements[movements['dropout']].assign(
+            year=lambda frame: frame['year'].map(dict(zip(years[:-1], years[1:])))
+        )
+        compared = movements[movements['net_worth_change'].notna()]
+        panels = {
+            'risers': compared[compared['net_worth_change'] > 0].sort_values(
+                'net_worth_change', ascending=False, kind='stable'),
+            'fallers': compared[compared['net_worth_change'] < 0].sort_values(
+                'net_worth_change', kind='stable'),
+            'newcomers': movements[movements['newcomer']].sort_values(
+                'net_worth', ascending=False, kind='stable'),
+            'dropouts': dropouts.sort_values('net_worth', ascending=False, kind='stable'),
+        }
+
+        self._empty = movements.iloc[0:0].assign(name_with_flag='')
+        self._panels = {}
+        self._counts = {}
+        for name, frame in panels.items():
+            by_country = frame.groupby(['year', 'country_of_citizenship'], sort=False, observed=True)
+            world = frame.groupby('year', sort=False).head(size)
+            country = by_country.head(size)
+            country = country.assign(rank=country['country_rank'], rank_change=country['country_rank_change'])
+            self._panels[name] = (
+                GroupedRows.split(world, 'year', prepare=_with_flags, empty=self._empty),
+                GroupedRows.split(
+                    country, ['year', 'country_of_citizenship'], prepare=_with_flags, empty=self._empty
+                ),
+            )
+            if name in ('newcomers', 'dropouts'):
+                self._counts[name] = (
+                    frame.groupby('year', sort=False).size().to_dict(),
+                    by_country.size().to_dict(),
+                )
+
+    def panel(self, year, country=None):
+        """Movers of a year, optionally within one country."""
+        level, key = (0, year) if country is None else (1, (year, country))
+        rows = {name: panels[level].get(key) for name, panels in self._panels.items()}
+        return Movers(
+            year=year,
+            previous_year=self._previous_year.get(year),
+            newcomer_count=int(self._counts['newcomers'][level].get(key, 0)),
+            dropout_count=int(self._counts['dropouts'][level].get(key, 0)),
+            **rows,
+        )
+
+
+def _one_decimal(values):
+    """f'{value:.1f}' of non-negative floats, as an object array of strings.
+
+    Rounding the scaled values half to even gives format()'s digits except
+    within float error of a tie; those few values (and any inf or NaN) are
+    formatted one by one, so the text is always the same as format()'s.
+    """
+    values = np.asarray(values, dtype='float64')
+    scaled = values * 10
+    exact = np.isfinite(scaled) & (np.abs(scaled - np.floor(scaled) - 0.5) > 1e-6)
+    whole, tenths = np.divmod(np.rint(np.where(exact, scaled, 0)).astype('int64'), 10)
+    text = whole.astype(str).astype(object) + '.' + tenths.astype(str).astype(object)
+    text[~exact] = [f"{value:.1f}" for value in values[~exact]]
+    return text
+
+
+def _integers(values):
+    """Whole numbers as an object array of strings."""
+    return np.asarray(values, dtype='float64').astype('int64').astype(str).astype(object)
+
+
+def movement_text(frame, column='net_worth'):
+    """Hover text with the rank and the change in column since the previous year.
+
+    frame has year_over_year() columns; rows without a rank get ''.
+    """
+    index = frame.index
+    frame = frame[frame['rank'].notna()]
+    if frame.empty:
+        return pd.Series('', index=index, dtype=object)
+    rank = 'Rank #' + _integers(frame['rank'])
+    rank_change = frame['rank_change'].to_numpy(dtype='float64')
+    steps = _integers(np.abs(np.nan_to_num(rank_change)))
+    move = np.select(
+        [frame['newcomer'].to_numpy(dtype=bool), rank_change > 0, rank_change < 0, rank_change == 0],
+        ['new on the list', '▲' + steps, '▼' + steps, 'no change'],
+        default='',
+    )
+    text = np.where(move == '', rank, rank + ' (' + move + ')')
+
+    change = frame[f'{column}_change'].to_numpy(dtype='float64')
+    compared = ~np.isnan(change)
+    change = change[compared]
+    pct = frame[f'{column}_change_pct'].to_numpy(dtype='float64')[compared]
+    text[compared] += (
+        '<br>' + np.where(change >= 0, '+$', '-$').astype(object) + _one_decimal(np.abs(change)) + 'B'
+        + ' (' + np.where(np.signbit(pct), '-', '+').astype(object) + _one_decimal(np.abs(pct)) + '%)'
+        + ' since ' + _integers(frame['previous_year'].to_numpy()[compared])
+    )
+    return pd.Series(text, index=frame.index).reindex(index).fillna('')
@@ -0,0 +1,200 @@
+"""
+Name index and per-person wealth trajectories.
+
+Every distinct full_name is one person, with a stable id (a hash of the name,
+so the same in every process and data version) and a contiguous slice of
+per-year rows in arrays sorted by (person, year). Names are found by prefix
+of the whole name or of any of its words, with binary searches over sorted
+arrays of normalized keys; a query without any prefix match falls back to
+close matches of its words.
+"""
+import difflib
+import hashlib
+import re
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .loader import as_float64
+
+# A search result: the person and their latest year on the list
+Person = namedtuple('Person', ['id', 'name', 'year', 'net_worth', 'country', 'industry'])
+
+# Words a fuzzy match may stand in for, from difflib's 0..1 similarity
+FUZZY_CUTOFF = 0.75
+FUZZY_MATCHES = 5
+
+# Sorts after every character a normalized key can hold
+_KEY_END = '\U0010ffff'
+
+
+def normalize(text):
+    """Case- and accent-free form of a name or query, as used for matching."""
+    text = unicodedata.normalize('NFKD', str(text))
+    return ''.join(c for c in text if not unicodedata.combining(c)).casefold().strip()
+
+
+def name_words(key):
+    """Words of a normalized name or query."""
+    return re.findall(r'\w+', key)
+
+
+def person_id(name):
+    """Stable id of the person listed as name."""
+    return hashlib.blake2b(name.encode(), digest_size=6).hexdigest()
+
+
+def _prefix_range(keys, prefix):
+    """Slice of the sorted keys that start with prefix."""
+    return slice(
+        np.searchsorted(keys, prefix, side='left'),
+        np.searchsorted(keys, prefix + _KEY_END, side='left'),
+    )
+
+
+class PeopleIndex:
+    """Searchable names and year-by-year rows of every billionaire.
+
+    movements is the year_over_year() frame of df, for the ranks.
+
+    Someone listed twice in a year (two people sharing a name) keeps only
+    the wealthier row for that year.
+    """
+
+    def __init__(self, df, years, movements):
+        codes, names = pd.factorize(df['full_name'], sort=True)
+        self.names = np.asarray(names, dtype=object)
+        self.ids = np.array([person_id(name) for name in self.names], dtype=object)
+        self._by_id = {pid: code for code, pid in enumerate(self.ids)}
+        self._by_name = {name: code for code, name in enumerate(self.names)}
+
+        # Rank within each year, as in the movers panel (see year_over_year)
+        net_worth = df['net_worth']
+        rank = movements['rank'].reindex(df.index)
+
+        # One row per (person, year), in person then year order
+        year = years.to_numpy()
+        order = np.lexsort((-net_worth.fillna(-np.inf).to_numpy(), year, codes))
+        order = order[codes[order] >= 0]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = (codes[order][1:] != codes[order][:-1]) | (year[order][1:] != year[order][:-1])
+        order = order[first]
+
+        country = df['country_of_citizenship'].astype('category')
+        industry = df['industry'].astype('category')
+        self._countries = np.asarray(country.cat.categories, dtype=object)
+        self._industries = np.asarray(industry.cat.categories, dtype=object)
+        self._year = year[order].astype('int16')
+        self._net_worth = net_worth.to_numpy()[order]
+        self._net_worth_constant = df['net_worth_constant'].to_numpy()[order]
+        self._rank = rank.to_numpy()[order].astype('float32')
+        self._country = country.cat.codes.to_numpy()[order]
+        self._industry = industry.cat.codes.to_numpy()[order]
+        self._offsets = np.searchsorted(codes[order], np.arange(len(self.names) + 1))
+
+        # Latest row of each person, to rank search results
+        latest = self._offsets[1:] - 1
+        self._latest = latest
+        self._latest_net_worth = np.nan_to_num(self._net_worth[latest].astype('float64'), nan=0.0)
+
+        # Sorted normalized full names and words, each with its person
+        keys = np.array([normalize(name) for name in self.names])
+        self._name_order = np.argsort(keys, kind='stable')
+        self._name_keys = keys[self._name_order]
+        word_people = [(word, code) for code, key in enumerate(keys) for word in set(name_words(key))]
+        words = np.array([word for word, _ in word_people])
+        word_order = np.argsort(words, kind='stable')
+        self._word_keys = words[word_order]
+        self._word_people = np.array([code for _, code in word_people], dtype=np.int32)[word_order]
+        # Fuzzy candidates share the query word's first letter, which keeps
+        # the difflib scan to a small slice of the vocabulary
+        self._vocabulary = {}
+        for word in np.unique(self._word_keys):
+            self._vocabulary.setdefault(word[0], []).append(word)
+
+    def __len__(self):
+        return len(self.names)
+
+    def code(self, person):
+        """Person code for an id or an exact full_name, or None."""
+        code = self._by_id.get(person)
+        return self._by_name.get(person) if code is None else code
+
+    def _result(self, code):
+        row = self._latest[code]
+        return Person(
+            id=self.ids[code],
+            name=self.names[code],
+            year=int(self._year[row]),
+            net_worth=float(as_float64(self._net_worth[row:row + 1])[0]),
+            country=self._country_name(self._country[row]),
+            industry=self._industry_name(self._industry[row]),
+        )
+
+    def _country_name(self, code):
+        return self._countries[code] if code >= 0 else None
+
+    def _industry_name(self, code):
+        return self._industries[code] if code >= 0 else None
+
+    def _word_matches(self, word, prefix=True):
+        if prefix:
+            return self._word_people[_prefix_range(self._word_keys, word)]
+        matches = _prefix_range(self._word_keys, word)
+        found = self._word_keys[matches] == word
+        return self._word_people[matches][found]
+
+    def search(self, query, limit=10):
+        """People whose name, or every word of it, starts with the query's words.
+
+        Whole-name prefix matches come first, then the wealthiest by their
+        latest net worth. Without any prefix match, words are matched loosely.
+        """
+        key = normalize(query)
+        words = name_words(key)
+        if not words:
+            return []
+
+        whole = self._name_order[_prefix_range(self._name_keys, key)]
+        by_words = self._intersect(self._word_matches(word) for word in words)
+        candidates = np.union1d(whole, by_words)
+        if not len(candidates):
+            candidates = self._intersect(
+                np.concatenate([
+                    self._word_matches(close, prefix=False)
+                    for close in difflib.get_close_matches(
+                        word, self._vocabulary.get(word[0], ()), FUZZY_MATCHES, FUZZY_CUTOFF
+                    )
+                ] or [np.array([], dtype=np.int32)])
+                for word in words
+            )
+        if not len(candidates):
+            return []
+
+        order = np.lexsort((-self._latest_net_worth[candidates], ~np.isin(candidates, whole)))
+        return [self._result(code) for code in candidates[order[:limit]]]
+
+    @staticmethod
+    def _intersect(matches):
+        result = None
+        for people in matches:
+            people = np.unique(people)
+            result = people if result is None else np.intersect1d(result, people, assume_unique=True)
+            if not len(result):
+                break
+        return np.array([], dtype=np.int32) if result is None else result
+
+    def trajectory(self, code):
+        """The person's rows, one per year on the list, oldest first."""
+        rows = slice(self._offsets[code], self._offsets[code + 1])
+        country, industry = self._country[rows], self._industry[rows]
+        return pd.DataFrame({
+            'year': self._year[rows],
+            'net_worth': as_float64(self._net_worth[rows]),
+            'net_worth_constant': as_float64(self._net_worth_constant[rows]),
+            'rank': self._rank[rows],
+            'country': np.where(country >= 0, self._countries[country], None),
+            'industry': np.where(industry >= 0, self._industries[industry], None),
+        })
@@ -0,0 +1,159 @@
+"""
+Hot reload of the datasets into a DataHandle.
+
+A DataReloader rebuilds the datasets and their DataIndex on a background
+thread and swaps the result into the handle, so requests keep being served
+from the previous index while the new one is built. Reloads are started by
+request_reload() (the admin endpoint) or by a watcher thread that polls the
+source CSVs and a marker file. Touching the marker makes every process
+watching it reload, which is how one admin request reaches all workers.
+"""
+import logging
+import os
+import threading
+import time
+
+from .index import DataIndex
+from .loader import data_files, load_and_preprocess_data
+
+logger = logging.getLogger(__name__)
+
+
+def build_data_index(shared=False, data_dir=None):
+    """Load the datasets and build their index."""
+    return DataIndex(*load_and_preprocess_data(data_dir=data_dir, shared=shared))
+
+
+def touch(path):
+    """Create path or bump its modification time."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a"):
+        os.utime(path)
+
+
+def _signature(paths):
+    """(mtime, size) of each path, None for a missing one."""
+    signature = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            signature.append(None)
+        else:
+            signature.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+class DataReloader:
+    """Rebuilds the data index in the background and swaps it into a handle.
+
+    build() returns a new DataIndex. Only one reload runs at a time; asking
+    for one while another is running queues a single rerun, so a change made
+    during a rebuild is never missed. A failed rebuild is logged and the
+    handle keeps its current index.
+    """
+
+    def __init__(self, handle, build, watch_paths=(), poll_interval=5.0):
+        self.handle = handle
+        self.build = build
+        self.watch_paths = tuple(watch_paths)
+        self.poll_interval = poll_interval
+        self.reloads = 0
+        self.failures = 0
+        self.last_error = None
+        self.last_reload = None
+        self._lock = threading.Lock()
+        self._running = False
+        self._pending = False
+        self._watcher_pid = None
+
+    def request_reload(self):
+        """Start a reload on a background thread, or queue one after the running reload."""
+        with self._lock:
+            if self._running:
+                self._pending = True
+                return False
+            self._running = True
+        threading.Thread(target=self._run, name="data-reload", daemon=True).start()
+        return True
+
+    def reload(self):
+        """Rebuild and swap in the data index now; True if the data changed."""
+        started = time.perf_counter()
+        try:
+            data_index = self.build()
+        except Exception as exc:  # keep serving the current data
+            logger.exception("Data reload failed, keeping version %s", self.handle.latest.version)
+            with self._lock:
+                self.failures += 1
+                self.last_error = repr(exc)
+            return False
+
+        previous = self.handle.latest
+        with self._lock:
+            self.last_error = None
+            self.last_reload = time.time()
+        if data_index.version == previous.version:
+            logger.info("Data reloaded, version %s unchanged", previous.version)
+            return False
+        self.handle.swap(data_index)
+        with self._lock:
+            self.reloads += 1
+        logger.info(
+            "Data reloaded in %.2fs: version %s -> %s",
+            time.perf_counter() - started, previous.version, data_index.version,
+        )
+        return True
+
+    def _run(self):
+        while True:
+            self.reload()
+            with self._lock:
+                if not self._pending:
+                    self._running = False
+                    return
+                self._pending = False
+
+    def start_watching(self):
+        """Start the watcher thread in this process, once (again after a fork)."""
+        if not self.watch_paths or self._watcher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self._watcher_pid = os.getpid()
+        threading.Thread(target=self._watch, name="data-watch", daemon=True).start()
+
+    def _watch(self):
+        # A change is acted on once the files have stayed the same for a whole
+        # poll interval, so a CSV still being written isn't loaded half-way
+        known = _signature(self.watch_paths)
+        changed = None
+        while True:
+            time.sleep(self.poll_interval)
+            current = _signature(self.watch_paths)
+            if current == known:
+                changed = None
+            elif current != changed:
+                changed = current
+            else:
+                known, changed = current, None
+                self.request_reload()
+
+    def status(self):
+        """Current version and reload counters, for the admin endpoint."""
+        with self._lock:
+            return {
+                "version": self.handle.latest.version,
+                "generation": self.handle.generation,
+                "reloading": self._running,
+                "reloads": self.reloads,
+                "failures": self.failures,
+                "last_reload": self.last_reload,
+                "last_error": self.last_error,
+            }
+
+
+def watched_paths(marker, data_dir=None):
+    """The source CSVs and the reload marker."""
+    return [*data_files(data_dir).values(), marker]
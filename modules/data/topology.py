@@ -0,0 +1,180 @@
+"""
+Pre-simplified world topology for the orthographic map.
+
+plotly.js draws geo subplots from its world topojson, which browsers fetch
+from cdn.plot.ly on the first map render. This pipeline takes that file,
+keeps only the layers the map shows (TOPOJSON_LAYERS), simplifies every
+arc with Douglas-Peucker and writes the result to TOPOJSON_DIR, from where
+the app serves it itself (see modules/callbacks/topology.py).
+
+Arcs are simplified one by one with their end points kept, so borders
+shared by two countries stay shared and no gaps open between them.
+
+Usage:
+    python -m modules.data.topology [--resolution 110 50] [--source URL_OR_DIR] [--tolerance DEGREES]
+"""
+import argparse
+import json
+import os
+import sys
+import urllib.request
+
+import numpy as np
+
+from modules.config import TOPOJSON_DIR, TOPOJSON_LAYERS, TOPOJSON_SOURCE, TOPOJSON_TOLERANCE
+
+RESOLUTIONS = (110, 50)
+
+
+def topology_name(resolution):
+    """Name plotly.js requests for the world scope at a resolution, e.g. world_110m."""
+    return f"world_{resolution}m"
+
+
+def topology_path(resolution, directory=TOPOJSON_DIR):
+    """Path of the built topology for a resolution."""
+    return os.path.join(directory, topology_name(resolution) + ".json")
+
+
+def read_source(source, name):
+    """Topology named name from a URL template ({name}) or a directory of .json files."""
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source.format(name=name), timeout=60) as response:
+            return json.load(response)
+    with open(os.path.join(source, name + ".json")) as f:
+        return json.load(f)
+
+
+def _decode(arc, transform):
+    """Arc as float lon/lat points."""
+    points = np.asarray(arc, dtype=float).reshape(-1, 2)
+    if transform is None:
+        return points
+    return np.cumsum(points, axis=0) * transform["scale"] + transform["translate"]
+
+
+def _encode(points, transform):
+    """Float lon/lat points as a (delta-encoded, if quantized) arc."""
+    if transform is None:
+        return points.tolist()
+    quantized = np.rint((points - transform["translate"]) / transform["scale"]).astype(np.int64)
+    return np.diff(quantized, axis=0, prepend=np.zeros((1, 2), dtype=np.int64)).tolist()
+
+
+def _douglas_peucker(points, tolerance):
+    """Indices of the points kept by Douglas-Peucker, end points included."""
+    keep = np.zeros(len(points), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        start, end = stack.pop()
+        if end - start < 2:
+            continue
+        segment = points[end] - points[start]
+        offsets = points[start + 1:end] - points[start]
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(offsets[:, 0], offsets[:, 1])
+        else:
+            distances = np.abs(segment[0] * offsets[:, 1] - segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            middle = start + 1 + farthest
+            keep[middle] = True
+            stack += [(start, middle), (middle, end)]
+    return np.flatnonzero(keep)
+
+
+def simplify_arc(points, tolerance):
+    """Simplified arc; a closed arc (a whole ring) keeps at least a triangle."""
+    if len(points) <= 2 or tolerance <= 0:
+        return points
+    if np.array_equal(points[0], points[-1]) and len(points) > 3:
+        # Split at the point farthest from the start so both halves keep their ends
+        middle = int(np.argmax(np.hypot(*(points - points[0]).T)))
+        first = simplify_arc(points[:middle + 1], tolerance)
+        second = simplify_arc(points[middle:], tolerance)
+        if len(first) + len(second) - 1 < 4:
+            first = points[[0, max(1, middle // 2), middle]]
+        return np.concatenate([first, second[1:]])
+    return points[_douglas_peucker(points, tolerance)]
+
+
+def _arc_lists(geometry):
+    """The innermost lists of arc references of a geometry."""
+    kind = geometry.get("type")
+    if kind == "GeometryCollection":
+        for child in geometry.get("geometries", []):
+            yield from _arc_lists(child)
+    elif kind == "LineString":
+        yield geometry["arcs"]
+    elif kind in ("MultiLineString", "Polygon"):
+        yield from geometry["arcs"]
+    elif kind == "MultiPolygon":
+        for polygon in geometry["arcs"]:
+            yield from polygon
+
+
+def simplify_topology(topology, tolerance, layers=TOPOJSON_LAYERS):
+    """Topology reduced to layers, with unused arcs dropped and the rest simplified."""
+    objects = {name: topology["objects"][name] for name in layers if name in topology["objects"]}
+    transform = topology.get("transform")
+
+    # Number the arcs the kept layers use, in order of first use
+    renumbered = {}
+    for geometry in objects.values():
+        for refs in _arc_lists(geometry):
+            for ref in refs:
+                renumbered.setdefault(ref if ref >= 0 else ~ref, len(renumbered))
+
+    arcs = [None] * len(renumbered)
+    for old, new in renumbered.items():
+        points = simplify_arc(_decode(topology["arcs"][old], transform), tolerance)
+        arcs[new] = _encode(points, transform)
+
+    for geometry in objects.values():
+        for refs in _arc_lists(geometry):
+            refs[:] = [renumbered[ref] if ref >= 0 else ~renumbered[~ref] for ref in refs]
+
+    simplified = {"type": "Topology", "objects": objects, "arcs": arcs}
+    if transform is not None:
+        simplified["transform"] = transform
+    if "bbox" in topology:
+        simplified["bbox"] = topology["bbox"]
+    return simplified
+
+
+def build_topology(resolution, source=TOPOJSON_SOURCE, tolerance=None, directory=TOPOJSON_DIR):
+    """Fetch, simplify and write the topology for a resolution; returns (source, built) sizes."""
+    name = topology_name(resolution)
+    topology = read_source(source, name)
+    original = len(json.dumps(topology, separators=(",", ":")))
+    if tolerance is None:
+        tolerance = TOPOJSON_TOLERANCE[resolution]
+
+    simplified = simplify_topology(topology, tolerance)
+    os.makedirs(directory, exist_ok=True)
+    path = topology_path(resolution, directory)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(simplified, f, separators=(",", ":"))
+    os.replace(tmp_path, path)
+    return original, os.path.getsize(path)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resolution", type=int, nargs="+", choices=RESOLUTIONS, default=list(RESOLUTIONS))
+    parser.add_argument("--source", default=TOPOJSON_SOURCE,
+                        help="URL template with {name}, or a directory holding world_110m.json etc.")
+    parser.add_argument("--tolerance", type=float, help="simplification in degrees (default: TOPOJSON_TOLERANCE)")
+    parser.add_argument("--directory", default=TOPOJSON_DIR, help="where to write the topologies")
+    args = parser.parse_args(argv)
+
+    for resolution in args.resolution:
+        original, built = build_topology(resolution, args.source, args.tolerance, args.directory)
+        print(f"{topology_name(resolution)}: {original / 1024:.0f} KB -> {built / 1024:.0f} KB")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,160 @@
+"""
+Precomputed hierarchy arrays for the industry treemap.
+
+For every year and every (year, country) the root -> industry -> billionaire
+hierarchy is built once at load, vectorized across all partitions, so the
+treemap callback only wraps ready-made arrays in a go.Treemap. A partition's
+arrays are sliced out of the shared node arrays when it is looked up.
+"""
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from .loader import as_float64
+
+# Node arrays in go.Treemap order: leaves, then industries, then the root.
+# colors holds an index into the treemap palette: industries are numbered by
+# total net worth (largest first) and the root takes the next index.
+TreemapArrays = namedtuple('TreemapArrays', ['ids', 'labels', 'parents', 'values', 'colors'])
+
+OTHER_LABEL = 'Other'
+
+EMPTY_TREEMAP = TreemapArrays(
+    ids=np.array([], dtype=object),
+    labels=np.array([], dtype=object),
+    parents=np.array([], dtype=object),
+    values=np.array([], dtype=float),
+    colors=np.array([], dtype=int),
+)
+
+
+def treemap_title(country):
+    """Label of the treemap root."""
+    if country is None:
+        return "All Billionaires in the World"
+    return "All Billionaires in " + country
+
+
+def _leaves(rows, keys, top_k):
+    """Net worth per (partition, industry, name), optionally truncated to top_k per industry."""
+    leaves = rows.groupby(keys + ['industry', 'name'], sort=False).value.sum().reset_index()
+    if top_k is None:
+        return leaves
+
+    leaves = leaves.sort_values(keys + ['industry', 'value'], ascending=False, kind='stable')
+    rank = leaves.groupby(keys + ['industry'], sort=False).cumcount()
+    other = (
+        leaves[rank >= top_k]
+        .groupby(keys + ['industry'], sort=False).value.sum()
+        .reset_index()
+        .assign(name=OTHER_LABEL)
+    )
+    return pd.concat([leaves[rank < top_k], other], ignore_index=True)
+
+
+def _build(rows, keys, top_k):
+    """Hierarchies of every partition of rows, keyed like the data index."""
+    leaves = _leaves(rows, keys, top_k).sort_values(
+        keys + ['industry', 'value'], ascending=[True] * (len(keys) + 1) + [False], kind='stable'
+    )
+
+    industries = leaves.groupby(keys + ['industry'], sort=True).value.sum().reset_index()
+    industries['color'] = (
+        industries.groupby(keys, sort=False).value
+        .rank(method='first', ascending=False).astype(int) - 1
+    )
+
+    # Root label per partition, then the ids the leaves and industries hang off
+    if 'country' in keys:
+        industries['title'] = industries['country'].map(treemap_title)
+    else:
+        industries['title'] = treemap_title(None)
+    industries['node_id'] = industries['title'] + '/' + industries['industry']
+    leaves = leaves.merge(
+        industries[keys + ['industry', 'node_id', 'color']], on=keys + ['industry'], how='left'
+    )
+
+    roots = industries.groupby(keys, sort=True).agg(
+        value=('value', 'sum'), title=('title', 'first'), count=('industry', 'size')
+    )
+
+    return _Hierarchies(
+        leaves=(
+            (leaves['node_id'] + '/' + leaves['name']).to_numpy(dtype=object),
+            leaves['name'].to_numpy(dtype=object),
+            leaves['node_id'].to_numpy(dtype=object),
+            leaves['value'].to_numpy(),
+            leaves['color'].to_numpy(),
+        ),
+        industries=(
+            industries['node_id'].to_numpy(dtype=object),
+            industries['industry'].to_numpy(dtype=object),
+            industries['title'].to_numpy(dtype=object),
+            industries['value'].to_numpy(),
+            industries['color'].to_numpy(),
+        ),
+        leaf_groups=leaves.groupby(keys, sort=False).indices,
+        industry_groups=industries.groupby(keys, sort=False).indices,
+        roots={
+            key: (title, value, count)
+            for key, title, value, count in zip(
+                roots.index, roots['title'], roots['value'], roots['count']
+            )
+        },
+    )
+
+
+class _Hierarchies:
+    """Node arrays of every partition, and the positions of each partition's nodes."""
+
+    def __init__(self, leaves, industries, leaf_groups, industry_groups, roots):
+        self._leaves = leaves
+        self._industries = industries
+        self._leaf_groups = leaf_groups
+        self._industry_groups = industry_groups
+        self._roots = roots
+
+    def get(self, key):
+        """TreemapArrays of the partition key, or None."""
+        root = self._roots.get(key)
+        if root is None:
+            return None
+        title, value, count = root
+        leaf, industry = self._leaf_groups[key], self._industry_groups[key]
+        root_nodes = ([title], [title], [''], [value], [count])
+        return TreemapArrays(*(
+            np.concatenate([leaves[leaf], industries[industry], root])
+            for leaves, industries, root in zip(self._leaves, self._industries, root_nodes)
+        ))
+
+
+class TreemapStore:
+    """Treemap hierarchy arrays for every year and every (year, country)."""
+
+    def __init__(self, df, years, top_k=None):
+        self.top_k = top_k
+
+        has_industry = df['industry'].notna()
+        rows = df[has_industry]
+        rows = pd.DataFrame({
+            'year': years[has_industry].to_numpy(),
+            'country': rows['country_of_citizenship'].astype(object).to_numpy(),
+            'industry': rows['industry'].astype(object).to_numpy(),
+            'name': rows['full_name'].astype(str).to_numpy(),
+            'value': as_float64(rows['net_worth']).fillna(0).to_numpy(),
+        })
+
+        self._by_year = _build(rows, ['year'], top_k)
+        self._by_year_country = _build(rows.dropna(subset=['country']), ['year', 'country'], top_k)
+
+    def arrays(self, year, country=None):
+        """Hierarchy arrays for a year, optionally limited to one country."""
+        if country is None:
+            arrays = self._by_year.get(year)
+        else:
+            arrays = self._by_year_country.get((year, country))
+        if arrays is None:
+            # No billionaires with an industry: an empty treemap, as px draws it
+            arrays = EMPTY_TREEMAP
+        return arrays
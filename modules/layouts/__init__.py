@@ -5,6 +5,8 @@ from .main_layout import create_layout
 from .components import (
     create_title_row,
     create_visualization_row,
+    create_movers_row,
     create_treemap_row,
-    create_controls_row
+    create_controls_row,
+    create_trajectory_modal
 )
\ No newline at end of file
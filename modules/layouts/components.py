@@ -4,27 +4,65 @@ Individual layout components for the Billionaires Dashboard.
 from dash import dcc, html
 import dash_bootstrap_components as dbc
 from modules.config import (
-    PLAY_BUTTON_STYLE, SLIDER_STYLE,
-    CONTROLS_MARGIN_TOP
+    PLAY_BUTTON_STYLE, SLIDER_STYLE, ANIMATION_STATUS_STYLE,
+    CONTROLS_MARGIN_TOP,
+    DATA_RELOAD_ENABLED, DATA_VERSION_POLL,
+    CONSTANT_USD_YEAR
 )
 
 def create_title_row():
-    """Create the title row."""
+    """Create the title row, with the billionaire search box."""
     return dbc.Row([
         dbc.Col(html.H2(
             "The Plutonomy Profiler", 
             className="text-left mb-2"), 
-            width=12, 
-            style={"color": "#D43F96"})
+            width=8, 
+            style={"color": "#D43F96"}),
+        dbc.Col(
+            dcc.Dropdown(
+                id="person-search",
+                options=[],
+                placeholder="Search billionaires...",
+                searchable=True,
+                clearable=True,
+            ),
+            width=4,
+            className="pt-1",
+        ),
     ])
 
-def create_visualization_row():
+def create_trajectory_modal():
+    """Create the modal with one billionaire's wealth over the years."""
+    return dbc.Modal([
+        dbc.ModalHeader(dbc.ModalTitle(id="trajectory-title")),
+        dbc.ModalBody([
+            html.P(id="trajectory-summary", className="mb-2"),
+            dcc.Graph(id="trajectory-chart", config={'displayModeBar': False}),
+        ]),
+    ], id="trajectory-modal", is_open=False, size="lg")
+
+def create_visualization_row(topojson_url=None):
     """Create the row containing wealth chart and world map."""
+    map_config = {'displayModeBar': False}
+    if topojson_url:
+        map_config['topojsonURL'] = topojson_url
+
     return dbc.Row([
         # Wealth Chart Column
         dbc.Col(
             dbc.Card(
                 dbc.CardBody([
+                    dbc.RadioItems(
+                        options=[
+                            {"label": "Current USD", "value": "net_worth"},
+                            {"label": f"{CONSTANT_USD_YEAR} USD", "value": "net_worth_constant"},
+                        ],
+                        value="net_worth",
+                        inline=True,
+                        id="wealth-options",
+                        className="pe-2",
+                        style={"textAlign": "right"},
+                    ),
                     dcc.Graph(
                         id="wealth-chart",
                         config={
@@ -47,6 +85,8 @@ def create_visualization_row():
                             options=[
                                 {"label": "Billionaire Count", "value": "billionaire_count"},
                                 {"label": "Wealth as % of GDP", "value": "percent_of_gdp"},
+                                {"label": "Per Million People", "value": "billionaires_per_million"},
+                                {"label": "Wealth per Capita", "value": "wealth_per_capita"},
                             ],
                             value="billionaire_count",
                             inline=True,
@@ -61,7 +101,7 @@ def create_visualization_row():
                         html.Div(
                             dcc.Graph(
                             id="choro-map",
-                            config={'displayModeBar': False},
+                            config=map_config,
                             style={"height": "350px"},
                         ),
                         id = "map-container",
@@ -75,6 +115,17 @@ def create_visualization_row():
         ),
     ], className="mb-4")
 
+def create_movers_row():
+    """Create the row with the biggest risers and fallers since the previous year."""
+    return dbc.Row([
+        dbc.Col(
+            dbc.Card(
+                dbc.CardBody(html.Div(id="movers-panel")),
+            ),
+            width=12
+        )
+    ], className="mb-4")
+
 def create_treemap_row():
     """Create the treemap row."""
     return dbc.Row([
@@ -89,7 +140,11 @@ def create_treemap_row():
         )
     ])
 
-def create_controls_row(min_year, max_year):
+def year_marks(min_year, max_year):
+    """Year slider marks, one per year."""
+    return {str(year): str(year) for year in range(min_year, max_year + 1)}
+
+def create_controls_row(min_year, max_year, data_version=None):
     """Create the controls row with slider and play button."""
     return dbc.Row([
         dbc.Col([
@@ -99,13 +154,14 @@ def create_controls_row(min_year, max_year):
                     id="play-button",
                     style={**PLAY_BUTTON_STYLE, "marginRight": "5px"}
                 ),
+                html.Span(id="animation-status", style=ANIMATION_STATUS_STYLE),
                 html.Div([
                     dcc.Slider(
                         id="year-slider",
                         min=min_year,
                         max=max_year,
                         value=min_year,
-                        marks={str(year): str(year) for year in range(min_year, max_year + 1)},
+                        marks=year_marks(min_year, max_year),
                         step=None,
                         className="no-border"
                     )
@@ -115,6 +171,23 @@ def create_controls_row(min_year, max_year):
                     interval=1000,
                     n_intervals=0,
                     disabled=True
+                ),
+                # Year shown by the figure callbacks, synced from the slider
+                dcc.Store(id="selected-year", data=min_year),
+                # Per-year frames for clientside animation, loaded on first Play
+                # (requested by setting the data version they are needed for)
+                dcc.Store(id="animation-frames"),
+                dcc.Store(id="animation-frames-request"),
+                # Rows of a year for clientside country filtering, loaded on
+                # the first country click in it (requested by setting the year)
+                dcc.Store(id="year-rows"),
+                dcc.Store(id="year-rows-request"),
+                # Version of the data the page was rendered from, checked for reloads
+                dcc.Store(id="data-version", data=data_version),
+                dcc.Interval(
+                    id="data-version-interval",
+                    interval=DATA_VERSION_POLL,
+                    disabled=not DATA_RELOAD_ENABLED
                 )
             ], style={
                 "display": "flex",
@@ -5,26 +5,38 @@ import dash_bootstrap_components as dbc
 from .components import (
     create_title_row,
     create_visualization_row,
+    create_movers_row,
     create_treemap_row,
-    create_controls_row
+    create_controls_row,
+    create_trajectory_modal
 )
 
-def create_layout(df):
-    """Create the main layout of the application."""
+def create_layout(df, topojson_url=None, data_version=None):
+    """Create the main layout of the application.
+
+    topojson_url points the map at a self-hosted world topology (plotly's CDN if None).
+    data_version is the version of the data df comes from, see modules/callbacks/data_reload.py.
+    """
     # Get min and max years for the slider
-    min_year = df['year'].dt.year.min()
-    max_year = df['year'].dt.year.max()
+    min_year = int(df['year'].min())
+    max_year = int(df['year'].max())
     
     return dbc.Container([
         # Title
         create_title_row(),
         
         # Visualizations
-        create_visualization_row(),
+        create_visualization_row(topojson_url),
         
+        # Biggest movers since the previous year
+        create_movers_row(),
+
         # Treemap
         create_treemap_row(),
         
         # Controls
-        create_controls_row(min_year, max_year)
+        create_controls_row(min_year, max_year, data_version),
+
+        # Wealth trajectory of a searched or clicked billionaire
+        create_trajectory_modal()
     ], fluid=True)
@@ -0,0 +1,4 @@
+"""
+Static export of the dashboard's chart responses.
+"""
+from .bundle import StaticBundle, state_key, write_bundle
@@ -0,0 +1,140 @@
+"""
+Bundles of pre-rendered chart responses (see modules/static/export.py).
+
+A bundle is a directory named by a hash of its contents. It holds
+manifest.json and one gzipped JSON fragment per distinct response value;
+the manifest maps every state key (an output plus the values of the inputs
+it depends on) to its fragment, so equal responses are stored once. The
+directory bundles are written to keeps the id of the latest in LATEST.
+"""
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from cachetools import LRUCache
+
+FORMAT = 1
+MANIFEST = "manifest.json"
+LATEST = "LATEST"
+FRAGMENTS = "fragments"
+
+
+def state_key(output, values):
+    """Key of an output ('id.property') for the values of the inputs it depends on."""
+    return json.dumps([output, *values], separators=(",", ":"))
+
+
+def write_bundle(directory, outputs, rendered, data_version, code_version):
+    """Write a bundle under directory and make it the latest; returns its path.
+
+    outputs maps each bundled output to the inputs its states are keyed by,
+    and rendered yields (state key, digest of the JSON, gzipped JSON).
+    """
+    os.makedirs(directory, exist_ok=True)
+    staging = tempfile.mkdtemp(dir=directory, prefix=".staging-")
+    try:
+        os.makedirs(os.path.join(staging, FRAGMENTS))
+        entries = {}
+        written = set()
+        for key, digest, body in rendered:
+            name = f"{FRAGMENTS}/{digest}.json.gz"
+            if name not in written:
+                with open(os.path.join(staging, name), "wb") as f:
+                    f.write(body)
+                written.add(name)
+            entries[key] = name
+
+        manifest = {
+            "format": FORMAT,
+            "data_version": data_version,
+            "code_version": code_version,
+            "outputs": {output: list(inputs) for output, inputs in outputs.items()},
+            "entries": dict(sorted(entries.items())),
+        }
+        encoded = json.dumps(manifest, separators=(",", ":")).encode()
+        bundle_id = hashlib.sha256(encoded).hexdigest()[:16]
+        manifest["created"] = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        with open(os.path.join(staging, MANIFEST), "w") as f:
+            json.dump(manifest, f, indent=1)
+
+        path = os.path.join(directory, bundle_id)
+        if os.path.isdir(path):
+            shutil.rmtree(staging)  # the same bundle was exported before
+        else:
+            os.rename(staging, path)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    latest = os.path.join(directory, LATEST)
+    with open(latest + ".tmp", "w") as f:
+        f.write(bundle_id + "\n")
+    os.replace(latest + ".tmp", latest)
+    return path
+
+
+def resolve_bundle(path):
+    """Bundle directory at path, or the latest bundle when path is an export directory."""
+    if os.path.exists(os.path.join(path, MANIFEST)):
+        return path
+    with open(os.path.join(path, LATEST)) as f:
+        return os.path.join(path, f.read().strip())
+
+
+class StaticBundle:
+    """A bundle opened for serving.
+
+    Fragments are read from disk on first use and kept decompressed in an
+    LRU bounded by their total size (max_bytes).
+    """
+
+    def __init__(self, path, max_bytes):
+        self.path = resolve_bundle(path)
+        with open(os.path.join(self.path, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest.get("format") != FORMAT:
+            raise ValueError(f"{self.path}: unsupported bundle format {manifest.get('format')!r}")
+        self.id = os.path.basename(os.path.normpath(self.path))
+        self.data_version = manifest["data_version"]
+        self.code_version = manifest["code_version"]
+        self.outputs = {output: tuple(inputs) for output, inputs in manifest["outputs"].items()}
+        self._entries = manifest["entries"]
+        self._fragments = LRUCache(maxsize=max_bytes, getsizeof=len)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fragment(self, output, values):
+        """Encoded JSON value of output for its input values, or None if the bundle lacks it."""
+        name = self._entries.get(state_key(output, values))
+        with self._lock:
+            if name is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            fragment = self._fragments.get(name)
+        if fragment is None:
+            with gzip.open(os.path.join(self.path, name), "rb") as f:
+                fragment = f.read()
+            if len(fragment) <= self._fragments.maxsize:
+                with self._lock:
+                    self._fragments[name] = fragment
+        return fragment
+
+    def invalidate(self):
+        """Drop the fragments kept in memory."""
+        with self._lock:
+            self._fragments.clear()
+
+    def stats(self):
+        """Hit/miss counters (states found or missing in the bundle)."""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
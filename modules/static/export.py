@@ -0,0 +1,130 @@
+"""
+Static export: every chart state of the dashboard, pre-rendered.
+
+The charts only depend on the year, the selected country, the map view and
+the wealth chart mode: a few thousand states in all. This renders every
+bundled output (BUNDLE_OUTPUTS) for each of them on a process pool and
+writes a content-hashed bundle of gzipped JSON fragments (see
+modules/static/bundle.py). The app serves the charts from it with
+BILLIONAIRE_STATIC_BUNDLE set (see modules/callbacks/static_bundle.py).
+
+The bundle is tied to the data and code versions it was rendered from;
+export again after either changes.
+
+Usage:
+    python -m modules.static.export [--out DIR] [--workers N]
+"""
+import argparse
+import gzip
+import hashlib
+import itertools
+import multiprocessing
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from plotly.io.json import to_json_plotly
+
+from modules.callbacks.movers import movers_update
+from modules.callbacks.response_cache import CODE_VERSION
+from modules.callbacks.static_bundle import BUNDLE_OUTPUTS
+from modules.callbacks.treemap import treemap_update
+from modules.callbacks.wealth_chart import wealth_chart_update
+from modules.callbacks.world_map import build_world_map
+from modules.config import (
+    MAP_VIEW_LABELS,
+    SHARED_DATA,
+    STATIC_EXPORT_DIR,
+    STATIC_EXPORT_GZIP_LEVEL,
+    STATIC_EXPORT_WORKERS,
+    WEALTH_CHART_MODES,
+)
+from modules.data import DataIndex, load_and_preprocess_data
+from .bundle import FRAGMENTS, StaticBundle, state_key, write_bundle
+
+# Bundled output -> builder, called with the data index and the values of
+# the output's BUNDLE_OUTPUTS inputs
+RENDERERS = {
+    "wealth-chart.figure": lambda data_index, year, country, mode: wealth_chart_update(
+        data_index, year, country, mode=mode
+    ),
+    "choro-map.figure": build_world_map,
+    "industrytreemap.figure": treemap_update,
+    "movers-panel.children": movers_update,
+}
+
+# Data index of a worker process: inherited from the exporting process when
+# the pool forks, loaded by _init_worker otherwise
+_data_index = None
+
+
+def _init_worker():
+    global _data_index
+    if _data_index is None:
+        _data_index = DataIndex(*load_and_preprocess_data(shared=SHARED_DATA))
+
+
+def input_values(data_index):
+    """Every value each bundled input can take."""
+    countries = data_index.bill_df['country_of_citizenship'].dropna().unique()
+    return {
+        "selected-year.data": list(data_index.years),
+        "selected-country.children": [None, *sorted(str(country) for country in countries)],
+        "switch-options.value": list(MAP_VIEW_LABELS),
+        "wealth-options.value": list(WEALTH_CHART_MODES),
+    }
+
+
+def _render(output, year):
+    """(state key, digest, gzipped JSON) of output for every state in year."""
+    inputs = BUNDLE_OUTPUTS[output]
+    values = dict(input_values(_data_index), **{"selected-year.data": [year]})
+    rendered = []
+    for state in itertools.product(*(values[name] for name in inputs)):
+        encoded = to_json_plotly(RENDERERS[output](_data_index, *state)).encode()
+        rendered.append((
+            state_key(output, state),
+            hashlib.sha256(encoded).hexdigest()[:16],
+            gzip.compress(encoded, compresslevel=STATIC_EXPORT_GZIP_LEVEL, mtime=0),
+        ))
+    return rendered
+
+
+def export(out_dir=STATIC_EXPORT_DIR, workers=STATIC_EXPORT_WORKERS):
+    """Render every state and write the bundle; returns its path."""
+    global _data_index
+    _data_index = DataIndex(*load_and_preprocess_data(shared=SHARED_DATA))
+    tasks = [(output, year) for output in BUNDLE_OUTPUTS for year in _data_index.years]
+
+    def write(batches):
+        rendered = itertools.chain.from_iterable(batches)
+        return write_bundle(out_dir, BUNDLE_OUTPUTS, rendered, _data_index.version, CODE_VERSION)
+
+    if workers <= 1:
+        return write(itertools.starmap(_render, tasks))
+
+    # Forked workers share the loaded data instead of loading their own
+    methods = multiprocessing.get_all_start_methods()
+    context = multiprocessing.get_context("fork" if "fork" in methods else None)
+    with ProcessPoolExecutor(workers, mp_context=context, initializer=_init_worker) as pool:
+        return write(pool.map(_render, *zip(*tasks)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--out", default=STATIC_EXPORT_DIR, help="directory to write the bundle under")
+    parser.add_argument("--workers", type=int, default=STATIC_EXPORT_WORKERS,
+                        help="render processes (1 renders in this process)")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    path = export(args.out, args.workers)
+    bundle = StaticBundle(path, 0)
+    fragments = [entry.stat().st_size for entry in os.scandir(os.path.join(path, FRAGMENTS))]
+    print(f"{path}: {len(bundle)} states, {len(fragments)} distinct responses, "
+          f"{sum(fragments) / 2**20:.1f} MiB gzipped, in {time.perf_counter() - start:.0f}s")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
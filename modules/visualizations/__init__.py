@@ -3,4 +3,7 @@ Visualization creation and configuration.
 """
 from .wealth_chart import create_wealth_chart
 from .world_map import create_world_map
-from .treemap import create_treemap
\ No newline at end of file
+from .treemap import create_treemap
+from .serialize import serialize_figure
+from .trajectory import create_trajectory_chart
+from .movers import create_movers_panel
@@ -0,0 +1,52 @@
+"""
+Movers panel for the Billionaires Dashboard: biggest risers and fallers,
+newcomers and dropouts since the previous year.
+"""
+from dash import html
+import dash_bootstrap_components as dbc
+
+
+def _rank_change(change):
+    if change != change or change == 0:  # NaN: no rank to compare in this scope
+        return ""
+    return f"▲{change:.0f}" if change > 0 else f"▼{-change:.0f}"
+
+
+def _table(title, rows, cells):
+    """Small table of one list; cells maps a row to its value cells."""
+    body = [
+        html.Tr([html.Td(label)] + [html.Td(cell, className="text-end") for cell in cells(row)])
+        for label, row in zip(rows['name_with_flag'], rows.itertuples())
+    ]
+    return dbc.Col([
+        html.H6(title, className="mb-1"),
+        dbc.Table(html.Tbody(body), size="sm", borderless=True, className="mb-0")
+        if body else html.P("None", className="text-muted small mb-0"),
+    ], width=3)
+
+
+def create_movers_panel(movers, country=None):
+    """Create the movers panel from a MoversStore panel."""
+    if movers.previous_year is None:
+        return html.P(f"No earlier year to compare {movers.year} with.", className="text-muted mb-0")
+
+    scope = f" in {country}" if country else ""
+    return html.Div([
+        html.H5(f"Biggest movers{scope} since {movers.previous_year}", className="mb-2"),
+        dbc.Row([
+            _table("Risers", movers.risers, lambda row: [
+                f"+${row.net_worth_change:.1f}B ({row.net_worth_change_pct:+.0f}%)",
+                _rank_change(row.rank_change),
+            ]),
+            _table("Fallers", movers.fallers, lambda row: [
+                f"-${-row.net_worth_change:.1f}B ({row.net_worth_change_pct:+.0f}%)",
+                _rank_change(row.rank_change),
+            ]),
+            _table(f"Newcomers ({movers.newcomer_count})", movers.newcomers, lambda row: [
+                f"${row.net_worth:.1f}B", f"#{row.rank}",
+            ]),
+            _table(f"Dropped off ({movers.dropout_count})", movers.dropouts, lambda row: [
+                f"was ${row.net_worth:.1f}B",
+            ]),
+        ], className="g-3"),
+    ])
@@ -0,0 +1,93 @@
+"""
+Compact serialization of the dashboard figures.
+
+A go.Figure carries the whole default plotly template, styling for every
+trace type and subplot kind, and its arrays at full float64 precision.
+serialize_figure turns a figure into the dict Dash sends, keeping only the
+template parts its traces use and rounding the arrays in FIGURE_DECIMALS
+to what the charts display. Integral arrays are sent as integers.
+
+The bundled plotly.js predates its base64 typed-array format, so arrays
+stay JSON lists; response compression takes care of repeated strings.
+"""
+import functools
+
+import numpy as np
+import plotly.io as pio
+from modules.config import COMPACT_FIGURES, FIGURE_DECIMALS
+
+# Trace attribute placing a trace on a subplot -> template layout keys styling that subplot
+SUBPLOT_TEMPLATE_KEYS = {
+    "xaxis": ("xaxis",),
+    "yaxis": ("yaxis",),
+    "geo": ("geo",),
+    "scene": ("scene",),
+    "subplot": ("polar", "ternary", "mapbox"),
+}
+ALL_SUBPLOT_TEMPLATE_KEYS = frozenset(key for keys in SUBPLOT_TEMPLATE_KEYS.values() for key in keys)
+
+
+@functools.lru_cache(maxsize=None)
+def compact_template(trace_types, subplot_keys):
+    """Default template reduced to the given trace types and subplot layout keys.
+
+    The returned dict is shared between figures and must not be modified.
+    """
+    template = pio.templates[pio.templates.default].to_plotly_json()
+    return {
+        "data": {
+            trace_type: traces
+            for trace_type, traces in template.get("data", {}).items()
+            if trace_type in trace_types
+        },
+        "layout": {
+            key: value
+            for key, value in template.get("layout", {}).items()
+            if key not in ALL_SUBPLOT_TEMPLATE_KEYS or key in subplot_keys
+        },
+    }
+
+
+def round_array(value, decimals):
+    """value rounded to decimals places, as integers if that makes it integral."""
+    array = np.asarray(value)
+    if array.dtype.kind not in "fiu" or array.ndim == 0:
+        return value
+    if array.dtype.kind == "f":
+        array = np.round(array, decimals)
+        if np.isfinite(array).all() and (array == np.trunc(array)).all():
+            array = array.astype(np.int64)
+    return array
+
+
+def _round_trace(trace, decimals):
+    for path, places in decimals.items():
+        *parents, name = path.split(".")
+        target = trace
+        for parent in parents:
+            target = target.get(parent)
+            if not isinstance(target, dict):
+                break
+        else:
+            if target.get(name) is not None:
+                target[name] = round_array(target[name], places)
+
+
+def serialize_figure(fig):
+    """Figure as the dict sent to the browser, compacted with COMPACT_FIGURES."""
+    figure = fig.to_plotly_json()
+    if not COMPACT_FIGURES:
+        return figure
+
+    trace_types = frozenset(trace.type for trace in fig.data)
+    subplot_keys = frozenset(
+        key
+        for trace in fig.data
+        for attribute, keys in SUBPLOT_TEMPLATE_KEYS.items()
+        if attribute in trace
+        for key in keys
+    )
+    figure["layout"]["template"] = compact_template(trace_types, subplot_keys)
+    for trace in figure["data"]:
+        _round_trace(trace, FIGURE_DECIMALS.get(trace.get("type"), {}))
+    return figure
@@ -0,0 +1,48 @@
+"""
+Wealth trajectory of one billionaire for the Billionaires Dashboard.
+"""
+import numpy as np
+import plotly.graph_objects as go
+from modules.config import PLOT_BGCOLOR, PAPER_BGCOLOR, WEALTH_CHART_MODES
+
+
+def create_trajectory_chart(trajectory):
+    """Create the net worth by year line chart of one person.
+
+    trajectory is a PeopleIndex.trajectory() frame; the rank, country and
+    industry of each year are shown on hover.
+    """
+    customdata = np.column_stack([
+        trajectory['rank'].map(lambda rank: f"#{rank:.0f}" if rank == rank else "unranked"),
+        trajectory['country'].fillna("Unknown"),
+        trajectory['industry'].fillna("Unknown"),
+    ])
+
+    fig = go.Figure()
+    for mode, color, dash in (("net_worth", "#4B2991", "solid"), ("net_worth_constant", "#D43F96", "dot")):
+        fig.add_trace(go.Scatter(
+            x=trajectory['year'],
+            y=trajectory[mode],
+            name=WEALTH_CHART_MODES[mode],
+            mode='lines+markers',
+            line=dict(color=color, dash=dash),
+            customdata=customdata,
+            hovertemplate=(
+                '%{x}: $%{y:.1f}B<br>Rank %{customdata[0]}<br>'
+                '%{customdata[1]}, %{customdata[2]}<extra></extra>'
+            ),
+            hoverlabel=dict(bgcolor='white', font_size=14, align='left'),
+        ))
+
+    fig.update_layout(
+        title=None,
+        xaxis=dict(title=None, dtick=1),
+        yaxis=dict(title=None, tickprefix="$", ticksuffix="B", rangemode="tozero"),
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, x=0),
+        height=350,
+        margin=dict(l=0, r=0, t=30, b=0),
+        paper_bgcolor=PAPER_BGCOLOR,
+        plot_bgcolor=PLOT_BGCOLOR,
+    )
+
+    return fig
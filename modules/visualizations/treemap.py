@@ -1,29 +1,31 @@
 """
 Industry treemap visualization for the Billionaires Dashboard.
 """
+import numpy as np
 import plotly.express as px
+import plotly.graph_objects as go
 from modules.visualizations import click_data as cd
 
+# As hex strings, the shortest form for the per-node marker colors
+TREEMAP_COLORS = np.asarray([
+    "#%02x%02x%02x" % tuple(map(int, px.colors.unlabel_rgb(color))) for color in px.colors.sequential.Agsunset
+])
+
  
-def create_treemap(year_df,selected_country):
+def create_treemap(arrays):
     
     #"Create the industry treemap visualization."
-    # Filter out rows with missing industry
-    title = "All Billionaires in the World"
-    if selected_country is not None:
-        filtered_df = year_df[(year_df['country_of_citizenship'] == selected_country) & (year_df['industry'].notna())]
-        title = "All Billionaires in " + selected_country
-    else:
-        filtered_df = year_df.dropna(subset=['industry'])
-    
-    # Create treemap
-    fig = px.treemap(
-        filtered_df,
-        path=[px.Constant(title), "industry", "full_name"],  # variables outside -> inside
-        values="net_worth",  # count based on net worth
-        color='industry',  # color based on industry
-        color_discrete_sequence=px.colors.sequential.Agsunset,
-        maxdepth=3)
+    # arrays are the precomputed TreemapArrays for the year (or year/country)
+    fig = go.Figure(go.Treemap(
+        ids=arrays.ids,
+        labels=arrays.labels,
+        parents=arrays.parents,
+        values=arrays.values,
+        branchvalues="total",  # industry and root values are the sums below them
+        marker=dict(colors=TREEMAP_COLORS[arrays.colors % len(TREEMAP_COLORS)]),  # color based on industry
+        maxdepth=3,
+        name="",
+    ))
 
     fig.update_traces(
         textinfo="label+value",  # Show name and net worth inside the boxes
@@ -35,6 +37,7 @@ def create_treemap(year_df,selected_country):
         font=dict(color="white"),
         height=370,
         margin=dict(l=0, r=0, t=0, b=0),  # Minimal margins
+        treemapcolorway=list(TREEMAP_COLORS),
     )
 
     return fig
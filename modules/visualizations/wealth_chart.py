@@ -2,33 +2,28 @@
 Wealth chart visualization for the Billionaires Dashboard.
 """
 import plotly.graph_objects as go
-from modules.data import get_flag_emoji
-from modules.config import PLOT_BGCOLOR, PAPER_BGCOLOR
+from modules.config import PLOT_BGCOLOR, PAPER_BGCOLOR, WEALTH_CHART_MODES
 
-def create_wealth_chart(year_df,selected_country):
-    """Create the top 20 billionaires bar chart."""
-    # Get top 20 billionaires for the selected year
-    if selected_country:
-        top_20 = year_df[year_df['country_of_citizenship'] == selected_country].nlargest(20, 'net_worth')
-    else:
-        top_20 = year_df.nlargest(20, 'net_worth')
+def create_wealth_chart(top_20, mode="net_worth"):
+    """Create the top 20 billionaires bar chart from a precomputed leaderboard.
+
+    top_20 already carries the name_with_flag labels and, when the store has
+    the year-over-year movements, their hover text (see LeaderboardStore);
+    mode is the net worth column to show (see WEALTH_CHART_MODES).
+    """
+    movement = top_20.get(f'movement_{mode}')
 
-    # Add flag emojis to names
-    top_20['name_with_flag'] = top_20.apply(
-        lambda row: f"{row['full_name']} {get_flag_emoji(row['iso3c'])} ", 
-        axis=1
-    )
-    
     # Create horizontal bar chart
     fig = go.Figure()
     fig.add_trace(go.Bar(
         y=top_20['name_with_flag'],
-        x=top_20['net_worth'],
+        x=top_20[mode],
         orientation='h',
         #text=top_20['net_worth'].round(1),
         #texttemplate='$%{text:.1f}B',
         #textposition='auto',
-        hovertemplate='%{y}<br>$%{x:.1f}B<extra></extra>', 
+        customdata=movement,
+        hovertemplate='%{y}<br>$%{x:.1f}B' + ('<br>%{customdata}' if movement is not None else '') + '<extra></extra>', 
         hoverlabel=dict(bgcolor='white', font_size=14, align='left'),
         marker_color='#4B2991'
     ))
@@ -37,14 +32,14 @@ def create_wealth_chart(year_df,selected_country):
     fig.update_layout(
         title=None,
         xaxis=dict(
-            title="Net Worth (Billions USD)",
+            title=WEALTH_CHART_MODES[mode],
             tickprefix="$",
             ticksuffix="B",
             #tickformat=".1f"
         ),
         yaxis_title=None,
         showlegend=False,
-        height=370,
+        height=350,
         margin=dict(l=0, r=0, t=0, b=0),
         yaxis={'categoryorder': 'total ascending'},
         paper_bgcolor=PAPER_BGCOLOR,
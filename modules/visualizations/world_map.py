@@ -2,27 +2,15 @@
 World map visualization for the Billionaires Dashboard.
 """
 import plotly.graph_objects as go
+from modules.config import MAP_VIEW_LABELS, TOPOJSON_RESOLUTION
 
 
-def create_world_map(selected_year, view_type, bill_df, scatter_data):
-    """Create the world map visualization."""
-    # Get min/max values for color scaling
-    min_val = bill_df[view_type].min()
-    max_val = bill_df[view_type].max()
-    
-    # Adjust max value for percent_of_gdp
-    if view_type == "billionaire_count":
-        tab = "Billionaire Count"
-    else:
-        tab = "Wealth as a Percent of GDP"
-        max_val = bill_df['percent_of_gdp'].quantile(0.90)
-    
-    # Filter data for selected year
-    choropleth_data = bill_df[bill_df["year"] == selected_year]
-    scatter_data_filtered = scatter_data[scatter_data["year"] == selected_year]
+def create_world_map(view_type, choropleth_data, scatter_data, min_val, max_val):
+    """Create the world map visualization from the selected year's partitions."""
+    tab = MAP_VIEW_LABELS[view_type]
 
     # Filter data for only countries with data
-    scatter_data_filtered = scatter_data_filtered.dropna(subset=[view_type])
+    scatter_data_filtered = scatter_data.dropna(subset=[view_type])
   
     
     # Create figure with both choropleth and scatter traces
@@ -33,11 +21,7 @@ def create_world_map(selected_year, view_type, bill_df, scatter_data):
         go.Choropleth(
             locations=choropleth_data["iso3c"],
             z=choropleth_data[view_type],
-            text=(
-                choropleth_data["country_of_citizenship"]
-                + f"<br>{tab}: "
-                + choropleth_data[view_type].map(lambda x: f"{x:.2f}".rstrip("0").rstrip("."))
-            ),
+            text=choropleth_data[f"{view_type}_hover"],
             colorscale="agsunset_r",
             zmin=min_val,
             zmax=max_val,
@@ -61,11 +45,7 @@ def create_world_map(selected_year, view_type, bill_df, scatter_data):
             go.Scattergeo(
                 lat=scatter_data_filtered["lattitude"],
                 lon=scatter_data_filtered["longitude"],
-                text=(
-                    scatter_data_filtered["country_of_citizenship"]
-                    + f"<br>{tab}: "
-                    + scatter_data_filtered[view_type].map(lambda x: f"{x:.2f}".rstrip("0").rstrip("."))
-                ),
+                text=scatter_data_filtered[f"{view_type}_hover"],
                 mode="markers",
                 marker=dict(
                     size=10,
@@ -86,6 +66,7 @@ def create_world_map(selected_year, view_type, bill_df, scatter_data):
     # Update map projection and appearance
     fig.update_geos(
         projection_type="orthographic",
+        resolution=TOPOJSON_RESOLUTION,  # picks the world_<resolution>m topology
         showcoastlines=True,
         coastlinecolor="Black",
         showland=True,
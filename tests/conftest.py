@@ -0,0 +1,19 @@
+"""
+Shared fixtures for the test suite; run with python -m pytest from the repository root.
+"""
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+
+@pytest.fixture(scope="session")
+def data_index():
+    """Index over the committed datasets, built once for the session."""
+    from modules.data import build_data_index
+
+    return build_data_index()
@@ -0,0 +1,46 @@
+/*
+ * Runs countryFilter.selectCountry (assets/country_filter.js) on the cases
+ * written by test_country_filter.py and prints what it draws as JSON.
+ *
+ * Usage: node tests/country_filter.js cases.json
+ */
+const fs = require("fs");
+const path = require("path");
+const vm = require("vm");
+
+const clientside = {no_update: "no_update", callback_context: {triggered: []}};
+const context = vm.createContext({window: {dash_clientside: clientside}});
+vm.runInContext(
+    fs.readFileSync(path.join(__dirname, "..", "assets", "country_filter.js"), "utf8"), context
+);
+
+const drawn = JSON.parse(fs.readFileSync(process.argv[2], "utf8")).map(function (c) {
+    // A country click, a click on the map background for the world, or the
+    // arrival of the rows a click on c.country asked for
+    var click = null;
+    var current = c.country === null ? "Previous country" : null;
+    if (c.rows_arrived) {
+        clientside.callback_context.triggered = [{prop_id: "year-rows.data"}];
+        current = c.country;
+    } else if (c.country === null) {
+        clientside.callback_context.triggered = [{prop_id: "map-container.n_clicks"}];
+    } else {
+        clientside.callback_context.triggered = [{prop_id: "choro-map.clickData"}];
+        click = {points: [{text: c.country + "<br>Billionaire Count: 1"}]};
+    }
+    var output = context.window.dash_clientside.countryFilter.selectCountry(
+        click, 1, c.rows, current, c.year, c.version, c.mode, c.wealth_figure, c.treemap_figure
+    );
+    // Charts without a figure on screen are left alone (no_update)
+    function trace(figure) {
+        return figure === clientside.no_update ? null : figure.data[0];
+    }
+    return {
+        selected: output[0],
+        wealth: trace(output[1]),
+        treemap: trace(output[2]),
+        movers: output[3] === clientside.no_update ? null : output[3],
+        request: output[4] === clientside.no_update ? null : output[4]
+    };
+});
+process.stdout.write(JSON.stringify(drawn));
@@ -0,0 +1,96 @@
+import json
+import os
+import shutil
+import subprocess
+
+import dash
+import pytest
+from dash import html
+
+from modules.callbacks import register_animation_callbacks, register_country_filter_callbacks
+from modules.callbacks.response_cache import response_key
+from modules.data import DataHandle
+
+
+def _frames_request(app, values):
+    """The body a client posts for the animation frames, given its prop values."""
+    callback = app.callback_map["animation-frames.data"]
+
+    def props(dependencies):
+        return [
+            {"id": d["id"], "property": d["property"], "value": values.get(f"{d['id']}.{d['property']}")}
+            for d in dependencies
+        ]
+
+    return {
+        "output": "animation-frames.data",
+        "outputs": {"id": "animation-frames", "property": "data"},
+        "inputs": props(callback["inputs"]),
+        "state": props(callback["state"]),
+        "changedPropIds": ["animation-frames-request.data"],
+    }
+
+
+def test_frames_response_key_is_shared_by_clients(data_index):
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    register_animation_callbacks(app, DataHandle(data_index))
+
+    # Two pages opened at different times, with different click counts
+    first = {
+        "play-button.n_clicks": 1,
+        "animation-frames.modified_timestamp": -1,
+        "data-version.modified_timestamp": 1760000000000,
+        "animation-frames-request.data": data_index.version,
+    }
+    second = {
+        "play-button.n_clicks": 3,
+        "animation-frames.modified_timestamp": 1760000123456,
+        "data-version.modified_timestamp": 1760000200000,
+        "animation-frames-request.data": data_index.version,
+    }
+
+    assert response_key(_frames_request(app, first), data_index.version) == response_key(
+        _frames_request(app, second), data_index.version
+    )
+
+
+SYNC_YEAR = """
+const fs = require("fs"), vm = require("vm");
+const context = vm.createContext({window: {dash_clientside: {no_update: "no_update"}}});
+vm.runInContext(fs.readFileSync(process.argv[1], "utf8"), context);
+const syncYear = context.window.dash_clientside.animation.syncYear;
+console.log(JSON.stringify(JSON.parse(process.argv[2]).map(args => syncYear.apply(null, args))));
+"""
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+def test_selected_year_catches_up_with_clientside_play():
+    script = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", "animation.js")
+    # (slider year, paused, selected country, frames loaded at, selected year)
+    cases = [
+        [2010, False, None, 1, 2005],  # playing the frames: the browser draws the year
+        [2010, False, "Germany", 1, 2005],  # a country picked during play
+        [2010, True, None, 1, 2005],  # paused or stopped
+        [2010, True, None, 1, 2010],  # already in step
+    ]
+    result = subprocess.run(
+        ["node", "-e", SYNC_YEAR, script, json.dumps(cases)], capture_output=True, text=True, check=True
+    )
+    assert json.loads(result.stdout) == ["no_update", 2010, 2010, "no_update"]
+
+
+def test_country_clicks_follow_the_slider(data_index):
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    register_animation_callbacks(app, DataHandle(data_index))
+    register_country_filter_callbacks(app, DataHandle(data_index))
+
+    def props(dependencies):
+        return {f"{d['id']}.{d['property']}" for d in dependencies}
+
+    # A country change syncs selected-year, and the browser draws the slider's year
+    assert "selected-country.children" in props(app.callback_map["selected-year.data"]["inputs"])
+    select_country = next(c for key, c in app.callback_map.items() if "year-rows-request.data" in key)
+    assert "year-slider.value" in props(select_country["state"])
+    assert "selected-year.data" not in props(select_country["state"])
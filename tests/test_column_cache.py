@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from modules.data import column_cache
+from modules.data.column_cache import load_cached
+
+
+def _parse(path):
+    """read_csv that logs each call to parses.log next to the CSV."""
+    with open(os.path.join(os.path.dirname(path), "parses.log"), "a") as f:
+        f.write(f"{os.getpid()}\n")
+    time.sleep(0.5)  # long enough for the other processes to find the cache stale
+    return pd.read_csv(path)
+
+
+def _load(cache_dir, source, results):
+    results.put(load_cached(cache_dir, "people", source, _parse, version=1)["name"].tolist())
+
+
+def _write_csv(path, names):
+    pd.DataFrame({"name": names, "net_worth": range(len(names))}).to_csv(path, index=False)
+
+
+def _prefixes(dataset_dir):
+    return {filename.split(".", 1)[0] for filename in os.listdir(dataset_dir) if filename.endswith(".npy")}
+
+
+@pytest.mark.skipif(column_cache.fcntl is None, reason="rebuild lock needs fcntl")
+def test_concurrent_rebuilds_parse_once(tmp_path):
+    source = str(tmp_path / "people.csv")
+    _write_csv(source, ["Ada", "Grace"])
+
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    processes = [
+        context.Process(target=_load, args=(str(tmp_path / "cache"), source, results)) for _ in range(4)
+    ]
+    for process in processes:
+        process.start()
+    loaded = [results.get(timeout=30) for _ in processes]
+    for process in processes:
+        process.join(timeout=30)
+
+    assert loaded == [["Ada", "Grace"]] * 4
+    with open(tmp_path / "parses.log") as f:
+        assert len(f.readlines()) == 1
+
+
+def test_rebuild_keeps_files_of_replaced_manifest(tmp_path, monkeypatch):
+    source = str(tmp_path / "people.csv")
+    cache_dir = str(tmp_path / "cache")
+    dataset_dir = os.path.join(cache_dir, "people")
+
+    _write_csv(source, ["Ada"])
+    load_cached(cache_dir, "people", source, _parse, version=1)
+    first = column_cache._read_manifest(dataset_dir)
+
+    # A process that read the first manifest can still load it after a rebuild
+    _write_csv(source, ["Ada", "Grace"])
+    load_cached(cache_dir, "people", source, _parse, version=1)
+    second = column_cache._read_manifest(dataset_dir)
+    assert column_cache._load(dataset_dir, first)["name"].tolist() == ["Ada"]
+
+    # Once its grace period is over, the next rebuild removes them (and
+    # keeps the manifest it replaces)
+    monkeypatch.setattr(column_cache, "RETIRED_GRACE", 0)
+    _write_csv(source, ["Ada", "Grace", "Katherine"])
+    load_cached(cache_dir, "people", source, _parse, version=1)
+    third = column_cache._read_manifest(dataset_dir)
+    assert _prefixes(dataset_dir) == {second["prefix"], third["prefix"]}
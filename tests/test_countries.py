@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+from modules.data.countries import world_bank_by_iso3
+
+
+def test_world_bank_by_iso3_keeps_the_country_itself():
+    wb = pd.DataFrame({
+        "country_name": ["Niger", "Nigeria", "Nigeria", "Korea, Rep.", "Atlantis"],
+        "year": [2020, 2020, 2021, 2020, 2020],
+        "population": [24e6, 208e6, np.nan, 52e6, 1e6],
+        "iso3c": ["NGA", "NGA", "NGA", None, None],
+    })
+    rows = world_bank_by_iso3(wb)
+
+    # Niger's row lost to Nigeria's; a code filled from CUSTOM_ISO3; no code, no row
+    assert rows[["iso3c", "year", "country_name"]].values.tolist() == [
+        ["KOR", 2020, "Korea, Rep."],
+        ["NGA", 2020, "Nigeria"],
+        ["NGA", 2021, "Nigeria"],
+    ]
@@ -0,0 +1,118 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+from plotly.io.json import to_json_plotly
+
+from modules.callbacks.country_filter import build_year_rows
+from modules.callbacks.treemap import treemap_update
+from modules.callbacks.wealth_chart import wealth_chart_update
+from modules.data.treemap import TreemapStore
+from modules.visualizations import create_movers_panel, create_treemap, serialize_figure
+
+RUNNER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "country_filter.js")
+COUNTRIES = [None, "United States", "Germany", "China", "Hong Kong", "Monaco"]
+MODES = ["net_worth", "net_worth_constant"]
+
+pytestmark = pytest.mark.skipif(shutil.which("node") is None, reason="needs node")
+
+
+def _wire(value):
+    """value as the browser gets it."""
+    return json.loads(to_json_plotly(value))
+
+
+def _draw(cases, tmp_path):
+    """What assets/country_filter.js draws for each case."""
+    path = tmp_path / "cases.json"
+    path.write_text(json.dumps(cases))
+    result = subprocess.run(["node", RUNNER, str(path)], capture_output=True, text=True, check=True)
+    return json.loads(result.stdout)
+
+
+def _years(data_index):
+    # The first year has no movers; the others do
+    return [data_index.years[0], data_index.years[len(data_index.years) // 2], data_index.years[-1]]
+
+
+def _assert_treemap(got, want):
+    for key in ("ids", "labels", "parents", "values"):
+        assert got[key] == want[key], key
+    assert got["marker"]["colors"] == want["marker"]["colors"]
+
+
+def test_country_filter_draws_as_the_server(data_index, tmp_path):
+    cases, expected = [], []
+    for year in _years(data_index):
+        rows = _wire(build_year_rows(data_index, year))
+        wealth_figure = _wire(wealth_chart_update(data_index, year, None))
+        treemap_figure = _wire(treemap_update(data_index, year, None))
+        for country in COUNTRIES:
+            for mode in MODES:
+                cases.append({
+                    "year": year, "country": country, "mode": mode, "rows": rows, "version": data_index.version,
+                    "wealth_figure": wealth_figure, "treemap_figure": treemap_figure,
+                })
+                expected.append({
+                    "wealth": _wire(wealth_chart_update(data_index, year, country, mode=mode))["data"][0],
+                    "treemap": _wire(treemap_update(data_index, year, country))["data"][0],
+                    "movers": _wire(create_movers_panel(data_index.movers(year, country), country)),
+                })
+
+    for case, got, want in zip(cases, _draw(cases, tmp_path), expected):
+        label = (case["year"], case["country"], case["mode"])
+        for key in ("y", "x", "customdata"):
+            assert got["wealth"][key] == want["wealth"][key], (label, key)
+        _assert_treemap(got["treemap"], want["treemap"])
+        assert got["movers"] == want["movers"], label
+
+
+def test_country_filter_rolls_up_treemap_as_the_server(data_index, tmp_path):
+    # TREEMAP_TOP_K is off by default; check the "Other" roll-up with K=3
+    store = TreemapStore(data_index.df, data_index.df["year"], 3)
+    cases, expected = [], []
+    for year in _years(data_index):
+        rows = dict(_wire(build_year_rows(data_index, year)), top_k=3)
+        treemap_figure = _wire(treemap_update(data_index, year, None))
+        for country in COUNTRIES:
+            cases.append({
+                "year": year, "country": country, "mode": "net_worth", "rows": rows, "version": data_index.version,
+                "wealth_figure": None, "treemap_figure": treemap_figure,
+            })
+            expected.append(_wire(serialize_figure(create_treemap(store.arrays(year, country))))["data"][0])
+
+    for got, want in zip(_draw(cases, tmp_path), expected):
+        _assert_treemap(got["treemap"], want)
+
+
+def test_country_filter_fetches_rows_on_first_click(data_index, tmp_path):
+    first, last = data_index.years[0], data_index.years[-1]
+    rows = _wire(build_year_rows(data_index, last))
+    wealth_figure = _wire(wealth_chart_update(data_index, last, None))
+    treemap_figure = _wire(treemap_update(data_index, last, None))
+    case = {
+        "year": last, "country": "Germany", "mode": "net_worth", "version": data_index.version,
+        "wealth_figure": wealth_figure, "treemap_figure": treemap_figure,
+    }
+    stale = _wire(build_year_rows(data_index, first))
+    clicked, reloaded, arrived, moved_on = _draw([
+        # Only the rows of another year, or of older data: select and ask for them
+        dict(case, rows=stale),
+        dict(case, rows=dict(rows, version="older")),
+        # They arrive: draw the selected country
+        dict(case, rows=rows, rows_arrived=True),
+        # They arrive after the slider moved on: the server draws that year
+        dict(case, rows=stale, rows_arrived=True),
+    ], tmp_path)
+
+    for output in (clicked, reloaded):
+        assert output["selected"] == "Germany"
+        assert output["request"] == {"year": last, "version": data_index.version}
+        assert output["wealth"] is None and output["movers"] is None
+    assert arrived["selected"] == "no_update" and arrived["request"] is None
+    want = _wire(wealth_chart_update(data_index, last, "Germany"))["data"][0]
+    assert arrived["wealth"]["y"] == want["y"]
+    assert arrived["movers"] == _wire(create_movers_panel(data_index.movers(last, "Germany"), "Germany"))
+    assert moved_on["wealth"] is None and moved_on["request"] is None
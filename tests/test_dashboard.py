@@ -0,0 +1,96 @@
+import json
+
+import dash
+import pytest
+from dash import html
+from plotly.io.json import to_json_plotly
+
+from modules.callbacks import register_dashboard_callbacks
+from modules.callbacks.movers import movers_update
+from modules.callbacks.treemap import treemap_update
+from modules.callbacks.wealth_chart import wealth_chart_update
+from modules.callbacks.world_map import world_map_update
+from modules.config import MAP_VIEW_LABELS
+from modules.data import DataHandle
+
+OUTPUTS = ["wealth-chart.figure", "choro-map.figure", "industrytreemap.figure", "movers-panel.children"]
+OUTPUT = ".." + "...".join(OUTPUTS) + ".."
+VIEWS = list(MAP_VIEW_LABELS)
+
+
+@pytest.fixture
+def post(data_index):
+    """Post a dashboard update for a state and the props that changed; returns the outputs sent."""
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    register_dashboard_callbacks(app, DataHandle(data_index))
+    client = app.server.test_client()
+    callback = app.callback_map[OUTPUT]
+
+    def post(state, changed):
+        body = {
+            "output": OUTPUT,
+            "outputs": [dict(zip(("id", "property"), output.split("."))) for output in OUTPUTS],
+            "inputs": [
+                {"id": d["id"], "property": d["property"], "value": state[f"{d['id']}.{d['property']}"]}
+                for d in callback["inputs"]
+            ],
+            "state": [
+                {"id": d["id"], "property": d["property"], "value": state[f"{d['id']}.{d['property']}"]}
+                for d in callback["state"]
+            ],
+            "changedPropIds": changed,
+        }
+        response = client.post("/_dash-update-component", json=body)
+        assert response.status_code == 200
+        return response.get_json()["response"]
+
+    return post
+
+
+def _wire(value):
+    return json.loads(to_json_plotly(value))
+
+
+def _state(data_index, year, country=None, view=VIEWS[0], mode="net_worth"):
+    return {
+        "selected-year.data": year,
+        "selected-country.children": country,
+        "switch-options.value": view,
+        "data-version.data": data_index.version,
+        "wealth-options.value": mode,
+    }
+
+
+@pytest.mark.parametrize("country", [None, "Germany"])
+def test_full_render_matches_the_chart_builders(data_index, post, country):
+    year = data_index.years[-1]
+    state = _state(data_index, year, country, VIEWS[1], "net_worth_constant")
+    sent = post(state, list(state))
+
+    assert sent == {
+        "wealth-chart": {"figure": _wire(wealth_chart_update(data_index, year, country, mode="net_worth_constant"))},
+        "choro-map": {"figure": _wire(world_map_update(data_index, year, VIEWS[1]))},
+        "industrytreemap": {"figure": _wire(treemap_update(data_index, year, country))},
+        "movers-panel": {"children": _wire(movers_update(data_index, year, country))},
+    }
+
+
+def test_year_step_matches_the_chart_builders(data_index, post):
+    year = data_index.years[-2]
+    sent = post(_state(data_index, year), ["selected-year.data"])
+
+    # The wealth chart and map as patches of their per-year arrays
+    assert sent == {
+        "wealth-chart": {"figure": _wire(wealth_chart_update(data_index, year, None, year_only=True))},
+        "choro-map": {"figure": _wire(world_map_update(data_index, year, VIEWS[0], year_only=True))},
+        "industrytreemap": {"figure": _wire(treemap_update(data_index, year, None))},
+        "movers-panel": {"children": _wire(movers_update(data_index, year, None))},
+    }
+
+
+def test_view_switch_only_redraws_the_map(data_index, post):
+    year = data_index.years[-1]
+    sent = post(_state(data_index, year, view=VIEWS[2]), ["switch-options.value"])
+
+    assert sent == {"choro-map": {"figure": _wire(world_map_update(data_index, year, VIEWS[2]))}}
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from modules.data.groups import GroupedRows
+
+
+def test_grouped_rows_match_groupby():
+    frame = pd.DataFrame({
+        "year": [2001, 2000, 2001, 2000, 2001],
+        "country": ["Chile", "Peru", None, "Peru", "Chile"],
+        "value": [1.0, 2.0, 3.0, 4.0, 5.0],
+    }, index=[10, 11, 12, 13, 14])
+    keys = [frame["year"].to_numpy(), frame["country"].to_numpy()]
+    grouped = GroupedRows.split(frame, keys)
+
+    expected = dict(iter(frame.groupby(keys)))
+    assert set(expected) == {(2000, "Peru"), (2001, "Chile")}
+    for key, part in expected.items():
+        pd.testing.assert_frame_equal(grouped.get(key), part)
+
+    # Rows with a missing key belong to no group
+    assert (2001, None) not in grouped
+    assert grouped.get((2001, None)).empty
+    assert list(grouped.get((1999, "Peru")).columns) == list(frame.columns)
+
+
+def test_grouped_rows_prepare_and_empty():
+    frame = pd.DataFrame({"year": [2000, 2000, 2001], "value": [1.0, 2.0, 3.0]})
+    empty = pd.DataFrame({"marker": []})
+    grouped = GroupedRows.split(
+        frame, "year", prepare=lambda rows: rows.assign(double=rows["value"] * 2), empty=empty
+    )
+
+    np.testing.assert_array_equal(grouped.get(2000)["double"], [2.0, 4.0])
+    assert grouped.get(2002) is empty
@@ -0,0 +1,54 @@
+import dash
+from dash import Input, Output, html
+
+from modules.callbacks import install_compression, install_response_cache, instrument_app
+from modules.callbacks.metrics import registry
+from modules.config import METRICS_PATH
+from modules.data import DataHandle
+
+
+def test_metrics_content_type_has_one_charset():
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    instrument_app(app)
+
+    response = app.server.test_client().get(METRICS_PATH)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Type"] == "text/plain; version=0.0.4; charset=utf-8"
+
+
+def test_request_metrics_count_cached_responses_uncompressed():
+    class Data:
+        version = "v1"
+
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    install_compression(app)
+    instrument_app(app)
+    install_response_cache(app, DataHandle(Data()), "memory")
+
+    @app.callback(Output("movers-panel", "children"), Input("selected-year", "data"))
+    def metrics_test_panel(year):
+        return "x" * 50_000
+
+    body = {
+        "output": "movers-panel.children",
+        "outputs": {"id": "movers-panel", "property": "children"},
+        "inputs": [{"id": "selected-year", "property": "data", "value": 2020}],
+        "changedPropIds": ["selected-year.data"],
+    }
+    client = app.server.test_client()
+    sizes = []
+    for _ in range(2):
+        response = client.post("/_dash-update-component", json=body, headers={"Accept-Encoding": "gzip"})
+        assert response.headers["Content-Encoding"] == "gzip"
+        sizes.append(len(response.data))
+
+    def sample(name, source):
+        return registry.get_sample_value(name, {"callback": "metrics_test_panel", "source": source})
+
+    # The payload size, not the gzipped one, from the callback and then the cache
+    for source in ("callback", "cache"):
+        assert sample("dash_callback_request_duration_seconds_count", source) == 1
+        assert sample("dash_callback_response_bytes_sum", source) > 50_000 > max(sizes)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from modules.callbacks.trajectory import _option, trajectory_view
+from modules.data.movers import year_over_year
+from modules.data.people import PeopleIndex
+
+
+@pytest.fixture
+def people():
+    df = pd.DataFrame({
+        "full_name": ["José Núñez", "Zoe Park", "José Núñez", "Zoe Park", "Ada Stone", "José Núñez"],
+        "year": [2001, 2001, 2002, 2002, 2002, 2004],
+        "net_worth": [3.0, 2.0, 4.5, 1.5, 9.0, 5.0],
+        "net_worth_constant": [3.5, 2.5, 5.0, 1.8, 9.5, 5.1],
+        "country_of_citizenship": ["Spain", None, "Spain", None, "Chile", "Spain"],
+        "industry": ["Retail", "Technology", "Retail", np.nan, "Mining", "Retail"],
+        "iso3c": ["ESP", None, "ESP", None, "CHL", "ESP"],
+    })
+    return PeopleIndex(df, df["year"], year_over_year(df, df["year"]))
+
+
+def test_trajectory_view_leaves_out_missing_fields(people):
+    # Zoe Park has no country, and no industry in her latest year
+    code = people.code("Zoe Park")
+    name, summary, _ = trajectory_view(people, code)
+    assert (name, summary) == ("Zoe Park", "Listed in 2 years, highest rank #2 in 2001.")
+    assert _option(people.search("zoe")[0])["label"] == "Zoe Park ($1.5B in 2002)"
+
+    _, summary, _ = trajectory_view(people, people.code("Ada Stone"))
+    assert summary == "Chile, Mining. Listed in 1 years, highest rank #1 in 2002."
+
+
+def _names(results):
+    return [person.name for person in results]
+
+
+def test_search_ignores_case_and_accents(people):
+    for query in ("jose", "JOSÉ", "núñez", "NUNEZ", "jo nu", "  José Nú"):
+        assert _names(people.search(query)) == ["José Núñez"], query
+    # Results keep the listed spelling and the latest year
+    person = people.search("nunez")[0]
+    assert (person.year, person.net_worth, person.country) == (2004, 5.0, "Spain")
+
+
+def test_search_falls_back_to_close_spellings(people):
+    assert _names(people.search("nunes")) == ["José Núñez"]
+    assert _names(people.search("stoen")) == ["Ada Stone"]
+
+
+def test_search_without_match(people):
+    assert people.search("xavier") == []
+    assert people.search("") == []
+    assert people.search("!?") == []
+    assert people.code("Nobody") is None
+
+
+def test_trajectory_skips_years_off_the_list(people):
+    code = people.code("José Núñez")
+    assert people.code(people.ids[code]) == code
+
+    trajectory = people.trajectory(code)
+    assert trajectory["year"].tolist() == [2001, 2002, 2004]
+    assert trajectory["net_worth"].tolist() == [3.0, 4.5, 5.0]
+    assert trajectory["rank"].tolist() == [1, 2, 1]
+    assert trajectory["country"].tolist() == ["Spain"] * 3
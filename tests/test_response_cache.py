@@ -0,0 +1,111 @@
+import dash
+import pytest
+from dash import Input, Output, html
+
+from modules.callbacks import install_response_cache
+from modules.data import DataHandle
+
+UPDATE_PATH = "/_dash-update-component"
+
+
+class Data:
+    """Stand-in for a DataIndex: the cache only reads its version."""
+
+    def __init__(self, version):
+        self.version = version
+
+
+def _body(output, year=2020):
+    component_id, prop = output.split(".")
+    return {
+        "output": output,
+        "outputs": {"id": component_id, "property": prop},
+        "inputs": [{"id": "selected-year", "property": "data", "value": year}],
+        "changedPropIds": ["selected-year.data"],
+    }
+
+
+@pytest.fixture
+def served():
+    """(client, data handle, calls per output, response cache) of a small app."""
+    app = dash.Dash(__name__)
+    app.layout = html.Div()
+    data = DataHandle(Data("v1"))
+    cache = install_response_cache(app, data, "memory")
+    calls = {"movers-panel.children": 0, "trajectory-title.children": 0}
+
+    # A cached output (in RESPONSE_CACHE_OUTPUTS) and one that isn't
+    @app.callback(Output("movers-panel", "children"), Input("selected-year", "data"))
+    def movers(year):
+        calls["movers-panel.children"] += 1
+        return f"movers {year} {data.version}"
+
+    @app.callback(Output("trajectory-title", "children"), Input("selected-year", "data"))
+    def title(year):
+        calls["trajectory-title.children"] += 1
+        return f"title {year}"
+
+    return app.server.test_client(), data, calls, cache
+
+
+def test_cached_response_and_etag_revalidation(served):
+    client, _, calls, _ = served
+    first = client.post(UPDATE_PATH, json=_body("movers-panel.children"))
+    etag, _ = first.get_etag()
+    assert first.status_code == 200 and etag
+
+    again = client.post(UPDATE_PATH, json=_body("movers-panel.children"))
+    assert again.data == first.data
+    assert calls["movers-panel.children"] == 1
+
+    revalidated = client.post(
+        UPDATE_PATH, json=_body("movers-panel.children"), headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert revalidated.status_code == 304 and revalidated.data == b""
+    assert calls["movers-panel.children"] == 1
+
+    # Another input value is another response, with another tag
+    other = client.post(
+        UPDATE_PATH, json=_body("movers-panel.children", 2021), headers={"If-None-Match": f'"{etag}"'}
+    )
+    assert other.status_code == 200 and other.get_etag()[0] != etag
+
+
+def test_outputs_outside_the_list_are_not_cached(served):
+    client, _, calls, cache = served
+    for _ in range(2):
+        response = client.post(UPDATE_PATH, json=_body("trajectory-title.children"))
+        assert response.status_code == 200 and response.get_etag() == (None, None)
+    assert calls["trajectory-title.children"] == 2
+    assert cache.stats() == {"hits": 0, "misses": 0}
+
+
+def test_data_reload_changes_the_key(served):
+    client, data, calls, _ = served
+    before = client.post(UPDATE_PATH, json=_body("movers-panel.children"))
+    data.swap(Data("v2"))
+    after = client.post(
+        UPDATE_PATH, json=_body("movers-panel.children"), headers={"If-None-Match": before.headers["ETag"]}
+    )
+
+    assert after.status_code == 200
+    assert after.get_etag()[0] != before.get_etag()[0]
+    assert b"v2" in after.data
+    assert calls["movers-panel.children"] == 2
+
+
+def test_backend_failures_fall_back_to_the_callback(served):
+    client, _, calls, cache = served
+
+    class Broken:
+        def get(self, key):
+            raise ConnectionError("cache down")
+
+        def set(self, key, value):
+            raise ConnectionError("cache down")
+
+    cache.backend = Broken()
+    for _ in range(2):
+        response = client.post(UPDATE_PATH, json=_body("movers-panel.children"))
+        assert response.status_code == 200 and b"movers 2020" in response.data
+    assert calls["movers-panel.children"] == 2